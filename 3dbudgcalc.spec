@@ -0,0 +1,44 @@
+# -*- mode: python ; coding: utf-8 -*-
+# PyInstaller 打包配置：pyinstaller 3dbudgcalc.spec
+#
+# 瘦身要点：
+#   - openpyxl / xlsxwriter 在程序中按需导入，窗口先显示，Excel 相关库第一次加载/导出时才解压导入
+#   - 预算报表直接由 xlsxwriter 导出，pandas 只在 --batch 模式写汇总表时才会导入
+#   - 排除运行时用不到的大模块（setuptools、测试框架、tkinter 等），减小单文件 exe 的解压量
+
+block_cipher = None
+
+EXCLUDES = [
+    'tkinter', 'unittest', 'pydoc', 'pydoc_data', '_pyrepl', 'curses', 'xmlrpc', 'lib2to3',
+    'setuptools', 'pkg_resources', 'wheel', 'pip', 'distutils',
+    'IPython', 'matplotlib', 'scipy', 'pytest',
+    'PyQt5.QtNetwork', 'PyQt5.QtQml', 'PyQt5.QtQuick', 'PyQt5.QtWebEngineWidgets', 'PyQt5.QtMultimedia',
+    # 注意：openpyxl.chart、pandas.plotting 不能排除，import openpyxl / import pandas 时总会导入它们
+    'pandas.io.formats.style', 'pandas.tests', 'numpy.tests',
+]
+
+a = Analysis(
+    ['src/3d_budget_calc_GUI_Read.py'],
+    pathex=['src'],
+    binaries=[],
+    datas=[('3dprint.ico', '.')],
+    hiddenimports=[],
+    hookspath=[],
+    runtime_hooks=[],
+    excludes=EXCLUDES,
+    noarchive=False,
+)
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.datas,
+    [],
+    name='3dbudgcalc_v2.0',
+    icon='3dprint.ico',
+    console=False,
+    upx=False,  # UPX 压缩会显著增加每次启动时的解压耗时
+    runtime_tmpdir=None,
+)
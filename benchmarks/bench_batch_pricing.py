@@ -0,0 +1,70 @@
+"""批量报价引擎基准：逐批次调用 calculate_multipart_cost 与 calculate_batch_cost 对比
+
+用法：python benchmarks/bench_batch_pricing.py [批次数]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from batch_pricing import COST_COLUMNS, calculate_batch_cost, durations_to_hours  # noqa: E402
+from cost_module import DEFAULT_PRICING_STANDARD, calculate_multipart_cost  # noqa: E402
+
+
+def make_builds(build_count, seed=0):
+    """生成合成批次：每批 1~20 个零件，时长为 "X天Y小时Z分W秒" 格式"""
+    rng = np.random.default_rng(seed)
+    parts_per_build = rng.integers(1, 21, build_count)
+    build_ids = np.repeat(np.arange(build_count), parts_per_build)
+    volumes = rng.uniform(100, 50000, len(build_ids))
+    supports = rng.uniform(0, 5000, len(build_ids))
+    seconds = rng.integers(600, 10 * 86400, build_count)
+    durations = np.array([f"{s // 86400}天{s % 86400 // 3600}小时{s % 3600 // 60}分{s % 60}秒" for s in seconds])
+    return build_ids, volumes, supports, durations
+
+
+def main():
+    build_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    pricing = dict(DEFAULT_PRICING_STANDARD)
+    build_ids, volumes, supports, durations = make_builds(build_count)
+
+    bounds = np.flatnonzero(np.diff(build_ids)) + 1
+    builds = [
+        [{'name': f"p{i}", 'volume': float(volumes[i]), 'support_volume': float(supports[i])} for i in rows]
+        for rows in np.split(np.arange(len(build_ids)), bounds)
+    ]
+
+    start = time.perf_counter()
+    scalar_results = [
+        calculate_multipart_cost(parts, str(duration), pricing)["计算明细"]
+        for parts, duration in zip(builds, durations)
+    ]
+    scalar_time = time.perf_counter() - start
+
+    # 首次报价：时长字符串也在批量计算中解析
+    start = time.perf_counter()
+    batch = calculate_batch_cost(volumes, supports, build_ids, durations, pricing)
+    batch_time = time.perf_counter() - start
+
+    # 调价重算：时长只解析一次，之后仅重新计算费用
+    hours = durations_to_hours(durations)
+    start = time.perf_counter()
+    calculate_batch_cost(volumes, supports, build_ids, hours, pricing)
+    reprice_time = time.perf_counter() - start
+
+    max_diff = max(
+        float(np.max(np.abs(batch[column] - np.array([r[column] for r in scalar_results]))))
+        for column in COST_COLUMNS
+    )
+    print(f"批次数：{build_count}，零件行数：{len(build_ids)}")
+    print(f"逐批次标量计算：{scalar_time * 1e3:.1f} ms")
+    print(f"向量化批量计算：{batch_time * 1e3:.1f} ms（加速 {scalar_time / batch_time:.0f}x）")
+    print(f"向量化调价重算：{reprice_time * 1e3:.1f} ms（加速 {scalar_time / reprice_time:.0f}x）")
+    print(f"最大差值：{max_diff:.2f} 元")
+
+
+if __name__ == "__main__":
+    main()
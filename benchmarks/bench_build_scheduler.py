@@ -0,0 +1,86 @@
+"""多版排产基准：把 1 万个零件的合成订单排到两种机型的成型版上
+
+核对每版零件不重叠、不超出成型版，所有零件都恰好排入一次，各版报价之和与总费用一致；
+并与 "全部零件算作一版"（calculate_multipart_cost 的原有假设）的费用对比。
+
+用法：python benchmarks/bench_build_scheduler.py [零件数]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from build_scheduler import DEFAULT_GAP, part_footprint, schedule_builds  # noqa: E402
+from cost_module import DEFAULT_PRICING_STANDARD  # noqa: E402
+
+MACHINES = [
+    {"name": "M250", "plate": (250, 250), "max_height": 300, "count": 3,
+     "pricing": {"机时费率": 250, "氩气单价": 1800}},
+    {"name": "M400", "plate": (400, 400), "max_height": 400, "count": 1,
+     "pricing": {"机时费率": 420, "氩气单价": 3200, "后处理费": 2500}},
+]
+
+
+def make_order(part_count, seed=0):
+    """合成订单：占地 10 ~ 80 mm，高度 5 ~ 200 mm，体积约为包围盒的 30%"""
+    rng = np.random.default_rng(seed)
+    width, depth = rng.uniform(10, 80, (2, part_count))
+    height = rng.uniform(5, 200, part_count)
+    volume = width * depth * height * rng.uniform(0.2, 0.4, part_count)
+    return [{"name": f"P{i}", "volume": float(v), "support_volume": float(v) * 0.05,
+             "width": float(w), "depth": float(d), "height": float(h)}
+            for i, (w, d, h, v) in enumerate(zip(width, depth, height, volume))]
+
+
+def check_plate(plate, plate_size):
+    """零件矩形两两不重叠（间距 DEFAULT_GAP 以内视为重叠）且不超出成型版"""
+    boxes = []
+    for part, (x, y, rotated) in zip(plate["parts"], plate["positions"]):
+        width, depth, _ = part_footprint(part)
+        if rotated:
+            width, depth = depth, width
+        assert x + width <= plate_size[0] + 1e-9 and y + depth <= plate_size[1] + 1e-9, "零件超出成型版"
+        boxes.append((x, y, x + width, y + depth))
+    boxes = np.array(boxes)
+    for k, (x0, y0, x1, y1) in enumerate(boxes[:-1]):
+        rest = boxes[k + 1:]
+        overlap = ((rest[:, 0] < x1 + DEFAULT_GAP - 1e-9) & (x0 < rest[:, 2] + DEFAULT_GAP - 1e-9)
+                   & (rest[:, 1] < y1 + DEFAULT_GAP - 1e-9) & (y0 < rest[:, 3] + DEFAULT_GAP - 1e-9))
+        assert not overlap.any(), "零件重叠"
+
+
+def main():
+    part_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    parts = make_order(part_count)
+
+    start = time.perf_counter()
+    schedule = schedule_builds(parts, MACHINES)
+    elapsed = time.perf_counter() - start
+
+    plate_sizes = {machine["name"]: machine["plate"] for machine in MACHINES}
+    names = [part["name"] for plate in schedule["plates"] for part in plate["parts"]]
+    assert sorted(names) == sorted(part["name"] for part in parts), "零件遗漏或重复"
+    for plate in schedule["plates"]:
+        check_plate(plate, plate_sizes[plate["machine"]])
+    total = sum(plate["quote"]["计算明细"]["实际费用"] for plate in schedule["plates"])
+    assert abs(total - schedule["total_cost"]) < 1e-6
+
+    counts = {}
+    for plate in schedule["plates"]:
+        counts[plate["machine"]] = counts.get(plate["machine"], 0) + 1
+    print(f"{part_count:,} 个零件：排产耗时 {elapsed:.2f} 秒，共 {len(schedule['plates'])} 版 "
+          f"（{'，'.join(f'{name} {count} 版' for name, count in counts.items())}）")
+    print(f"总费用 {schedule['total_cost']:,.2f} 元，完工 {schedule['makespan_hours']:.1f} 小时")
+
+    # 原有假设：全部零件一版打印，只收一次氩气和后处理费（但成型版根本放不下）
+    single = (DEFAULT_PRICING_STANDARD["氩气单价"] * DEFAULT_PRICING_STANDARD["氩气用量"]
+              * DEFAULT_PRICING_STANDARD["氩气数量"] + DEFAULT_PRICING_STANDARD["后处理费"])
+    print(f"其中氩气与后处理费 {sum(p['quote']['计算明细']['氩气费用'] + p['quote']['计算明细']['后处理费'] for p in schedule['plates']):,.2f} 元"
+          f"（按单版计算只有 {single:,.2f} 元）")
+
+
+if __name__ == "__main__":
+    main()
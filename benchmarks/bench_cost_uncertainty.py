@@ -0,0 +1,44 @@
+"""成本分布基准：100 万个蒙特卡洛样本，单进程与进程池分块计算
+
+核对两种方式的分位数完全相同；另外只让打印时长服从均匀分布时，实付金额是时长的线性函数，
+各分位数应等于按时长分位点计算的点估计报价。
+
+用法：python benchmarks/bench_cost_uncertainty.py [样本数]
+"""
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from cost_module import DEFAULT_PRICING_STANDARD, price_cost_terms, quote_aggregates  # noqa: E402
+from cost_uncertainty import DEFAULT_UNCERTAINTY, PERCENTILES, monte_carlo_quote  # noqa: E402
+from synthetic import make_parts  # noqa: E402
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    aggregates = quote_aggregates(make_parts(200), "1天2小时3分")
+
+    results = {}
+    for workers in sorted({1, max(os.cpu_count(), 2)}):
+        start = time.perf_counter()
+        results[workers] = monte_carlo_quote(aggregates, samples=samples, workers=workers)
+        print(f"{samples:,} 个样本，{workers} 个进程：{time.perf_counter() - start:.2f} 秒  {results[workers]}")
+    first, *others = results.values()
+    assert all(other == first for other in others), "分块并行的结果与单进程不一致"
+
+    # 只有打印时长在 ±20% 内均匀分布：第 p 百分位为 机时 × (0.8 + 0.4 × p / 100) 时的报价
+    uncertainty = {name: {"分布": "固定"} for name in DEFAULT_UNCERTAINTY}
+    uncertainty["打印时长"] = {"分布": "均匀", "下限": -0.2, "上限": 0.2}
+    distribution = monte_carlo_quote(aggregates, uncertainty=uncertainty, samples=samples)
+    for p in PERCENTILES:
+        hours = aggregates["机时"] * (0.8 + 0.4 * p / 100)
+        expected = price_cost_terms(dict(aggregates, 机时=hours), DEFAULT_PRICING_STANDARD)["实际费用"]
+        assert math.isclose(distribution[f"P{p}"], expected, rel_tol=1e-3), (p, distribution[f"P{p}"], expected)
+    print("均匀分布时长的分位数与解析值一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""打印时长模型基准：由合成的历史报价训练，核对拟合出的系数，并测量每次换零件清单时的预测耗时
+
+历史报价的机时按已知的线性关系（加噪声）生成，训练数据经由临时目录中的报价缓存读取，
+与 duration_model.py --from-cache 的路径相同。
+
+用法：python benchmarks/bench_duration_model.py [历史报价数] [预测时的零件数]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from cost_module import format_duration  # noqa: E402
+from duration_model import DurationModel, fit_from_cache, part_features  # noqa: E402
+from quote_cache import QuoteCache  # noqa: E402
+from synthetic import make_parts  # noqa: E402
+
+# 生成历史数据的真实关系：机时 = 常数项 + 零件体积(cm³) × a + 支撑体积(cm³) × b + 零件数量 × c
+TRUE_COEFFICIENTS = (6.0, 0.004, 0.002, 0.05)
+NOISE_HOURS = 0.5
+
+
+def main():
+    quote_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    part_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = QuoteCache(os.path.join(tmp, "cache.sqlite3"))
+        for i in range(quote_count):
+            parts = make_parts(int(rng.integers(1, 200)), seed=i)
+            features = part_features(parts)
+            intercept, *weights = TRUE_COEFFICIENTS
+            hours = intercept + sum(w * features[name] for w, name in zip(weights, ("零件体积", "支撑体积", "零件数量")))
+            hours += rng.normal(0, NOISE_HOURS)
+            digest = f"{i:040x}"
+            cache.put_parts(digest, parts)
+            cache.put_quote(digest, {}, format_duration(hours * 3600), {'输入参数': {}})
+
+        model = DurationModel(os.path.join(tmp, "duration_model.json"))
+        start = time.perf_counter()
+        added = fit_from_cache(cache, model)
+        model.save()
+        fit_seconds = time.perf_counter() - start
+        reloaded = DurationModel.load(model.path)
+
+    print(f"{added} 个历史报价，读取缓存并拟合 {fit_seconds * 1000:.0f} ms，均方根误差 {model.rmse:.2f} 小时"
+          f"（噪声 {NOISE_HOURS} 小时）")
+    for name, fitted, true in zip(("常数项", *model.features), model.coefficients, TRUE_COEFFICIENTS):
+        print(f"  {name}：拟合 {fitted:.4f}，真实 {true}")
+    assert reloaded.coefficients == model.coefficients, "保存后重新读取的系数不一致"
+
+    parts = make_parts(part_count)
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        hours = reloaded.predict(part_features(parts))
+        best = min(best, time.perf_counter() - start)
+    print(f"{part_count:,} 个零件：特征 + 预测 {best * 1000:.1f} ms，预测打印时长 {format_duration(hours * 3600)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Magics 体积报告读取基准：原整表加载 + 逐单元格读取 与 流式只读加载 对比
+
+用法：python benchmarks/bench_excel_loader.py [零件数]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from openpyxl import load_workbook  # noqa: E402
+
+from excel_loader import format_load_stats, load_parts  # noqa: E402
+from synthetic import make_parts, write_magics_report  # noqa: E402
+
+
+def load_parts_full_mode(file_path):
+    """原 load_parts_from_excel 的读取方式（整表加载后逐单元格读取）"""
+    sheet = load_workbook(file_path, data_only=True).active
+    part_count = int(sheet["C2"].value)
+    return [
+        {'name': sheet[f"B{row}"].value,
+         'volume': float(sheet[f"C{row}"].value),
+         'support_volume': float(sheet[f"D{row}"].value)}
+        for row in range(8, 8 + part_count)
+    ]
+
+
+def main():
+    part_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = write_magics_report(os.path.join(tmp, "volume.xlsm"), make_parts(part_count))
+
+        start = time.perf_counter()
+        full_parts = load_parts_full_mode(file_path)
+        full_time = time.perf_counter() - start
+
+        parts, stats = load_parts(file_path)
+        assert parts == full_parts
+
+    print(f"整表加载：{full_time:.2f} 秒")
+    print(f"流式加载：{format_load_stats(stats)}（加速 {full_time / stats['seconds']:.1f}x）")
+
+
+if __name__ == "__main__":
+    main()
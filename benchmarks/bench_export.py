@@ -0,0 +1,106 @@
+"""预算报表导出基准：原 pandas.ExcelWriter + 逐单元格写入 与 常量内存导出引擎 对比
+
+分别统计耗时和 tracemalloc 峰值内存（两者分开运行，避免内存跟踪拖慢计时），
+并用 openpyxl 读回两份报表逐单元格比对内容。
+
+用法：python benchmarks/bench_export.py [零件数]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pandas as pd  # noqa: E402
+from openpyxl import load_workbook  # noqa: E402
+
+from cost_module import DEFAULT_PRICING_STANDARD, calculate_multipart_cost  # noqa: E402
+from synthetic import make_parts  # noqa: E402
+from xlsx_export import FORMAT_SPECS, PRICING_UNITS, export_to_excel  # noqa: E402
+
+
+def export_pandas_mode(result, filename):
+    """原 export_to_excel 的写法（经 pandas 创建工作簿，逐单元格按标签关键词判断格式）"""
+    with pd.ExcelWriter(filename, engine='xlsxwriter') as writer:
+        workbook = writer.book
+        worksheet = workbook.add_worksheet('预算总览')
+        formats = {name: workbook.add_format(spec) for name, spec in FORMAT_SPECS.items()}
+        worksheet.merge_range('A1:B1', '多零件合并打印预算报告', formats['title'])
+        worksheet.merge_range('A2:B2', "生成时间：-", formats['normal'])
+
+        params = [['总打印时长', result['输入参数']['总打印时长']],
+                  ['零件数量', f"{result['输入参数']['零件数量']}件"]]
+        for i, part in enumerate(result['输入参数']['零件清单'], 1):
+            params.extend([
+                [f'零件{i}名称', part['name']],
+                [f'零件{i}体积', f"{part['volume']:.3f}mm³"],
+                [f'零件{i}支撑体积', f"{part.get('support_volume', 0.0):.3f}mm³"]
+            ])
+        pricing = [[param, f"{value} {PRICING_UNITS.get(param, '')}".strip()]
+                   for param, value in result['定价标准'].items()]
+
+        def write_section(data, start_row, title):
+            worksheet.merge_range(start_row, 0, start_row, 1, title, formats['header'])
+            for row_idx, (label, value) in enumerate(data, start_row + 1):
+                if "零件" in label and "名称" in label:
+                    cell_format = formats['part_name']
+                elif "体积" in label:
+                    cell_format = formats['part_detail']
+                elif title == "费用明细":
+                    cell_format = formats['currency']
+                else:
+                    cell_format = formats['number'] if isinstance(value, (int, float)) else formats['normal']
+                worksheet.write(row_idx, 0, label, cell_format)
+                worksheet.write(row_idx, 1, value, cell_format)
+            return start_row + len(data) + 2
+
+        current_row = write_section(params, 3, "输入参数")
+        current_row = write_section(pricing, current_row, "定价标准")
+        write_section([[k, v] for k, v in result['计算明细'].items()], current_row, "费用明细")
+        worksheet.set_column('A:B', 25)
+
+
+def measure(export, result, filename):
+    """返回 (耗时秒数, 峰值内存 MB)"""
+    start = time.perf_counter()
+    export(result, filename)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    export(result, filename)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2 ** 20
+
+
+def read_cells(filename):
+    """读回报表内容（跳过含生成时间的第 2 行）"""
+    workbook = load_workbook(filename, read_only=True)
+    rows = [row for i, row in enumerate(workbook.active.iter_rows(values_only=True)) if i != 1]
+    workbook.close()
+    return rows
+
+
+def main():
+    part_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    parts = make_parts(part_count)
+    result = calculate_multipart_cost(parts, "1天2小时3分4秒", DEFAULT_PRICING_STANDARD)
+    result['输入参数']['零件清单'] = parts
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_file = os.path.join(tmp, "pandas.xlsx")
+        new_file = os.path.join(tmp, "engine.xlsx")
+        old_time, old_peak = measure(export_pandas_mode, result, old_file)
+        new_time, new_peak = measure(lambda r, f: export_to_excel(r, f), result, new_file)
+        assert read_cells(old_file) == read_cells(new_file), "两种导出方式的报表内容不一致"
+
+    print(f"{part_count} 个零件")
+    print(f"pandas 逐单元格：{old_time:.2f} 秒，峰值内存 {old_peak:.1f} MB")
+    print(f"常量内存引擎  ：{new_time:.2f} 秒，峰值内存 {new_peak:.1f} MB"
+          f"（加速 {old_time / new_time:.1f}x，内存 {old_peak / new_peak:.1f}x）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""GUI 响应性基准：后台加载并导出 5 万零件时测量 Qt 事件循环延迟
+
+用 10 ms 周期的 QTimer 探测事件循环，记录相邻两次触发的最大间隔减去周期。
+无显示环境可设置 QT_QPA_PLATFORM=offscreen 运行。
+
+用法：python benchmarks/bench_gui_latency.py [零件数]
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from PyQt5.QtCore import QTimer  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from synthetic import make_parts, write_magics_report  # noqa: E402
+
+PROBE_INTERVAL_MS = 10
+
+
+def load_gui_module():
+    """按文件路径导入 3d_budget_calc_GUI_Read.py（文件名不是合法的模块名）"""
+    spec = importlib.util.spec_from_file_location("gui_read", os.path.join(SRC_DIR, "3d_budget_calc_GUI_Read.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    part_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    app = QApplication(sys.argv)
+    gui = load_gui_module()
+    window = gui.CostCalculatorApp()
+    window.show()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = write_magics_report(os.path.join(tmp, "volume.xlsm"), make_parts(part_count))
+        export_path = os.path.join(tmp, "report.xlsx")
+
+        gaps = []
+        last_tick = [time.perf_counter()]
+
+        def probe():
+            now = time.perf_counter()
+            gaps.append(now - last_tick[0])
+            last_tick[0] = now
+
+        timer = QTimer()
+        timer.timeout.connect(probe)
+        timer.start(PROBE_INTERVAL_MS)
+
+        stages = {}
+
+        def run_stage(name, fn, *args, then):
+            start = time.perf_counter()
+
+            def finished(result):
+                stages[name] = time.perf_counter() - start
+                then(result)
+
+            window.run_in_background(fn, *args, on_finished=finished, error_title=name)
+
+        def export(calculation):
+            run_stage("导出", gui.export_to_excel, calculation[0], export_path, then=lambda _: app.quit())
+
+        def calculate(loaded):
+            window.on_parts_loaded(loaded)
+            run_stage("计算", gui.calculate_task, window.parts, "1天2小时3分4秒",
+                      dict(window.pricing_standard), then=export)
+
+        run_stage("加载", gui.load_parts_task, report_path, then=calculate)
+        app.exec_()
+        timer.stop()
+
+    # 第一次触发包含窗口首次绘制，不计入
+    worst = max(gaps[1:]) * 1e3 - PROBE_INTERVAL_MS
+    for name, seconds in stages.items():
+        print(f"{name}：{seconds:.2f} 秒")
+    print(f"零件数：{part_count}，事件循环最大延迟：{worst:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
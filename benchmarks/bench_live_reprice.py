@@ -0,0 +1,98 @@
+"""实时重算基准：修改定价参数后增量重算并更新报表 与 完整重新计算 对比
+
+先完整计算一次并写入结果框，再逐次修改 "材料单价"/"机时费率"/打印时长，
+直接调用 reprice_live（跳过防抖计时）测量每次改动的耗时，
+最后核对结果框中的报表与按最终参数完整计算的报表一致；
+再勾选成本分布计算一次并修改参数，核对后台重新估计的成本分布写入报表后同样一致。
+无显示环境可设置 QT_QPA_PLATFORM=offscreen 运行。
+
+用法：python benchmarks/bench_live_reprice.py [零件数]
+"""
+import os
+import statistics
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from PyQt5.QtCore import QThreadPool  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from bench_gui_latency import load_gui_module  # noqa: E402
+from synthetic import make_parts  # noqa: E402
+
+EDIT_COUNT = 200
+
+# 含成本分布时的改动次数（每次等后台估计完成再改下一次）
+DISTRIBUTION_EDIT_COUNT = 20
+
+
+def wait_for_fill(app, window):
+    """等待报表分批写入结果框完成"""
+    while window.result_output._fill_timer.isActive():
+        app.processEvents()
+
+
+def main():
+    part_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    gui = load_gui_module()
+    app = QApplication(sys.argv[:1])
+    window = gui.CostCalculatorApp()
+    window.export_checkbox.setChecked(False)
+    window.parts = make_parts(part_count)
+
+    start = time.perf_counter()
+    calculation = gui.calculate_task(window.parts, window.duration_input.text().strip(),
+                                     dict(window.pricing_standard), None)
+    full_time = time.perf_counter() - start
+    window.on_cost_calculated(calculation)
+    wait_for_fill(app, window)
+
+    # 逐次修改参数（blockSignals 避免启动防抖计时，直接测量重算本身）
+    edits = [(window.param_inputs["材料单价"], str(1800 + i)) if i % 3 == 0 else
+             (window.param_inputs["机时费率"], str(250 + i)) if i % 3 == 1 else
+             (window.duration_input, f"{i % 5}天{i % 24}小时")
+             for i in range(EDIT_COUNT)]
+    timings = []
+    for field, text in edits:
+        field.blockSignals(True)
+        field.setText(text)
+        field.blockSignals(False)
+        start = time.perf_counter()
+        window.reprice_live()
+        timings.append(time.perf_counter() - start)
+
+    expected = gui.calculate_task(window.parts, window.duration_input.text().strip(),
+                                  dict(window.pricing_standard), None)[1]
+    assert window.result_output.toPlainText().split("\n") == expected, "增量更新后的报表与完整计算不一致"
+
+    # 成本分布：修改参数后报表先只更新费用明细，分布在后台重新估计后补上
+    window.on_cost_calculated(gui.calculate_task(window.parts, window.duration_input.text().strip(),
+                                                 dict(window.pricing_standard), None, distribution=True))
+    wait_for_fill(app, window)
+    distribution_timings = []
+    for i in range(DISTRIBUTION_EDIT_COUNT):
+        field = window.param_inputs["折扣优惠"]
+        field.blockSignals(True)
+        field.setText(f"{0.8 + i / 100:.2f}")
+        field.blockSignals(False)
+        start = time.perf_counter()
+        window.reprice_live()
+        distribution_timings.append(time.perf_counter() - start)
+        QThreadPool.globalInstance().waitForDone()
+        app.processEvents()
+    expected = gui.calculate_task(window.parts, window.duration_input.text().strip(),
+                                  dict(window.pricing_standard), None, distribution=True)[1]
+    assert window.result_output.toPlainText().split("\n") == expected, "后台更新成本分布后的报表与完整计算不一致"
+
+    print(f"{part_count} 个零件")
+    print(f"完整计算并生成报表：{full_time * 1000:.1f} ms")
+    print(f"增量重算（{EDIT_COUNT} 次改动）：中位数 {statistics.median(timings) * 1000:.3f} ms，"
+          f"最大 {max(timings) * 1000:.3f} ms")
+    print(f"含成本分布时的增量重算（{DISTRIBUTION_EDIT_COUNT} 次改动，主线程部分）："
+          f"中位数 {statistics.median(distribution_timings) * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
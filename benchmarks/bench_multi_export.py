@@ -0,0 +1,60 @@
+"""多批次导出基准：每个批次单独一个工作簿 与 合并到一个工作簿 对比，并检查耗时随批次数线性增长
+
+用法：python benchmarks/bench_multi_export.py [批次数] [每批零件数]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from cost_module import DEFAULT_PRICING_STANDARD, calculate_multipart_cost  # noqa: E402
+from synthetic import make_parts  # noqa: E402
+from xlsx_export import export_builds_to_excel, export_to_excel  # noqa: E402
+
+
+def make_results(build_count, parts_per_build):
+    """生成 build_count 个批次的计价结果 [(批次名称, result)]"""
+    return [
+        (f"build_{i:04d}", calculate_multipart_cost(make_parts(parts_per_build, seed=i), f"{i % 3}天{i % 24}小时",
+                                                    DEFAULT_PRICING_STANDARD))
+        for i in range(build_count)
+    ]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def export_separately(results, directory):
+    for name, result in results:
+        export_to_excel(result, os.path.join(directory, f"{name}.xlsx"))
+
+
+def main():
+    build_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    parts_per_build = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    results = make_results(build_count, parts_per_build)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        separate = timed(export_separately, results, tmp)
+        combined = timed(export_builds_to_excel, results, os.path.join(tmp, "combined.xlsx"))
+        summary_only = timed(export_builds_to_excel, results, os.path.join(tmp, "summary.xlsx"), detail_sheets=False)
+        print(f"{build_count} 个批次，每批 {parts_per_build} 个零件")
+        print(f"逐个工作簿：{separate:.2f} 秒")
+        print(f"合并工作簿：{combined:.2f} 秒（加速 {separate / combined:.1f}x）；仅汇总表：{summary_only:.2f} 秒")
+
+        # 线性检查：每批次耗时在不同规模下应基本不变
+        for count in (build_count // 4, build_count // 2, build_count):
+            seconds = timed(export_builds_to_excel, results[:count], os.path.join(tmp, f"scale_{count}.xlsx"))
+            print(f"  {count:>5} 个批次：{seconds:.2f} 秒，每批次 {seconds / count * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
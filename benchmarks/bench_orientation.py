@@ -0,0 +1,70 @@
+"""成型方向优化基准：对竖放的 20 × 20 × 80 mm 长方体网格搜索 500 个候选方向（平放时层数最少）
+
+分别用 1 个进程和全部 CPU 核数计算，核对两者结果一致，
+并核对若干方向的评估结果与把网格旋转后调用 support_estimator.estimate_support 的结果一致。
+
+用法：python benchmarks/bench_orientation.py [候选方向数] [每个面的细分数]
+"""
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from orientation import optimize_orientation, rotation_angles  # noqa: E402
+from support_estimator import estimate_support  # noqa: E402
+from synthetic import cube_triangles, write_binary_stl  # noqa: E402
+
+# 长方体的长、宽、高（mm）
+BOX = (20.0, 20.0, 80.0)
+
+
+def rotation_matrix(about_x, about_y):
+    """先绕 X 轴、再绕 Y 轴旋转（角度）的矩阵"""
+    a, b = math.radians(about_x), math.radians(about_y)
+    rx = np.array([[1, 0, 0], [0, math.cos(a), -math.sin(a)], [0, math.sin(a), math.cos(a)]])
+    ry = np.array([[math.cos(b), 0, math.sin(b)], [0, 1, 0], [-math.sin(b), 0, math.cos(b)]])
+    return ry @ rx
+
+
+def main():
+    candidates = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    subdivisions = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    mesh = cube_triangles(1.0, subdivisions) * np.array(BOX, dtype=np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "part.stl")
+        write_binary_stl(path, mesh)
+        print(f"{len(mesh):,} 个三角形，{candidates} 个候选方向")
+
+        results = {}
+        for workers in sorted({1, os.cpu_count()}):
+            start = time.perf_counter()
+            results[workers] = optimize_orientation(path, candidates, workers=workers)
+            print(f"  {workers} 个进程：{time.perf_counter() - start:.2f} 秒")
+
+    result = results[1]
+    for other in results.values():
+        assert np.array_equal(other['candidates']['cost'], result['candidates']['cost']), "多进程结果不一致"
+
+    evaluated = result['candidates']
+    for index in np.linspace(0, candidates - 1, 5).astype(int):
+        rotated = mesh.astype(np.float64) @ rotation_matrix(*rotation_angles(evaluated['direction'][index])).T
+        expected = estimate_support(rotated)['support_volume']
+        assert math.isclose(evaluated['support_volume'][index], expected, rel_tol=1e-9, abs_tol=1e-6), index
+
+    current = result['current']
+    print(f"当前摆放：支撑 {current['support_volume']:.0f} mm³，高度 {current['height']:.1f} mm，"
+          f"实际费用 {current['quote']['计算明细']['实际费用']:.2f} 元")
+    print(f"最优方向 {tuple(round(v, 3) for v in result['direction'])}：支撑 {result['support_volume']:.0f} mm³，"
+          f"高度 {result['height']:.1f} mm，实际费用 {result['quote']['计算明细']['实际费用']:.2f} 元")
+    assert result['quote']['计算明细']['实际费用'] <= current['quote']['计算明细']['实际费用']
+    assert math.isclose(result['height'], min(BOX)) and result['support_volume'] == 0, "长方体应平放"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""零件报价历史基准：200 万个零件行中查找以前报价过的零件
+
+写入 2 万次报价（每次 100 个零件，零件名称在 5 万种中随机抽取）后，
+测量单个零件查找的耗时和一份 1 万个零件的报告整体查找的耗时，并核对查到的是最近一次报价。
+
+用法：python benchmarks/bench_part_history.py [报价数]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from cost_module import DEFAULT_PRICING_STANDARD  # noqa: E402
+from part_history import PartHistory  # noqa: E402
+from result_model import PartTable  # noqa: E402
+
+PARTS_PER_QUOTE = 100
+
+# 零件的种类数（名称 + 体积）
+PART_KINDS = 50000
+
+# 每个事务写入的报价数
+BATCH_QUOTES = 1000
+
+
+def synthetic_records(count, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [f"DN{20 + i % 30}m6-金属橡胶-{i}.step" for i in range(PART_KINDS)]
+    volumes = np.round(rng.uniform(100, 50000, PART_KINDS), 3)
+    for i in range(count):
+        kinds = rng.integers(0, PART_KINDS, PARTS_PER_QUOTE)
+        parts = PartTable.from_parts([{'name': names[k], 'volume': float(volumes[k])} for k in kinds])
+        yield {"时间": f"2026-01-01T00:00:{i % 60:02d}", "机时": float(rng.uniform(1, 100)),
+               "总体积": parts.total_volume(), "总费用": float(i), "实际费用": float(i),
+               **DEFAULT_PRICING_STANDARD, 'parts': parts}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        history = PartHistory(os.path.join(tmp, "history.sqlite3"))
+        records = list(synthetic_records(count))
+        start = time.perf_counter()
+        for offset in range(0, count, BATCH_QUOTES):
+            history.add_quotes(records[offset:offset + BATCH_QUOTES])
+        quotes, rows = history.stats()
+        print(f"写入 {quotes:,} 次报价、{rows:,} 个零件行：{time.perf_counter() - start:.2f} 秒")
+
+        # 最后一次报价中的零件：查到的应是该次报价（实际费用即报价序号）
+        last = records[-1]['parts']
+        timings = []
+        for name, volume in zip(last.names, last.volumes):
+            start = time.perf_counter()
+            prior = history.lookup_part(name, volume)
+            timings.append(time.perf_counter() - start)
+            assert prior is not None and prior["分摊费用"] > 0
+        print(f"单个零件查找：中位数 {np.median(timings) * 1000:.3f} ms，最大 {max(timings) * 1000:.3f} ms")
+        prior = history.lookup_part(last.names[0], last.volumes[0])
+        volume = last.volumes[0] + last.support_volumes[0]
+        expected = (count - 1) * volume / records[-1]['总体积']
+        assert last.names.count(last.names[0]) > 1 or np.isclose(prior["分摊费用"], expected), (prior, expected)
+        assert history.lookup_part(last.names[0], last.volumes[0] + 1) is None
+
+        report = PartTable.from_parts([{'name': name, 'volume': volume}
+                                       for record in records[-PARTS_PER_QUOTE:] for name, volume
+                                       in zip(record['parts'].names, record['parts'].volumes)]
+                                      + [{'name': "新零件.step", 'volume': 1.0}])
+        start = time.perf_counter()
+        found = history.lookup(report)
+        elapsed = time.perf_counter() - start
+        assert found[-1] is None and all(item is not None for item in found[:-1])
+        print(f"{len(report):,} 个零件的报告整体查找：{elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""定价敏感性分析基准：10 个批次 × 材料单价 100 × 机时费率 100 × 折扣优惠 10 = 100 万个组合
+
+核对随机抽取的单元格与用该组定价调用 calculate_multipart_cost 的结果完全一致，
+并分别测量导出热力图工作簿（小网格）和 CSV 明细（全部组合）的耗时。
+
+用法：python benchmarks/bench_pricing_sweep.py [批次数]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from batch_pricing import COST_COLUMNS  # noqa: E402
+from cost_module import DEFAULT_PRICING_STANDARD, calculate_multipart_cost, format_duration  # noqa: E402
+from pricing_sweep import parse_range, sweep_costs, write_sweep_csv, write_sweep_workbook  # noqa: E402
+
+RANGES = {"材料单价": "1500:2100:100", "机时费率": "150:350:100", "折扣优惠": "0.8:1.0:10"}
+
+# 核对的单元格数
+CHECK_COUNT = 200
+
+
+def main():
+    build_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rng = np.random.default_rng(0)
+    # 机时取整到秒，使 format_duration 转换回去的时长与之相同
+    builds = [(f"build_{i}", float(rng.uniform(1e4, 1e6)), round(rng.uniform(600, 5 * 86400)) / 3600)
+              for i in range(build_count)]
+    ranges = {param: parse_range(spec) for param, spec in RANGES.items()}
+
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        sweep = sweep_costs(builds, ranges)
+        best = min(best, time.perf_counter() - start)
+    cells = sweep["costs"]["实际费用"].size
+    print(f"{cells:,} 个组合：{best * 1000:.0f} ms")
+
+    for _ in range(CHECK_COUNT):
+        index = tuple(int(rng.integers(n)) for n in sweep["costs"]["实际费用"].shape)
+        name, volume, hours = builds[index[0]]
+        pricing = dict(DEFAULT_PRICING_STANDARD)
+        for (param, values), k in zip(sweep["parameters"], index[1:]):
+            pricing[param] = float(values[k])
+        expected = calculate_multipart_cost([{"name": name, "volume": volume}], format_duration(hours * 3600), pricing)
+        for column in COST_COLUMNS:
+            assert sweep["costs"][column][index] == expected["计算明细"][column], (index, column)
+    print(f"抽查 {CHECK_COUNT} 个单元格与 calculate_multipart_cost 一致")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        small = sweep_costs(builds, {"材料单价": parse_range("1500:2100:13"), "机时费率": parse_range("150:350:21")})
+        start = time.perf_counter()
+        write_sweep_workbook(small, os.path.join(tmp, "sweep.xlsx"))
+        print(f"热力图工作簿（{small['costs']['实际费用'].size:,} 个组合）：{time.perf_counter() - start:.2f} 秒")
+        start = time.perf_counter()
+        write_sweep_csv(sweep, os.path.join(tmp, "sweep.csv"))
+        print(f"CSV 明细（{cells:,} 行）：{time.perf_counter() - start:.2f} 秒")
+
+
+if __name__ == "__main__":
+    main()
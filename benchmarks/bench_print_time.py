@@ -0,0 +1,53 @@
+"""打印时长估算基准：切片约 100 万个三角形的网格，并核对立方体的扫描时间解析解
+
+立方体每层截面面积为 边长²、周长为 4 × 边长，扫描时间可以直接算出；
+另外分别用 1 个线程和全部 CPU 核数切片，比较按层并行的效果。
+
+用法：python benchmarks/bench_print_time.py [每个面的细分数]
+"""
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from cost_module import convert_duration_to_hours  # noqa: E402
+from print_time import DEFAULT_PRINT_PARAMETERS, estimate_build_time, estimate_part_time  # noqa: E402
+from synthetic import cube_triangles  # noqa: E402
+
+SIDE = 50.0
+
+
+def main():
+    subdivisions = int(sys.argv[1]) if len(sys.argv) > 1 else 289
+    mesh = cube_triangles(SIDE, subdivisions)
+    parameters = DEFAULT_PRINT_PARAMETERS
+
+    timings = {}
+    for workers in sorted({1, os.cpu_count()}):
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            part = estimate_part_time(mesh, workers=workers)
+            best = min(best, time.perf_counter() - start)
+        timings[workers] = best
+
+    layers = math.ceil(SIDE / parameters["层厚"])
+    # 最后一层的切平面高于立方体顶面，没有截面
+    expected = (min(layers, math.floor(SIDE / parameters["层厚"] + 0.5))
+                * (SIDE ** 2 / (parameters["扫描间距"] * parameters["扫描速度"]) + 4 * SIDE / parameters["扫描速度"]))
+    assert abs(part['scan_seconds'] - expected) < 1e-6 * expected, (part['scan_seconds'], expected)
+
+    build = estimate_build_time([part, part])
+    assert abs(convert_duration_to_hours(build['duration']) - build['hours']) < 1 / 3600
+
+    print(f"{len(mesh):,} 个三角形，{part['layers']} 层")
+    for workers, seconds in timings.items():
+        print(f"  切片 + 扫描时间（{workers} 个线程）：{seconds:.3f} 秒")
+    print(f"单个零件扫描 {part['scan_seconds'] / 3600:.2f} 小时（解析解 {expected / 3600:.2f} 小时）")
+    print(f"两个零件同版：{build['duration']}（铺粉 {build['recoat_seconds'] / 3600:.2f} 小时）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""报价归档基准：100 万个历史报价（每个 5 个零件），按月汇总、按零件名称和费用区间查询
+
+报价按 CHUNK_QUOTES 分块整块写入；另外逐条追加若干报价，检查小块自动合并后的查询结果，
+并核对各项查询与直接对内存中的数组过滤的结果一致。
+
+用法：python benchmarks/bench_quote_archive.py [报价数]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from cost_module import DEFAULT_PRICING_STANDARD, calculate_multipart_cost  # noqa: E402
+from quote_archive import CHUNK_QUOTES, COMPACT_CHUNKS, QuoteArchive, quote_record  # noqa: E402
+from synthetic import make_parts  # noqa: E402
+
+PARTS_PER_QUOTE = 5
+
+# 零件名称的种类数（同名零件反复报价）
+NAME_COUNT = 20000
+
+
+def synthetic_columns(count, seed=0):
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2024-01-01T00:00:00", "s")
+    times = start + np.sort(rng.integers(0, 3 * 365 * 86400, count)).astype("timedelta64[s]")
+    costs = rng.lognormal(9, 0.8, count)
+    quotes = {"时间": times, "机时": rng.uniform(1, 120, count), "总体积": rng.uniform(1e4, 1e7, count),
+              "零件数量": np.full(count, PARTS_PER_QUOTE), "实际费用": costs, "总费用": costs,
+              **{param: np.full(count, value) for param, value in DEFAULT_PRICING_STANDARD.items()}}
+    names = np.array([f"历史零件-{i}.step" for i in range(NAME_COUNT)])
+    part_names = names[rng.integers(0, NAME_COUNT, count * PARTS_PER_QUOTE)]
+    return quotes, part_names
+
+
+def timed(label, fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label}：{best * 1000:.0f} ms")
+    return value
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    quotes, part_names = synthetic_columns(count)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = QuoteArchive(os.path.join(tmp, "archive"))
+        start = time.perf_counter()
+        for offset in range(0, count, CHUNK_QUOTES):
+            rows = slice(offset, offset + CHUNK_QUOTES)
+            size = len(quotes["时间"][rows])
+            archive.append_columns({column: values[rows] for column, values in quotes.items()}, {
+                "零件报价": np.repeat(np.arange(size), PARTS_PER_QUOTE),
+                "零件名称": part_names[offset * PARTS_PER_QUOTE:(offset + size) * PARTS_PER_QUOTE],
+                "零件体积": np.ones(size * PARTS_PER_QUOTE), "零件支撑体积": np.zeros(size * PARTS_PER_QUOTE)})
+        print(f"写入 {count:,} 个报价（{count * PARTS_PER_QUOTE:,} 个零件）：{time.perf_counter() - start:.2f} 秒")
+
+        monthly = timed("全部报价按月汇总", lambda: archive.aggregate(by="月"))
+        assert monthly["报价数"].sum() == count
+        assert np.isclose(monthly["实际费用"].sum(), quotes["实际费用"].sum())
+        months = quotes["时间"].astype("datetime64[M]")
+        first = months == months.min()
+        assert monthly["报价数"][0] == first.sum() and np.isclose(monthly["实际费用"][0], quotes["实际费用"][first].sum())
+
+        lo, hi = 5000.0, 20000.0
+        band = timed("费用区间 + 时间范围", lambda: archive.aggregate(
+            start="2025-01-01", end="2026-01-01", cost_min=lo, cost_max=hi))
+        expected = ((quotes["实际费用"] >= lo) & (quotes["实际费用"] <= hi)
+                    & (quotes["时间"] >= np.datetime64("2025-01-01")) & (quotes["时间"] < np.datetime64("2026-01-01")))
+        assert band["报价数"][0] == expected.sum()
+
+        name = part_names[0]
+        found = timed(f"包含零件 {name} 的报价", lambda: archive.query(["时间", "实际费用"], part_name=name))
+        expected = np.unique(np.nonzero(part_names == name)[0] // PARTS_PER_QUOTE)
+        assert np.array_equal(np.sort(found["时间"]), np.sort(quotes["时间"][expected]))
+        print(f"  {len(found['时间'])} 个报价")
+
+        # 逐条追加：小块达到 COMPACT_CHUNKS 个时自动合并
+        result = calculate_multipart_cost(make_parts(3), "1天2小时", DEFAULT_PRICING_STANDARD)
+        for _ in range(COMPACT_CHUNKS + 3):
+            archive.append([quote_record(result)])
+        assert len(archive.chunks()) <= -(-count // CHUNK_QUOTES) + 4, archive.chunks()
+        recent = archive.query(["实际费用"], part_name="DN21m6-金属橡胶-1.step")
+        assert len(recent["实际费用"]) == COMPACT_CHUNKS + 3
+        assert (recent["实际费用"] == result["计算明细"]["实际费用"]).all()
+        print(f"逐条追加 {COMPACT_CHUNKS + 3} 个报价后共 {len(archive.chunks())} 个块，查询结果一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""报价缓存基准：首次加载/计算 与 命中缓存 对比，并检查 LRU 淘汰后的缓存大小不超过上限
+
+用法：python benchmarks/bench_quote_cache.py [零件数]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from cost_module import DEFAULT_PRICING_STANDARD  # noqa: E402
+from quote_cache import QuoteCache  # noqa: E402
+from synthetic import make_parts, write_magics_report  # noqa: E402
+from bench_gui_latency import load_gui_module  # noqa: E402
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        value = fn(*args, **kwargs)
+    return time.perf_counter() - start, value
+
+
+def main():
+    part_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    gui = load_gui_module()
+    pricing = dict(DEFAULT_PRICING_STANDARD)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = write_magics_report(os.path.join(tmp, "volume.xlsm"), make_parts(part_count))
+        cache = QuoteCache(os.path.join(tmp, "cache.sqlite3"))
+
+        cold_load, (parts, _, digest, _) = timed(gui.load_parts_task, report_path, None, cache=cache)
+        warm_load, (cached_parts, _, _, _) = timed(gui.load_parts_task, report_path, None, cache=cache)
+        assert cached_parts == parts
+
+        cold_calc, (result, _, _) = timed(gui.calculate_task, parts, "1天2小时", pricing, None,
+                                          cache=cache, parts_digest=digest)
+        warm_calc, (cached_result, _, _) = timed(gui.calculate_task, parts, "1天2小时", pricing, None,
+                                                 cache=cache, parts_digest=digest)
+        assert cached_result['计算明细'] == result['计算明细']
+
+        print(f"{part_count} 个零件")
+        print(f"加载：首次 {cold_load:.2f} 秒，命中缓存 {warm_load:.2f} 秒（加速 {cold_load / warm_load:.1f}x）")
+        print(f"计算：首次 {cold_calc:.3f} 秒，命中缓存 {warm_calc:.3f} 秒")
+
+        # LRU：上限设为约 3 份零件清单，写入 10 份后最早的条目应被淘汰
+        entry_size = cache.stats()[1]
+        small = QuoteCache(os.path.join(tmp, "small.sqlite3"), max_bytes=entry_size * 3)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(10):
+                small.put_parts(f"report{i}", parts)
+        count, size = small.stats()
+        assert size <= small.max_bytes and small.get_parts("report0") is None and small.get_parts("report9")
+        print(f"LRU：上限 {small.max_bytes / 2 ** 20:.1f} MB，写入 10 份后保留 {count} 份，共 {size / 2 ** 20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""报价服务负载测试：在本机启动 quote_server，用多个 keep-alive 连接并发发送报价请求
+
+分别测量合并批量计算（缺省）与逐个计算（--max-batch 1）时的吞吐量和延迟，
+并核对部分响应与本地调用 calculate_multipart_cost 的结果完全一致。
+服务只监听 127.0.0.1，负载测试不会访问其他主机。
+
+用法：python benchmarks/bench_quote_server.py [请求数] [并发连接数] [客户端进程数]
+"""
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from cost_module import apply_pricing_overrides, calculate_multipart_cost  # noqa: E402
+
+HOST = "127.0.0.1"
+
+# 核对结果的响应个数
+CHECK_COUNT = 500
+
+
+def make_requests(count, seed=0):
+    """合成报价请求：每单 1~20 个零件，约十分之一的请求覆盖材料单价或折扣"""
+    rng = random.Random(seed)
+    requests = []
+    for i in range(count):
+        parts = [{"name": f"DN{20 + j}-{i}.step", "volume": rng.uniform(100, 50000), "support_volume": rng.uniform(0, 5000)}
+                 for j in range(rng.randint(1, 20))]
+        seconds = rng.randint(600, 10 * 86400)
+        request = {"parts": parts,
+                   "duration": f"{seconds // 86400}天{seconds % 86400 // 3600}小时{seconds % 3600 // 60}分{seconds % 60}秒"}
+        if i % 10 == 0:
+            request["pricing"] = {"材料单价": rng.choice((1700, 1900)), "折扣优惠": rng.choice((0.9, 0.95))}
+        requests.append(request)
+    return requests
+
+
+def encode_request(request):
+    body = json.dumps(request, ensure_ascii=False).encode("utf-8")
+    return (f"POST /quote HTTP/1.1\r\nHost: {HOST}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode("ascii") + body
+
+
+async def read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def run_connections(port, payloads, connections):
+    """connections 个连接分担 payloads，返回 [(请求序号, 状态码, 响应体, 延迟秒)]"""
+    results = []
+
+    async def client(indices):
+        reader, writer = await asyncio.open_connection(HOST, port)
+        for index in indices:
+            start = time.perf_counter()
+            writer.write(payloads[index])
+            status, body = await read_response(reader)
+            results.append((index, status, body, time.perf_counter() - start))
+        writer.close()
+
+    await asyncio.gather(*(client(range(i, len(payloads), connections)) for i in range(connections)))
+    return results
+
+
+def client_process(port, requests, connections, keep_bodies):
+    """一个客户端进程：返回 (状态码列表, 延迟列表, 需要核对的 {序号: 响应 JSON})"""
+    payloads = [encode_request(request) for request in requests]
+    results = asyncio.run(run_connections(port, payloads, connections))
+    checked = {index: json.loads(body) for index, _, body, _ in results if index < keep_bodies}
+    return [status for _, status, _, _ in results], [latency for *_, latency in results], checked
+
+
+def start_server(*options):
+    server = subprocess.Popen([sys.executable, os.path.join(SRC_DIR, "quote_server.py"), "--host", HOST,
+                               "--port", "0", *options], stdout=subprocess.PIPE, text=True, encoding="utf-8")
+    port = int(server.stdout.readline().strip().rsplit(":", 1)[1])
+    return server, port
+
+
+def run_load(requests, connections, processes, *options):
+    server, port = start_server(*options)
+    try:
+        shares = [requests[i::processes] for i in range(processes)]
+        with ProcessPoolExecutor(processes) as pool:
+            start = time.perf_counter()
+            outputs = list(pool.map(client_process, [port] * processes, shares,
+                                    [max(connections // processes, 1)] * processes,
+                                    [CHECK_COUNT // processes] * processes))
+            elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+    statuses = [status for output in outputs for status in output[0]]
+    latencies = sorted(latency for output in outputs for latency in output[1])
+    assert statuses.count(200) == len(requests), f"有 {len(requests) - statuses.count(200)} 个请求失败"
+
+    # 核对：第 p 个客户端进程的第 i 个请求是原列表中的第 i * processes + p 个
+    for p, output in enumerate(outputs):
+        for index, response in output[2].items():
+            request = requests[index * processes + p]
+            expected = calculate_multipart_cost(request["parts"], request["duration"],
+                                                apply_pricing_overrides(request.get("pricing", {})))
+            assert response["计算明细"] == expected["计算明细"], f"第 {index * processes + p} 个请求的结果不一致"
+    return elapsed, latencies
+
+
+def main():
+    request_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    requests = make_requests(request_count)
+    print(f"{request_count} 个报价请求，{connections} 个并发连接，{processes} 个客户端进程")
+
+    for label, options in (("合并批量计算", ()), ("逐个计算", ("--max-batch", "1"))):
+        elapsed, latencies = run_load(requests, connections, processes, *options)
+        print(f"{label}：{request_count / elapsed:,.0f} 次/秒，延迟 中位数 {statistics.median(latencies) * 1000:.2f} ms，"
+              f"P99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
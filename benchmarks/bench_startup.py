@@ -0,0 +1,54 @@
+"""启动基准：从进程启动到主窗口可见的耗时
+
+对比两种方式（各运行多次取中位数）：
+  eager：启动前先导入 pandas 和 openpyxl，模拟原来在模块顶层导入的写法
+  lazy ：当前写法，Excel 相关的库在第一次加载/导出时才导入
+无显示环境可设置 QT_QPA_PLATFORM=offscreen 运行。
+
+用法：python benchmarks/bench_startup.py [重复次数]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+CHILD_SCRIPT = """
+import sys, time
+start = float(sys.argv[1])
+if sys.argv[2] == "eager":
+    import pandas, openpyxl
+import importlib.util
+spec = importlib.util.spec_from_file_location("gui_read", "3d_budget_calc_GUI_Read.py")
+gui = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(gui)
+app = gui.QApplication(sys.argv[:1])
+window = gui.CostCalculatorApp()
+window.show()
+app.processEvents()
+heavy = [name for name in ("pandas", "openpyxl") if name in sys.modules]
+print(time.time() - start, ",".join(heavy) or "-")
+"""
+
+
+def time_to_window(mode):
+    start = time.time()
+    output = subprocess.run([sys.executable, "-c", CHILD_SCRIPT, repr(start), mode], cwd=SRC_DIR,
+                            capture_output=True, text=True, check=True).stdout.split()
+    return float(output[0]), output[1]
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = {}
+    for mode in ("eager", "lazy"):
+        runs = [time_to_window(mode) for _ in range(repeat)]
+        results[mode] = statistics.median(seconds for seconds, _ in runs)
+        print(f"{mode}：窗口可见耗时 {results[mode] * 1e3:.0f} ms（已加载的 Excel 库：{runs[-1][1]}）")
+    print(f"启动耗时降低 {1 - results['lazy'] / results['eager']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
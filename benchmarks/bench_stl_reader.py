@@ -0,0 +1,72 @@
+"""STL 读取基准：mmap + 向量化计算 与 逐个三角形 struct 解析 对比
+
+生成细分立方体的二进制 STL（体积、表面积已知），核对计算结果，
+并用 tracemalloc 检查内存峰值只与分块大小有关、与三角形数量无关。
+
+用法：python benchmarks/bench_stl_reader.py [每个面的细分数]
+"""
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from stl_reader import read_stl_part  # noqa: E402
+from synthetic import cube_triangles, write_binary_stl  # noqa: E402
+
+SIDE = 100.0
+
+
+def read_with_struct(file_path):
+    """逐个三角形用 struct 解析（纯 Python 对照实现）"""
+    volume = 0.0
+    with open(file_path, 'rb') as f:
+        f.seek(80)
+        count = struct.unpack('<I', f.read(4))[0]
+        record = struct.Struct('<12fH')
+        for _ in range(count):
+            values = record.unpack(f.read(50))
+            x0, y0, z0, x1, y1, z1, x2, y2, z2 = values[3:12]
+            volume += (x0 * (y1 * z2 - z1 * y2) - y0 * (x1 * z2 - z1 * x2) + z0 * (x1 * y2 - y1 * x2)) / 6
+    return abs(volume)
+
+
+def main():
+    subdivisions = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_binary_stl(os.path.join(tmp, "cube.stl"), cube_triangles(SIDE, subdivisions, (10, 20, 30)))
+        size_mb = os.path.getsize(path) / 2 ** 20
+
+        read_stl_part(path)  # 预热页缓存
+        start = time.perf_counter()
+        part = read_stl_part(path)
+        fast = time.perf_counter() - start
+
+        tracemalloc.start()
+        read_stl_part(path)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        assert abs(part['volume'] - SIDE ** 3) < 1e-6 * SIDE ** 3, part['volume']
+        assert abs(part['surface_area'] - 6 * SIDE ** 2) < 1e-6 * SIDE ** 2, part['surface_area']
+        assert part['bbox_min'] == (10, 20, 30) and part['bbox_max'] == (110, 120, 130)
+
+        print(f"{part['triangles']:,} 个三角形（{size_mb:.0f} MB）")
+        print(f"mmap + 向量化：{fast:.3f} 秒，内存峰值 {peak / 2 ** 20:.0f} MB")
+        print(f"  体积 {part['volume']:,.3f} mm³，表面积 {part['surface_area']:,.3f} mm²，"
+              f"包围盒 {part['bbox_min']} ~ {part['bbox_max']}")
+
+        # struct 逐个解析太慢，只取约 20 万个三角形测量后按比例换算
+        sample = write_binary_stl(os.path.join(tmp, "sample.stl"), cube_triangles(SIDE, 130))
+        start = time.perf_counter()
+        read_with_struct(sample)
+        per_triangle = (time.perf_counter() - start) / (12 * 130 ** 2)
+        print(f"struct 逐个解析（按 {12 * 130 ** 2:,} 个三角形换算）：约 {per_triangle * part['triangles']:.1f} 秒"
+              f"（加速 {per_triangle * part['triangles'] / fast:.0f}x）")
+
+
+if __name__ == "__main__":
+    main()
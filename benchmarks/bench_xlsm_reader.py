@@ -0,0 +1,41 @@
+"""xlsm 零件清单读取基准：openpyxl 整表加载 / openpyxl 流式加载 / XML 快速路径
+
+用法：python benchmarks/bench_xlsm_reader.py [零件数]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bench_excel_loader import load_parts_full_mode  # noqa: E402
+from excel_loader import iter_parts  # noqa: E402
+from synthetic import make_parts, write_magics_report  # noqa: E402
+from xlsm_fast_reader import read_parts_xml  # noqa: E402
+
+
+def timed(reader, file_path):
+    start = time.perf_counter()
+    parts = list(reader(file_path))
+    return parts, time.perf_counter() - start
+
+
+def main():
+    part_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = write_magics_report(os.path.join(tmp, "volume.xlsm"), make_parts(part_count))
+
+        baseline, full_time = timed(load_parts_full_mode, file_path)
+        streamed, stream_time = timed(iter_parts, file_path)
+        fast, xml_time = timed(read_parts_xml, file_path)
+        assert baseline == streamed == fast
+
+    print(f"零件数：{part_count}")
+    print(f"openpyxl 整表加载：{full_time:.2f} 秒")
+    print(f"openpyxl 流式加载：{stream_time:.2f} 秒（加速 {full_time / stream_time:.1f}x）")
+    print(f"XML 快速路径：    {xml_time:.2f} 秒（加速 {full_time / xml_time:.1f}x）")
+
+
+if __name__ == "__main__":
+    main()
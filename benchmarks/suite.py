@@ -0,0 +1,207 @@
+"""基准测试套件：按零件规模分别测量解析、计价、报表和导出各环节的耗时
+
+测量的环节（每个规模分别计时，取多次运行中的最短时间）：
+  duration：convert_duration_to_hours 解析与零件数相同个数的不同时长字符串（先清空 LRU 缓存）
+  load    ：从 Magics 体积报告（.xlsm）读取零件清单（XML 快速路径）
+  calculate：calculate_multipart_cost
+  format  ：format_terminal_output 生成终端报表
+  export  ：export_to_excel 导出预算报表
+
+用法：
+    python benchmarks/suite.py run --output base.json
+    python benchmarks/suite.py run --sizes 10,1000,100000 --output new.json
+    python benchmarks/suite.py compare base.json new.json --threshold 0.1
+
+compare 对两次结果逐项比较，耗时增加超过阈值的记为回归并以退出码 1 结束，便于在脚本中使用。
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from cost_module import DEFAULT_PRICING_STANDARD, calculate_multipart_cost, convert_duration_to_hours  # noqa: E402
+from excel_loader import load_parts  # noqa: E402
+from synthetic import make_parts, write_magics_report  # noqa: E402
+from xlsm_fast_reader import read_parts  # noqa: E402
+from xlsx_export import MAX_SHEET_ROWS, budget_sheet_rows, export_to_excel  # noqa: E402
+
+DEFAULT_SIZES = (10, 1000, 10000, 100000, 1000000)
+STAGES = ("duration", "load", "calculate", "format", "export")
+
+# 结果文件格式版本
+RESULT_VERSION = 1
+
+
+def load_gui_module():
+    """按文件路径导入 3d_budget_calc_GUI_Read.py（只用其中的报表格式化函数）"""
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location("gui_read", os.path.join(SRC_DIR, "3d_budget_calc_GUI_Read.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def repeats_for(size):
+    """小规模多跑几次取最短时间，百万级只跑一次"""
+    return 5 if size <= 10000 else 3 if size <= 100000 else 1
+
+
+def best_time(fn, repeats):
+    """运行 repeats 次，返回最短耗时（秒）；被测函数的终端输出被丢弃"""
+    best = float("inf")
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def make_durations(count):
+    """count 个互不相同的时长字符串，混合中文、英文和 HH:MM:SS 格式"""
+    formats = ("{d}天{h}小时{m}分{s}秒", "{d}d {h}h {m}m {s}s", "{hh}:{m:02d}:{s:02d}")
+    return [
+        formats[i % 3].format(d=i // 1440 % 30, h=i // 60 % 24, m=i % 60, s=i * 7 % 60, hh=i // 60)
+        for i in range(count)
+    ]
+
+
+def run_size(size, stages, format_terminal_output, tmp):
+    """测量一个规模下的各环节，返回结果记录列表"""
+    repeats = repeats_for(size)
+    parts = make_parts(size)
+    records = []
+
+    def record(stage, fn):
+        if stage in stages:
+            seconds = best_time(fn, repeats)
+            records.append({"stage": stage, "parts": size, "seconds": seconds, "repeats": repeats})
+            print(f"  {stage:<10}{size:>9} 个零件：{seconds * 1000:>10.2f} ms")
+
+    durations = make_durations(size)
+
+    def parse_durations():
+        convert_duration_to_hours.cache_clear()
+        for duration in durations:
+            convert_duration_to_hours(duration)
+    record("duration", parse_durations)
+
+    if "load" in stages:
+        report_path = write_magics_report(os.path.join(tmp, f"volume_{size}.xlsm"), parts)
+        record("load", lambda: load_parts(report_path, reader=read_parts))
+        os.remove(report_path)
+
+    result = calculate_multipart_cost(parts, "1天2小时3分4秒", DEFAULT_PRICING_STANDARD)
+    record("calculate", lambda: calculate_multipart_cost(parts, "1天2小时3分4秒", DEFAULT_PRICING_STANDARD))
+    record("format", lambda: format_terminal_output(result))
+    export_path = os.path.join(tmp, "report.xlsx")
+    if budget_sheet_rows(result) > MAX_SHEET_ROWS:
+        # 预算报表每个零件 3 行，约 35 万个零件以上放不进一个 Excel 工作表
+        if "export" in stages:
+            print(f"  {'export':<10}{size:>9} 个零件：超出 Excel 行数上限，跳过")
+    else:
+        record("export", lambda: export_to_excel(result, export_path))
+    return records
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    sizes = [int(size) for size in args.sizes.split(",")] if args.sizes else list(DEFAULT_SIZES)
+    stages = set(args.stages.split(",")) if args.stages else set(STAGES)
+    unknown = stages - set(STAGES)
+    if unknown:
+        raise SystemExit(f"未知的环节：{'、'.join(sorted(unknown))}（可选：{', '.join(STAGES)}）")
+
+    format_terminal_output = load_gui_module().format_terminal_output
+    records = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            print(f"{size} 个零件")
+            records.extend(run_size(size, stages, format_terminal_output, tmp))
+
+    output = {
+        "version": RESULT_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": records,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存至：{args.output}")
+    return 0
+
+
+def compare(args):
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    base_times = {(r["stage"], r["parts"]): r["seconds"] for r in base["results"]}
+
+    print(f"基准：{base.get('revision') or '-'}（{base.get('created')}）  对比：{new.get('revision') or '-'}（{new.get('created')}）")
+    print(f"{'环节':<10}{'零件数':>9}{'基准 ms':>12}{'对比 ms':>12}{'变化':>9}")
+    regressions = 0
+    for r in new["results"]:
+        key = (r["stage"], r["parts"])
+        if key not in base_times:
+            continue
+        before, after = base_times[key], r["seconds"]
+        change = after / before - 1 if before > 0 else 0.0
+        # 两次都低于 min_seconds 的项计时噪声太大，不参与判定
+        regressed = change > args.threshold and max(before, after) >= args.min_seconds
+        regressions += regressed
+        flag = "  ← 回归" if regressed else ""
+        print(f"{r['stage']:<10}{r['parts']:>9}{before * 1000:>12.2f}{after * 1000:>12.2f}{change:>+9.1%}{flag}")
+
+    if regressions:
+        print(f"\n{regressions} 项耗时增加超过 {args.threshold:.0%}")
+        return 1
+    print("\n没有发现回归")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="成本计算各环节的基准测试套件")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="运行基准测试并保存结果")
+    run_parser.add_argument("--sizes", help=f"逗号分隔的零件数（缺省 {','.join(map(str, DEFAULT_SIZES))}）")
+    run_parser.add_argument("--stages", help=f"逗号分隔的环节（缺省全部：{','.join(STAGES)}）")
+    run_parser.add_argument("--output", default="bench_results.json", help="结果文件（JSON）")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="比较两次结果并标出回归")
+    compare_parser.add_argument("base", help="基准结果文件")
+    compare_parser.add_argument("new", help="对比结果文件")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="判定为回归的耗时增幅（缺省 0.1 即 10%%）")
+    compare_parser.add_argument("--min-seconds", type=float, default=0.001,
+                                help="两次都短于此耗时的项不参与判定（缺省 0.001 秒）")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
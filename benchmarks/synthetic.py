@@ -0,0 +1,72 @@
+"""基准测试用的合成数据：Magics 体积报告与零件清单"""
+import numpy as np
+
+import xlsxwriter
+
+
+def make_parts(part_count, seed=0):
+    """生成合成零件清单 [{'name', 'volume', 'support_volume'}]"""
+    rng = np.random.default_rng(seed)
+    volumes = rng.uniform(100, 50000, part_count)
+    supports = rng.uniform(0, 5000, part_count)
+    return [
+        {'name': f"DN{20 + i % 30}m6-金属橡胶-{i}.step", 'volume': float(v), 'support_volume': float(s)}
+        for i, (v, s) in enumerate(zip(volumes, supports))
+    ]
+
+
+def write_magics_report(file_path, parts):
+    """按 script/Volume.xltm 的布局写出体积报告：C2 为零件数量，第 8 行起 B~D 列为零件数据"""
+    workbook = xlsxwriter.Workbook(file_path, {'constant_memory': True})
+    sheet = workbook.add_worksheet("Volume")
+    sheet.write(0, 1, "Materialise Magics 体积报告")
+    sheet.write(1, 1, "零件数量")
+    sheet.write(1, 2, len(parts))
+    sheet.write_row(6, 1, ["零件名称", "零件体积(mm³)", "支撑体积(mm³)"])
+    for row, part in enumerate(parts, 7):
+        sheet.write_row(row, 1, [part['name'], part['volume'], part['support_volume']])
+    workbook.close()
+    return file_path
+
+
+def cube_triangles(side, subdivisions, origin=(0.0, 0.0, 0.0)):
+    """边长 side 的立方体网格（法向朝外），每个面划分为 subdivisions² 个正方形、每个正方形两个三角形
+
+    返回 (12 × subdivisions², 3, 3) 的 float32 顶点数组；体积为 side³，表面积为 6 × side²。
+    """
+    steps = np.linspace(0.0, side, subdivisions + 1)
+    u0, v0 = np.meshgrid(steps[:-1], steps[:-1], indexing='ij')
+    u1, v1 = np.meshgrid(steps[1:], steps[1:], indexing='ij')
+    u0, v0, u1, v1 = (a.ravel() for a in (u0, v0, u1, v1))
+    # 以 (u, v) 参数化的单位正方形两个三角形，逆时针时法向为 +w
+    square = [((u0, v0), (u1, v0), (u1, v1)), ((u0, v0), (u1, v1), (u0, v1))]
+    faces = []
+    for axis in range(3):
+        a, b = (axis + 1) % 3, (axis + 2) % 3
+        for level, flip in ((0.0, True), (side, False)):
+            for triangle in square:
+                corners = []
+                for u, v in (triangle[::-1] if flip else triangle):
+                    corner = np.empty((len(u), 3))
+                    corner[:, axis] = level
+                    corner[:, a] = u
+                    corner[:, b] = v
+                    corners.append(corner)
+                faces.append(np.stack(corners, axis=1))
+    return (np.concatenate(faces) + np.asarray(origin)).astype(np.float32)
+
+
+def write_binary_stl(file_path, triangles):
+    """写出二进制 STL（法向由顶点顺序计算）"""
+    triangles = np.asarray(triangles, dtype=np.float32)
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-30)
+    records = np.zeros(len(triangles), dtype=[('normal', '<f4', (3,)), ('vertices', '<f4', (3, 3)),
+                                              ('attribute', '<u2')])
+    records['normal'] = normals
+    records['vertices'] = triangles
+    with open(file_path, 'wb') as f:
+        f.write(b'synthetic'.ljust(80, b' '))
+        f.write(len(triangles).to_bytes(4, 'little'))
+        records.tofile(f)
+    return file_path
@@ -1,8 +1,12 @@
-import re
 import pandas as pd
 from datetime import datetime
 
+from cost_module import convert_duration_to_hours  # 打印时长解析（与 GUI 共用）
+from result_model import PartTable  # 零件清单保持数值体积，渲染时才格式化
+
 def calculate_multipart_cost(parts, total_print_duration):
+    parts = PartTable.from_parts(parts)
+
     # 定价标准重构
     pricing_standard = {
         "钛合金密度": 4.50,        # 单位：g/cm³
@@ -44,7 +48,7 @@ def calculate_multipart_cost(parts, total_print_duration):
         formatted_pricing[param] = formatted_value
     
     # 总材料计算
-    total_volume = sum(p['volume'] for p in parts)
+    total_volume = sum(parts.volumes)
     # 体积单位转换
     material_weight_g = (total_volume * 1e-3 * pricing_standard["钛合金密度"]  # cm³→kg
                         * pricing_standard["用量比例"] * pricing_standard["致密度系数"])
@@ -65,7 +69,7 @@ def calculate_multipart_cost(parts, total_print_duration):
 
     return {
         "输入参数": {
-            "零件清单": [f"{p['name']} ({p['volume']:.2f}mm³)" for p in parts],
+            "零件清单": parts,
             "总打印时长": total_print_duration,
             "零件数量": len(parts)
         },
@@ -80,47 +84,11 @@ def calculate_multipart_cost(parts, total_print_duration):
         }
     }
 
-def convert_duration_to_hours(duration_str):
-    # 初始化时间单位
-    days = hours = minutes = seconds = 0
-    
-    # 使用正则表达式提取各时间单位
-    patterns = {
-        'days': r'(\d+)天',
-        'hours': r'(\d+)小时',
-        'minutes': r'(\d+)分',
-        'seconds': r'(\d+)秒'
-    }
-    
-    for unit, pattern in patterns.items():
-        match = re.search(pattern, duration_str)
-        if match:
-            value = int(match.group(1))
-            if unit == 'days':
-                days = value
-            elif unit == 'hours':
-                hours = value
-            elif unit == 'minutes':
-                minutes = value
-            elif unit == 'seconds':
-                seconds = value
-    
-    # 转换为总小时数（保留3位小数）
-    total_hours = (
-        days * 24 + 
-        hours + 
-        minutes / 60 + 
-        seconds / 3600
-    )
-
-    # 四舍五入到2位小数
-    return total_hours
-
 def format_terminal_output(result):
     """增强型终端报表"""
     border = "=" * 61
-    parts_info = "\n".join([f"  零件{i+1}: {name}" 
-                          for i, name in enumerate(result['输入参数']['零件清单'])])
+    parts_info = "\n".join([f"  零件{i}: {name} ({volume:.2f}mm³)"
+                          for i, (name, volume, _) in enumerate(result['输入参数']['零件清单'].rows(), 1)])
     
     output = [
         f"\n{border}",
@@ -193,10 +161,10 @@ def export_to_excel(result, filename="多零件预算报告.xlsx"):
             ['总打印时长', result['输入参数']['总打印时长']],
             ['零件数量', f"{result['输入参数']['零件数量']}件"]
         ]
-        for i, part in enumerate(result['输入参数']['零件清单'], 1):
+        for i, (name, volume, _) in enumerate(result['输入参数']['零件清单'].rows(), 1):
             params.extend([
-                [f'零件{i}名称', part.split('(')[0].strip()],
-                [f'零件{i}体积', f"{eval(part.split("(")[1].split('mm')[0]):,.2f}mm³"]
+                [f'零件{i}名称', name],
+                [f'零件{i}体积', f"{volume:,.2f}mm³"]
             ])
         
         # 数据写入逻辑
@@ -1,10 +1,12 @@
 import sys
 import os
 import unicodedata
-from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QPlainTextEdit, QFormLayout, QFileDialog, QCheckBox
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QPlainTextEdit, QFormLayout, QFileDialog, QCheckBox, QMessageBox, QProgressBar
 from PyQt5.QtGui import QFont, QFontDatabase, QFontMetrics, QIcon
 from PyQt5.QtCore import Qt
-from cost_module import calculate_multipart_cost, export_to_excel
+from cost_module import calculate_multipart_cost
+from xlsx_export import export_to_excel  # 常量内存模式的报表导出引擎
+from workers import set_text_incrementally, start_worker  # 后台线程执行计算和导出
 
 def get_display_width(text):
     """计算字符串的显示宽度"""
@@ -25,8 +27,8 @@ def center_text(text, total_width):
 def format_terminal_output(result):
     """增强型终端报表，支持对齐"""
     border = "=" * 62
-    parts_info = "\n".join([f"  零件{i+1}: {name}" 
-                            for i, name in enumerate(result['输入参数']['零件清单'])])
+    parts_info = "\n".join([f"  零件{i}: {name} (零件体积：{volume:.3f}mm³，支撑体积：{support:.3f}mm³)"
+                            for i, (name, volume, support) in enumerate(result['输入参数']['零件清单'].rows(), 1)])
     
     # 使用宽度感知的居中方法
     title = " 多零件3D打印成本预算报告 "
@@ -56,6 +58,12 @@ def format_terminal_output(result):
     ]
     return "\n".join(output)
 
+def calculate_task(parts, total_print_duration, pricing_standard, progress):
+    """后台任务：计算成本并生成报表文本"""
+    result = calculate_multipart_cost(parts, total_print_duration, pricing_standard)
+    # 报表按行拆分，便于主线程分批写入结果框
+    return result, format_terminal_output(result).split("\n")
+
 class CostCalculatorApp(QWidget):
     def __init__(self):
         super().__init__()
@@ -75,6 +83,7 @@ class CostCalculatorApp(QWidget):
         }
 
         self.parts = []  # 用于存储零件信息
+        self.current_worker = None  # 正在运行的后台任务
         self.init_ui()
 
     def init_ui(self):
@@ -315,11 +324,51 @@ class CostCalculatorApp(QWidget):
 
         right_layout.addWidget(calc_button)
 
+        # 后台任务运行期间禁用的按钮
+        self.action_buttons = [add_button, clear_button, calc_button]
+
         content_layout.addLayout(right_layout)
 
         # 添加内容布局到主布局
         main_layout.addLayout(content_layout)
 
+        # 后台任务进度条和取消按钮（任务运行时才显示）
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setFont(font)
+        self.progress_bar.setStyleSheet("""
+            QProgressBar {
+                border: 2px solid #8f8f91;
+                border-radius: 6px;
+                text-align: center;
+                background-color: #ffffff;
+            }
+            QProgressBar::chunk {
+                background-color: #0078D7;
+                border-radius: 4px;
+            }
+        """)
+        self.cancel_button = QPushButton("取消", self)
+        self.cancel_button.setFont(font)
+        self.cancel_button.setStyleSheet("""
+            QPushButton {
+                background-color: #9E9E9E;  /* 灰色背景 */
+                color: white;  /* 白色文字 */
+                border: none;
+                border-radius: 6px;
+                padding: 4px 16px;
+            }
+            QPushButton:hover {
+                background-color: #757575;  /* 鼠标悬停时的颜色 */
+            }
+        """)
+        self.cancel_button.clicked.connect(self.cancel_task)
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.cancel_button)
+        main_layout.addLayout(progress_layout)
+        self.progress_bar.setVisible(False)
+        self.cancel_button.setVisible(False)
+
         # 设置结果显示框容器
         result_container = QWidget(self)  # 创建一个容器
         result_layout = QVBoxLayout(result_container)  # 容器内部使用垂直布局
@@ -393,6 +442,56 @@ class CostCalculatorApp(QWidget):
 
         return font
 
+    def run_in_background(self, fn, *args, on_finished, error_title, **kwargs):
+        """在后台线程执行耗时任务，期间显示进度条并禁用操作按钮"""
+        self.set_busy(True)
+
+        def finished(result):
+            self.set_busy(False)
+            on_finished(result)
+
+        self.current_worker = start_worker(
+            fn, *args,
+            on_finished=finished,
+            on_error=lambda e: self.on_task_error(error_title, e),
+            on_progress=self.on_task_progress,
+            on_cancelled=self.on_task_cancelled,
+            **kwargs
+        )
+
+    def set_busy(self, busy):
+        """切换后台任务运行状态"""
+        for button in self.action_buttons:
+            button.setEnabled(not busy)
+        self.progress_bar.setRange(0, 0)  # 未收到进度前显示忙碌动画
+        self.progress_bar.setVisible(busy)
+        self.cancel_button.setVisible(busy)
+        if not busy:
+            self.current_worker = None
+
+    def on_task_progress(self, done, total):
+        if total > 0:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(done)
+
+    def on_task_error(self, title, error):
+        self.set_busy(False)
+        if isinstance(error, PermissionError):
+            QMessageBox.warning(self, "文件打开错误", f"文件 {error.filename} 正在被占用，请关闭后重试！")
+            return
+        self.result_output.setStyleSheet("color: red; font-size: 12pt;")
+        self.result_output.setPlainText(f"{title}：{error}")
+        self.result_output.parentWidget().setVisible(True)
+
+    def on_task_cancelled(self):
+        self.set_busy(False)
+        self.result_output.appendPlainText("\n操作已取消")
+
+    def cancel_task(self):
+        """取消正在运行的后台任务"""
+        if self.current_worker is not None:
+            self.current_worker.cancel()
+
     def add_part(self):
         name = self.name_input.text().strip()
         try:
@@ -447,10 +546,14 @@ class CostCalculatorApp(QWidget):
             self.result_output.setPlainText("请先填写零件信息和打印时长！\n")
             return
 
-        result = calculate_multipart_cost(self.parts, total_print_duration, self.pricing_standard)
-        report = format_terminal_output(result)
+        # 在后台线程中计算并生成报表（传入定价标准的副本，避免计算过程中被修改）
+        self.run_in_background(calculate_task, self.parts, total_print_duration, dict(self.pricing_standard),
+                               on_finished=self.on_cost_calculated, error_title="成本计算失败")
+
+    def on_cost_calculated(self, calculation):
+        result, report_lines = calculation
         self.result_output.setStyleSheet("color: black; font-size: 12pt;")  # 恢复正常字体颜色
-        self.result_output.setPlainText(report)
+        set_text_incrementally(self.result_output, report_lines)
 
         # 显示结果显示框
         self.result_output.parentWidget().setVisible(True)
@@ -459,8 +562,11 @@ class CostCalculatorApp(QWidget):
         if self.export_checkbox.isChecked():
             filename, _ = QFileDialog.getSaveFileName(self, "保存为 Excel", "多零件预算报告.xlsx", "Excel 文件 (*.xlsx)")
             if filename:
-                export_to_excel(result, filename)
-                self.result_output.appendPlainText(f"\n报表已保存至：{filename}")
+                self.run_in_background(
+                    export_to_excel, result, filename,
+                    on_finished=lambda _: self.result_output.appendPlainText(f"\n报表已保存至：{filename}"),
+                    error_title="导出 Excel 失败"
+                )
 
 if __name__ == "__main__":
     import sys
@@ -1,13 +1,20 @@
 import sys
 import os
 import unicodedata
-import re
-import pandas as pd
-from datetime import datetime
-from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QPlainTextEdit, QFormLayout, QFileDialog, QCheckBox, QMessageBox
+from functools import partial
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QPlainTextEdit, QFormLayout, QFileDialog, QCheckBox, QMessageBox, QProgressBar, QToolButton
 from PyQt5.QtGui import QFont, QFontDatabase, QFontMetrics, QIcon
-from PyQt5.QtCore import Qt
-from openpyxl import load_workbook  # 添加用于读取 Excel 文件的库
+from PyQt5.QtCore import Qt, QTimer
+from cost_module import (DEFAULT_PRICING_STANDARD, calculate_multipart_cost, convert_duration_to_hours,
+                         format_duration, price_cost_terms, quote_aggregates, round_cost_terms)
+from xlsx_export import export_to_excel  # 常量内存模式的报表导出引擎
+from excel_loader import format_load_stats, load_parts  # 流式读取 Magics 体积报告
+from xlsm_fast_reader import read_parts  # 直接解析 xlsm 的 XML，布局不符时回退到 openpyxl
+from workers import replace_text_lines, set_text_incrementally, start_worker  # 后台线程执行加载、计算和导出
+from quote_cache import QuoteCache, file_digest  # 按报告内容和定价缓存零件清单与计算结果
+from part_history import PartHistory  # 按零件名称和体积查询以前的报价
+from result_model import PartTable
+from diagnostics import RECORD_HEADER, Diagnostics, format_record, measure  # 可选的各环节耗时与内存记录
 
 def get_display_width(text):
     """计算字符串的显示宽度"""
@@ -29,11 +36,10 @@ def format_terminal_output(result):
     """增强型终端报表，支持对齐"""
     border = "=" * 61
 
-    # 确保零件清单中的每个元素是字典
+    # 零件清单为 PartTable，体积在此处才格式化
     parts_info = "\n".join([
-        f"  零件{i+1}: {part['name']}（总体积：{part['volume'] + part['support_volume']:.3f}mm³）"
-        if isinstance(part, dict) else f"  零件{i+1}: {part}"  # 如果不是字典，直接输出字符串
-        for i, part in enumerate(result['输入参数']['零件清单'])
+        f"  零件{i}: {name}（总体积：{volume + support:.3f}mm³）"
+        for i, (name, volume, support) in enumerate(result['输入参数']['零件清单'].rows(), 1)
     ])
 
     # 使用宽度感知的居中方法
@@ -46,9 +52,32 @@ def format_terminal_output(result):
         border,
         "[打印参数]",
         f"  零件数量：{result['输入参数']['零件数量']}件",
-        f"  打印时长：{result['输入参数']['总打印时长']}",
+        format_duration_line(result),
         "\n[零件清单]",
         f"{parts_info}",
+        *format_cost_lines(result)
+    ]
+    return "\n".join(output)
+
+# 报表中 "打印时长" 所在的行号（实时重算时只替换这一行和末尾的费用明细）
+REPORT_DURATION_LINE = 5
+
+# 实时重算的防抖间隔（毫秒）：停止输入这么久之后才重算
+LIVE_REPRICE_DELAY_MS = 250
+
+# 成本分布的蒙特卡洛样本数（勾选“估计成本分布”时才计算；修改参数后在后台按同一批样本重新计价）
+MONTE_CARLO_SAMPLES = 250_000
+
+# 打印时长输入框的默认值（只是示例，不作为打印时长模型的训练样本）
+DEFAULT_DURATION_TEXT = "11天11小时11分11秒"
+
+def format_duration_line(result):
+    return f"  打印时长：{result['输入参数']['总打印时长']}"
+
+def format_cost_lines(result):
+    """报表末尾的费用明细部分"""
+    border = "=" * 61
+    return [
         "\n[费用明细]",
         f"{'  项目名称'.ljust(20)}{'金额'.rjust(33)}",
         "  " + "-" * 57 + "  ",
@@ -60,213 +89,187 @@ def format_terminal_output(result):
         f"  合计金额：".ljust(20) + f"¥{result['计算明细']['总费用']:>10,.2f}".rjust(34),
         f"  折扣优惠：".ljust(20) + f"{result['定价标准']['折扣优惠']}".rjust(34),
         f"  实付金额：".ljust(20) + f"¥{result['计算明细']['实际费用']:>10,.2f}".rjust(34),
+        *format_distribution_lines(result),
         border
     ]
-    return "\n".join(output)
 
-def calculate_multipart_cost(parts, total_print_duration, pricing_standard):
-    # 总材料计算，使用零件体积和支撑体积的总和
-    total_volume = sum(p['volume'] + p['support_volume'] for p in parts)
-    material_weight_g = (total_volume * 1e-3 * pricing_standard["钛粉密度"]
-                         * pricing_standard["用量比例"] * pricing_standard["致密系数"])
-    material_cost = material_weight_g * pricing_standard["材料单价"] * 1e-3
-
-    # 机时费用
-    machine_hours = convert_duration_to_hours(total_print_duration)
-    machine_cost = machine_hours * pricing_standard["机时费率"]
-
-    # 其他费用
-    argon_cost = pricing_standard["氩气单价"] * pricing_standard["氩气用量"] * pricing_standard["氩气数量"]
-    post_processing = pricing_standard["后处理费"]
-
-    # 费用汇总
-    total_cost = material_cost + machine_cost + argon_cost + post_processing
-    actual_cost = total_cost * pricing_standard["折扣优惠"]
-
-    return {
-        "输入参数": {
-            "零件清单": [f"{p['name']} (零件体积：{p['volume']:.3f}mm³，支撑体积：{p['support_volume']:.3f}mm³)" for p in parts],
-            "总打印时长": total_print_duration,
-            "零件数量": len(parts)
-        },
-        "定价标准": pricing_standard,
-        "计算明细": {
-            "材料费用": round(material_cost, 2),
-            "机时费用": round(machine_cost, 2),
-            "氩气费用": round(argon_cost, 2),
-            "后处理费": round(post_processing, 2),
-            "总费用": round(total_cost, 2),
-            "实际费用": round(actual_cost, 2)
-        }
-    }
-
-def convert_duration_to_hours(duration_str):
-    # 初始化时间单位
-    days = hours = minutes = seconds = 0
-    
-    # 使用正则表达式提取各时间单位
-    patterns = {
-        'days': r'(\d+)天',
-        'hours': r'(\d+)小时',
-        'minutes': r'(\d+)分',
-        'seconds': r'(\d+)秒'
-    }
-    
-    for unit, pattern in patterns.items():
-        match = re.search(pattern, duration_str)
-        if match:
-            value = int(match.group(1))
-            if unit == 'days':
-                days = value
-            elif unit == 'hours':
-                hours = value
-            elif unit == 'minutes':
-                minutes = value
-            elif unit == 'seconds':
-                seconds = value
-    
-    # 转换为总小时数（保留3位小数）
-    total_hours = (
-        days * 24 + 
-        hours + 
-        minutes / 60 + 
-        seconds / 3600
-    )
-
-    # 四舍五入到2位小数
-    return total_hours
-
-def export_to_excel(result, filename="多零件预算报告.xlsx"):
-    """专业级多零件报表"""
-    try:
-        with pd.ExcelWriter(filename, engine='xlsxwriter') as writer:
-            workbook = writer.book
-            worksheet = workbook.add_worksheet('预算总览')
-            
-            # 高级格式配置
-            header_format = workbook.add_format({
-                'bold': True, 'bg_color': '#4F81BD', 'font_color': '#FFFFFF', 'border': 1,
-                'align': 'center', 'valign': 'vcenter'
-            })
-            part_name_format = workbook.add_format({
-                'bold': True, 'bg_color': '#D9E1F2', 'border': 1,
-                'align': 'center', 'valign': 'vcenter'
-            })
-            part_detail_format = workbook.add_format({
-                'bg_color': '#FCE4D6', 'border': 1,
-                'align': 'center', 'valign': 'vcenter'
-            })
-            currency_format = workbook.add_format({
-                'num_format': '¥##0.00', 'bg_color': '#E2EFDA', 'border': 1,
-                'align': 'center', 'valign': 'vcenter'
-            })
-            number_format = workbook.add_format({
-                'num_format': '0.00', 'bg_color': '#FFF2CC', 'border': 1,
-                'align': 'center', 'valign': 'vcenter'
-            })
-            normal_format = workbook.add_format({
-                'bg_color': '#FFFFFF', 'border': 1,
-                'align': 'center', 'valign': 'vcenter'
-            })
-            
-            # 标题区块
-            worksheet.merge_range('A1:B1', '多零件合并打印预算报告',
-                                  workbook.add_format({
-                                      'bold': True, 'font_size': 14, 'bg_color': '#4F81BD', 'font_color': '#FFFFFF',
-                                      'align': 'center', 'border': 1
-                                  }))
-            worksheet.merge_range('A2:B2', f"生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M')}",
-                                  normal_format)
-            
-            # 输入参数动态生成
-            params = [
-                ['总打印时长', result['输入参数']['总打印时长']],
-                ['零件数量', f"{result['输入参数']['零件数量']}件"]
-            ]
-            
-            # 修改零件体积提取逻辑，直接从字典中获取数据
-            for i, part in enumerate(result['输入参数']['零件清单'], 1):
-                params.extend([
-                    [f'零件{i}名称', part['name']],
-                    [f'零件{i}体积', f"{part['volume']:.3f}mm³"],
-                    [f'零件{i}支撑体积', f"{part['support_volume']:.3f}mm³"]
-                ])
-            
-            # 定义定价标准的单位
-            pricing_units = {
-                "钛粉密度": "g/cm³",
-                "致密系数": "",  # 无单位
-                "用量比例": "",  # 无单位
-                "材料单价": "元/公斤",
-                "机时费率": "元/小时",
-                "氩气数量": "瓶",
-                "氩气单价": "元",
-                "氩气用量": "瓶",  # 无单位
-                "后处理费": "元",
-                "折扣优惠": ""  # 无单位
-            }
-            
-            # 为定价标准添加单位
-            pricing_standard_with_units = [
-                [param, f"{value} {pricing_units.get(param, '')}".strip()]
-                for param, value in result['定价标准'].items()
-            ]
-            
-            # 数据写入逻辑
-            def write_section(data, start_row, title):
-                worksheet.merge_range(start_row, 0, start_row, 1, title, header_format)
-                for row_idx, (label, value) in enumerate(data, start_row + 1):
-                    if "零件" in label and "名称" in label:  # 零件名称行加背景颜色
-                        cell_format = part_name_format
-                    elif "体积" in label:  # 零件体积和支撑体积行加背景颜色
-                        cell_format = part_detail_format
-                    elif title == "费用明细":
-                        if "费用" in label or "金额" in label or "后处理费" in label:  # 判断是否为货币
-                            cell_format = currency_format
-                        else:
-                            cell_format = normal_format
-                    else:
-                        cell_format = number_format if isinstance(value, (int, float)) else normal_format
-                    
-                    worksheet.write(row_idx, 0, label, cell_format)
-                    worksheet.write(row_idx, 1, value, cell_format)
-                return start_row + len(data) + 2
-            
-            current_row = 3
-            current_row = write_section(params, current_row, "输入参数")
-            current_row = write_section(pricing_standard_with_units, current_row, "定价标准")
-            current_row = write_section(
-                [[k, v] for k, v in result['计算明细'].items()],
-                current_row, "费用明细"
-            )
-            
-            # 智能列宽设置
-            worksheet.set_column('A:A', 25)
-            worksheet.set_column('B:B', 25)
-            
-            print(f"\n专业级报表已生成：{filename}")
-    except PermissionError:
-        QMessageBox.warning(None, "文件打开错误", f"文件 {filename} 正在被占用，请关闭后重试！")
+def format_distribution_lines(result):
+    """成本分布（蒙特卡洛估计的实付金额分位数），结果中没有时为空"""
+    distribution = result.get('成本分布')
+    if not distribution:
+        return []
+    return [
+        f"\n[成本分布]（蒙特卡洛 {distribution['样本数']:,} 次）",
+        *(f"  {label} 实付金额：".ljust(20) + f"¥{value:>10,.2f}".rjust(34)
+          for label, value in distribution.items() if label != '样本数'),
+    ]
+
+def format_parts_display(parts, prior=None):
+    """零件信息框的显示文本（每个零件一个条目）；prior 为 PartHistory.lookup 的结果，报价过的零件另起一行显示上次报价"""
+    entries = [
+        f"零件{i}: {part['name']}\n    零件体积：{part['volume']:.3f}mm³\n    支撑体积：{part['support_volume']:.3f}mm³"
+        for i, part in enumerate(parts, 1)
+    ]
+    for i, previous in enumerate(prior or ()):
+        if previous is not None:
+            entries[i] += (f"\n    上次报价：¥{previous['分摊费用']:,.2f}，机时 {previous['机时']:.2f} 小时"
+                           f"（占整版 {previous['份额']:.1%}，{previous['时间'][:10]}）")
+    return entries
+
+def lookup_prior_quotes(parts, history, status, diagnostics=None):
+    """查出零件清单中以前报价过的零件（未给出报价历史时返回 None），并在状态信息中附上零件数"""
+    if history is None:
+        return None
+    with measure(diagnostics, "history", rows=len(parts)) as record:
+        prior = history.lookup(parts)
+        record['found'] = sum(previous is not None for previous in prior)
+    if record['found']:
+        status.append(f"{record['found']} 个零件以前报价过")
+    return prior
+
+def load_parts_task(file_path, progress, cache=None, history=None, diagnostics=None):
+    """后台任务：读取零件信息并生成显示文本，返回 (零件清单, 显示条目, 报告内容哈希, 状态信息)
+
+    给出零件报价历史时，在显示文本中附上各零件（名称和体积都相同）上次的报价。
+    状态信息为显示在状态栏中的若干条提示（读取耗时等）。
+    """
+    status = []
+    with measure(diagnostics, "load") as record:
+        # 同一份报告（按内容判断）已解析过时直接取缓存
+        digest = file_digest(file_path) if cache is not None else None
+        parts = cache.get_parts(digest) if cache is not None else None
+        record['cached'] = parts is not None
+        if parts is not None:
+            status.append(f"已从缓存读取 {len(parts)} 个零件")
+        else:
+            # 读取零件信息（优先 XML 快速路径，内存占用恒定）
+            notes = []
+            parts, stats = load_parts(file_path, reader=partial(read_parts, notes=notes), progress=progress)
+            status.append(format_load_stats(stats))
+            status.extend(notes)
+            if cache is not None:
+                cache.put_parts(digest, parts)
+        record['rows'] = len(parts)
+    return parts, format_parts_display(parts, lookup_prior_quotes(parts, history, status, diagnostics)), digest, status
+
+def load_stl_task(file_paths, progress, history=None, diagnostics=None):
+    """后台任务：由 STL 模型计算零件体积、估算支撑体积（+Z 方向成型、45° 悬垂角）并切片估算扫描时间
+
+    返回值与 load_parts_task 相同（STL 不使用缓存，哈希为 None）。
+    """
+    # numpy 只在读取 STL 时才导入，不拖慢程序启动
+    from stl_reader import load_stl_parts
+
+    with measure(diagnostics, "load") as record:
+        parts, stats = load_stl_parts(file_paths, progress=progress, support={}, print_parameters={})
+        record['rows'] = len(parts)
+    status = [format_load_stats(stats)]
+    return parts, format_parts_display(parts, lookup_prior_quotes(parts, history, status, diagnostics)), None, status
+
+def calculate_task(parts, total_print_duration, pricing_standard, progress, cache=None, parts_digest=None,
+                   archive=None, history=None, diagnostics=None, distribution=False):
+    """后台任务：计算成本并生成报表文本
+
+    给出缓存和报告内容哈希时，同一报告、定价和打印时长的结果直接取缓存；
+    给出报价归档、零件报价历史时把这次报价追加到其中（取自缓存的结果以前计算时已经追加过，不再重复）。
+    distribution 为 True 时另外按误差分布抽样估计成本分布。
+    """
+    with measure(diagnostics, "calculate", rows=len(parts)) as record:
+        result = None
+        if cache is not None and parts_digest is not None:
+            result = cache.get_quote(parts_digest, pricing_standard, total_print_duration)
+            if result is not None:
+                result['输入参数']['零件清单'] = PartTable.from_parts(parts)
+        cached = record['cached'] = result is not None
+        if result is None:
+            # 调用成本计算函数（结果中的零件清单保留数值体积，导出时直接使用）
+            result = calculate_multipart_cost(parts, total_print_duration, pricing_standard)
+            if cache is not None and parts_digest is not None:
+                cache.put_quote(parts_digest, pricing_standard, total_print_duration, result)
+
+    aggregates = quote_aggregates(result['输入参数']['零件清单'], total_print_duration)
+    factors = None
+    if distribution:
+        # 成本分布：按误差分布抽样估计实付金额的分位数；抽样因子与定价无关，保存下来供修改参数后重新计价
+        from cost_uncertainty import load_uncertainty, sample_factors
+        with measure(diagnostics, "uncertainty", rows=MONTE_CARLO_SAMPLES):
+            factors = sample_factors(load_uncertainty(), MONTE_CARLO_SAMPLES)
+            result['成本分布'] = distribution_task(aggregates, pricing_standard, factors, None)
+
+    if not cached and (archive is not None or history is not None):
+        from quote_archive import quote_record
+        quote = quote_record(result)
+        with measure(diagnostics, "archive", rows=len(parts)):
+            if archive is not None:
+                archive.append([quote])
+            if history is not None:
+                history.add_quotes([quote])
+
+    # 报表按行拆分（每个元素对应结果框中的一行），便于主线程分批写入结果框
+    with measure(diagnostics, "format") as record:
+        report_lines = format_terminal_output(result).split("\n")
+        record['rows'] = len(report_lines)
+
+    # 缓存与定价无关的汇总量、未取整的各项费用和费用明细的起始行，供修改参数时实时增量重算
+    live_quote = {'result': result, 'aggregates': aggregates,
+                  'terms': price_cost_terms(aggregates, pricing_standard),
+                  'cost_line': len(report_lines) - len("\n".join(format_cost_lines(result)).split("\n"))}
+    if factors is not None:
+        live_quote['factors'] = factors
+    return result, report_lines, live_quote
+
+def distribution_task(aggregates, pricing_standard, factors, progress):
+    """后台任务：按已抽取的样本因子对汇总量计价，返回成本分布"""
+    from cost_uncertainty import cost_distribution, simulate_costs
+    return cost_distribution(simulate_costs(aggregates, pricing_standard, factors))
+
+def export_task(result, filename, progress, diagnostics=None):
+    """后台任务：导出 Excel 报表"""
+    with measure(diagnostics, "export") as record:
+        record['rows'] = export_to_excel(result, filename, progress)
+
+def reprice_quote(live_quote, pricing_standard, total_print_duration):
+    """按新的定价标准和打印时长增量重算，返回新的实时报价状态；没有任何改动时返回 None
+
+    零件体积等汇总量沿用上次计算的缓存，只重算依赖改动参数的费用项，与零件数量无关。
+    成本分布不在这里重算（抽样计价耗时十几毫秒），新结果中不含成本分布，由调用方在后台重新估计。
+    """
+    result = live_quote['result']
+    changed = {param for param, value in pricing_standard.items() if value != result['定价标准'].get(param)}
+    aggregates = live_quote['aggregates']
+    if total_print_duration != result['输入参数']['总打印时长']:
+        aggregates = dict(aggregates, 机时=convert_duration_to_hours(total_print_duration))
+        changed.add("机时")
+    if not changed:
+        return None
+
+    terms = price_cost_terms(aggregates, pricing_standard, live_quote['terms'], changed)
+    result = dict(result, 输入参数=dict(result['输入参数'], 总打印时长=total_print_duration),
+                  定价标准=pricing_standard, 计算明细=round_cost_terms(terms))
+    result.pop('成本分布', None)
+    return dict(live_quote, result=result, aggregates=aggregates, terms=terms)
 
 class CostCalculatorApp(QWidget):
     def __init__(self):
         super().__init__()
 
         # 初始化定价标准
-        self.pricing_standard = {
-            "钛粉密度": 4.50,         # 单位：g/cm³
-            "致密系数": 0.9995,       # 无量纲
-            "用量比例": 1.5,          # 无量纲 
-            "材料单价": 1800,          # 元/公斤
-            "机时费率": 250,          # 元/小时
-            "氩气数量": 1,            # 无量纲
-            "氩气单价": 1800,         # 元
-            "氩气用量": 0.8,          # 无量纲
-            "后处理费": 1500,         # 元
-            "折扣优惠": 1.0           # 百分比
-        }
+        self.pricing_standard = dict(DEFAULT_PRICING_STANDARD)
 
         self.parts = []  # 用于存储零件信息
+        self.parts_digest = None  # 当前零件清单所属报告的内容哈希（手动清空后为 None）
+        self.quote_cache = QuoteCache()  # 零件清单与计算结果的磁盘缓存
+        self.quote_archive = None  # 报价历史归档（第一次计算时打开）
+        self.part_history = PartHistory()  # 各零件以前的报价（加载零件时查询）
+        self.recorded_quote = None  # 当前零件清单最近一次写入报价历史的 (定价标准, 打印时长)，换清单时清空
+        self.current_worker = None  # 正在运行的后台任务
+        self.distribution_worker = None  # 修改参数后在后台重新估计成本分布的任务
+        self.live_quote = None  # 最近一次计算的实时报价状态（汇总量和各项费用），修改参数时据此增量重算
+        self.diagnostics = Diagnostics()  # 各环节耗时与内存记录（默认关闭）
+        self.duration_model = None  # 打印时长回归模型（第一次加载零件时读取）
+        self.part_features = None  # 当前零件清单的模型特征
+        self.predicted_duration = None  # 模型预测的打印时长（打印时长为空时使用）
+        self.estimated_duration = None  # 由 STL 切片估算的打印时长
         self.init_ui()
 
     def init_ui(self):
@@ -310,7 +313,7 @@ class CostCalculatorApp(QWidget):
         form_layout.setLabelAlignment(Qt.AlignRight)  # 设置标签右对齐
 
         # 替换零件信息输入部分为读取 Excel 文件按钮
-        load_button = QPushButton("加载零件信息 (xlsm)", self)
+        load_button = QPushButton("加载零件信息 (xlsm/stl)", self)
         load_button.setFont(font)
         load_button.setStyleSheet("""
             QPushButton {
@@ -391,7 +394,7 @@ class CostCalculatorApp(QWidget):
         duration_label = QLabel("打印时长", self)
         duration_label.setFont(font)
         self.duration_input = QLineEdit(self)
-        self.duration_input.setText("11天11小时11分11秒")  # 设置默认值
+        self.duration_input.setText(DEFAULT_DURATION_TEXT)  # 设置默认值
         self.duration_input.setFont(font)
         self.duration_input.setStyleSheet(rounded_style)
 
@@ -436,6 +439,15 @@ class CostCalculatorApp(QWidget):
         # 将复选框添加到布局中，与右侧的折扣优惠上下对齐
         duration_layout.addRow(self.export_checkbox)
 
+        # 成本分布（蒙特卡洛抽样）默认不计算
+        self.distribution_checkbox = QCheckBox("估计成本分布（蒙特卡洛）", self)
+        self.distribution_checkbox.setFont(font)
+        self.distribution_checkbox.setChecked(False)  # 默认未选中
+        self.distribution_checkbox.setFixedHeight(self.duration_input.sizeHint().height())
+        self.distribution_checkbox.setStyleSheet(self.export_checkbox.styleSheet())
+        self.distribution_checkbox.setToolTip(f"按误差分布抽取 {MONTE_CARLO_SAMPLES:,} 个样本估计实付金额的 P50/P90/P99")
+        duration_layout.addRow(self.distribution_checkbox)
+
         # 一键清零按钮
         clear_button = QPushButton("一键清零", self)
         clear_button.setFont(font)
@@ -526,11 +538,65 @@ class CostCalculatorApp(QWidget):
 
         right_layout.addWidget(calc_button)
 
+        # 后台任务运行期间禁用的按钮
+        self.action_buttons = [load_button, clear_button, calc_button]
+
+        # 实时重算：计算过一次后，修改定价参数或打印时长在停止输入片刻后自动更新费用明细
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(LIVE_REPRICE_DELAY_MS)
+        self.live_timer.timeout.connect(self.reprice_live)
+        for input_field in [*self.param_inputs.values(), self.duration_input]:
+            input_field.textChanged.connect(self.schedule_live_reprice)
+
         content_layout.addLayout(right_layout)
 
         # 添加内容布局到主布局
         main_layout.addLayout(content_layout)
 
+        # 状态栏：读取耗时等提示（打包后的窗口程序没有终端，不能只打印出来）
+        self.status_label = QLabel(self)
+        self.status_label.setFont(QFont(font.family(), 10))
+        self.status_label.setStyleSheet("color: #606060;")
+        main_layout.addWidget(self.status_label)
+
+        # 后台任务进度条和取消按钮（任务运行时才显示）
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setFont(font)
+        self.progress_bar.setStyleSheet("""
+            QProgressBar {
+                border: 2px solid #8f8f91;
+                border-radius: 6px;
+                text-align: center;
+                background-color: #ffffff;
+            }
+            QProgressBar::chunk {
+                background-color: #0078D7;
+                border-radius: 4px;
+            }
+        """)
+        self.cancel_button = QPushButton("取消", self)
+        self.cancel_button.setFont(font)
+        self.cancel_button.setStyleSheet("""
+            QPushButton {
+                background-color: #9E9E9E;  /* 灰色背景 */
+                color: white;  /* 白色文字 */
+                border: none;
+                border-radius: 6px;
+                padding: 4px 16px;
+            }
+            QPushButton:hover {
+                background-color: #757575;  /* 鼠标悬停时的颜色 */
+            }
+        """)
+        self.cancel_button.clicked.connect(self.cancel_task)
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.cancel_button)
+        main_layout.addLayout(progress_layout)
+        self.progress_bar.setVisible(False)
+        self.cancel_button.setVisible(False)
+
         # 设置结果显示框容器
         result_container = QWidget(self)  # 创建一个容器
         result_layout = QVBoxLayout(result_container)  # 容器内部使用垂直布局
@@ -615,6 +681,32 @@ class CostCalculatorApp(QWidget):
         # 初始隐藏结果显示框
         result_container.setVisible(False)
 
+        # 可折叠的诊断面板：勾选后记录读取、计算、报表、导出各环节的耗时、内存峰值和行数
+        diagnostics_layout = QHBoxLayout()
+        self.diagnostics_toggle = QToolButton(self)
+        self.diagnostics_toggle.setText("诊断信息")
+        self.diagnostics_toggle.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
+        self.diagnostics_toggle.setArrowType(Qt.RightArrow)
+        self.diagnostics_toggle.setCheckable(True)
+        self.diagnostics_toggle.setStyleSheet("QToolButton { border: none; }")
+        self.diagnostics_toggle.toggled.connect(self.toggle_diagnostics_panel)
+        self.diagnostics_checkbox = QCheckBox("记录各环节耗时与内存", self)
+        self.diagnostics_checkbox.setChecked(self.diagnostics.enabled)
+        self.diagnostics_checkbox.setToolTip(f"记录写入 {self.diagnostics.log_path}（会略微拖慢计算）")
+        self.diagnostics_checkbox.toggled.connect(self.set_diagnostics_enabled)
+        diagnostics_layout.addWidget(self.diagnostics_toggle)
+        diagnostics_layout.addWidget(self.diagnostics_checkbox)
+        diagnostics_layout.addStretch()
+        main_layout.addLayout(diagnostics_layout)
+
+        self.diagnostics_output = QPlainTextEdit(self)
+        self.diagnostics_output.setFont(QFont("Maple Mono NF CN", 9))
+        self.diagnostics_output.setReadOnly(True)
+        self.diagnostics_output.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.diagnostics_output.setFixedHeight(150)
+        self.diagnostics_output.setVisible(False)  # 初始折叠
+        main_layout.addWidget(self.diagnostics_output)
+
         # 设置主布局
         self.setLayout(main_layout)
 
@@ -632,34 +724,142 @@ class CostCalculatorApp(QWidget):
 
         return font
 
+    def run_in_background(self, fn, *args, on_finished, error_title, **kwargs):
+        """在后台线程执行耗时任务，期间显示进度条并禁用操作按钮"""
+        self.set_busy(True)
+
+        def finished(result):
+            self.set_busy(False)
+            on_finished(result)
+
+        self.current_worker = start_worker(
+            fn, *args,
+            on_finished=finished,
+            on_error=lambda e: self.on_task_error(error_title, e),
+            on_progress=self.on_task_progress,
+            on_cancelled=self.on_task_cancelled,
+            **kwargs
+        )
+
+    def set_busy(self, busy):
+        """切换后台任务运行状态"""
+        for button in self.action_buttons:
+            button.setEnabled(not busy)
+        self.progress_bar.setRange(0, 0)  # 未收到进度前显示忙碌动画
+        self.progress_bar.setVisible(busy)
+        self.cancel_button.setVisible(busy)
+        if not busy:
+            self.current_worker = None
+            self.refresh_diagnostics()
+
+    def toggle_diagnostics_panel(self, expanded):
+        """展开/折叠诊断面板"""
+        self.diagnostics_toggle.setArrowType(Qt.DownArrow if expanded else Qt.RightArrow)
+        self.diagnostics_output.setVisible(expanded)
+
+    def set_diagnostics_enabled(self, enabled):
+        self.diagnostics.enabled = enabled
+        if enabled and not self.diagnostics_toggle.isChecked():
+            self.diagnostics_toggle.setChecked(True)
+
+    def refresh_diagnostics(self):
+        """把最近的诊断记录显示在诊断面板中（最新的在最上面）"""
+        if not self.diagnostics.records:
+            return
+        self.diagnostics_output.setPlainText(
+            "\n".join([RECORD_HEADER, *map(format_record, reversed(self.diagnostics.records))]))
+
+    def on_task_progress(self, done, total):
+        if total > 0:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(done)
+
+    def on_task_error(self, title, error):
+        self.set_busy(False)
+        if title == "成本计算失败":
+            self.live_quote = None
+            self.recorded_quote = None
+        if isinstance(error, PermissionError):
+            QMessageBox.warning(self, "文件打开错误", f"文件 {error.filename} 正在被占用，请关闭后重试！")
+            return
+        self.result_output.setStyleSheet("color: red; font-size: 12pt;")
+        self.result_output.setPlainText(f"{title}：{error}")
+        self.result_output.parentWidget().setVisible(True)
+
+    def on_task_cancelled(self):
+        self.set_busy(False)
+        self.recorded_quote = None
+        self.result_output.appendPlainText("\n操作已取消")
+
+    def cancel_task(self):
+        """取消正在运行的后台任务"""
+        if self.current_worker is not None:
+            self.current_worker.cancel()
+
     def load_parts_from_excel(self):
-        """从 Excel 文件加载零件信息"""
-        file_path, _ = QFileDialog.getOpenFileName(self, "选择 Excel 文件", "", "Excel 文件 (*.xlsm)")
-        if not file_path:
+        """从 Magics 体积报告或 STL 模型加载零件信息（后台线程读取）"""
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "选择体积报告或 STL 模型", "", "Magics 体积报告 (*.xlsm);;STL 模型（可多选） (*.stl)")
+        if not file_paths:
             return
 
-        try:
-            workbook = load_workbook(file_path, data_only=True)
-            sheet = workbook.active
-
-            # 从 Excel 文件中读取零件信息
-            part_count = int(sheet["C2"].value)
-            self.parts = []
-            self.parts_display.clear()
-
-            for row in range(8, 8 + part_count):
-                name = sheet[f"B{row}"].value
-                volume = float(sheet[f"C{row}"].value)
-                support_volume = float(sheet[f"D{row}"].value)
-                self.parts.append({'name': name, 'volume': volume, 'support_volume': support_volume})
-                # 修改输出格式
-                self.parts_display.appendPlainText(
-                    f"零件{row - 7}: {name}\n    零件体积：{volume:.3f}mm³\n    支撑体积：{support_volume:.3f}mm³"
-                )
+        if all(path.lower().endswith(".stl") for path in file_paths):
+            self.run_in_background(load_stl_task, file_paths, history=self.part_history, diagnostics=self.diagnostics,
+                                   on_finished=self.on_parts_loaded, error_title="加载 STL 模型失败")
+            return
+        self.run_in_background(load_parts_task, file_paths[0], cache=self.quote_cache, history=self.part_history,
+                               diagnostics=self.diagnostics,
+                               on_finished=self.on_parts_loaded, error_title="加载 Excel 文件失败")
+
+    def show_status(self, messages):
+        """在状态栏中显示若干条提示（以分号连接）"""
+        self.status_label.setText("；".join(messages))
+
+    def on_parts_loaded(self, result):
+        self.parts, display_entries, self.parts_digest, status = result
+        self.show_status(status)
+        # 换了零件清单，结果框中的报表已过期，不再随参数实时重算
+        self.live_quote = None
+        self.recorded_quote = None
+        self.estimated_duration = None
+        self.duration_input.setToolTip("")
+        # 分批写入零件信息框，避免大报告一次性刷新卡住界面
+        set_text_incrementally(self.parts_display, display_entries)
+
+        # STL 模型已切片估算扫描时间：按整版估算打印时长填入输入框，代替手动从 SliceViewer 抄录
+        if self.parts and all('scan_seconds' in part for part in self.parts):
+            from print_time import estimate_build_time
+            estimate = estimate_build_time(self.parts)
+            self.estimated_duration = estimate['duration']
+            self.duration_input.setText(estimate['duration'])
+            self.duration_input.setToolTip(
+                f"由 STL 估算：{estimate['duration']}（{estimate['layers']} 层，"
+                f"扫描 {estimate['scan_seconds'] / 3600:.1f} 小时，铺粉 {estimate['recoat_seconds'] / 3600:.1f} 小时）")
+        self.update_duration_prediction()
+
+    def update_duration_prediction(self):
+        """按当前零件清单预测打印时长，显示为打印时长输入框的占位文字（输入框为空时计算即采用）"""
+        self.predicted_duration = None
+        if self.parts:
+            from duration_model import DurationModel, part_features
+            if self.duration_model is None:
+                self.duration_model = DurationModel.load()
+            self.part_features = part_features(self.parts)
+            hours = self.duration_model.predict(self.part_features)
+            if hours is not None:
+                self.predicted_duration = format_duration(hours * 3600)
+        else:
+            self.part_features = None
+        self.duration_input.setPlaceholderText(f"预测：{self.predicted_duration}" if self.predicted_duration else "")
 
-        except Exception as e:
-            self.result_output.setStyleSheet("color: red; font-size: 12pt;")
-            self.result_output.setPlainText(f"加载 Excel 文件失败：{e}")
+    def record_duration_sample(self, total_print_duration):
+        """用户手动填写的打印时长作为训练样本加入模型并重新拟合（预测值、估算值和默认值不计入）"""
+        if (self.part_features is None or self.duration_model is None
+                or total_print_duration in (self.predicted_duration, self.estimated_duration, DEFAULT_DURATION_TEXT)):
+            return
+        if self.duration_model.add_sample(self.part_features, convert_duration_to_hours(total_print_duration)):
+            self.duration_model.fit()
+            self.duration_model.save()
 
     def clear_inputs(self):
         """清空所有输入框的内容"""
@@ -668,12 +868,19 @@ class CostCalculatorApp(QWidget):
             input_field.clear()
         self.result_output.clear()
         self.parts_display.clear()
+        self.live_quote = None
 
     def clear_parts_display(self):
         """清空零件信息框和输出信息框的内容"""
         self.parts_display.clear()  # 清空零件信息框
         self.result_output.clear()  # 清空输出信息框
         self.parts = []  # 清空零件信息列表
+        self.parts_digest = None
+        self.live_quote = None
+        self.recorded_quote = None
+        self.estimated_duration = None
+        self.duration_input.setToolTip("")
+        self.update_duration_prediction()
 
     def calculate_cost(self):
         # 获取用户输入的参数值
@@ -688,26 +895,37 @@ class CostCalculatorApp(QWidget):
 
         # 调用成本计算函数
         total_print_duration = self.duration_input.text().strip()
+        if not total_print_duration and self.parts and self.predicted_duration:
+            # 未填写打印时长：采用模型预测值
+            total_print_duration = self.predicted_duration
+            self.duration_input.setText(total_print_duration)
         if not total_print_duration or not self.parts:
             self.result_output.setStyleSheet("color: red; font-size: 12pt;")  # 设置字体为红色和大小
             self.result_output.setPlainText("请先加载零件信息和填写打印时长！\n")
             return
 
-        # 确保零件信息格式正确
-        formatted_parts = [
-            {'name': part['name'], 'volume': part['volume'], 'support_volume': part['support_volume']}
-            for part in self.parts
-        ]
-
-        # 调用成本计算函数
-        result = calculate_multipart_cost(formatted_parts, total_print_duration, self.pricing_standard)
-
-        # 确保支撑体积在报告中正确显示
-        result['输入参数']['零件清单'] = formatted_parts
-
-        report = format_terminal_output(result)
+        if self.quote_archive is None:
+            from quote_archive import QuoteArchive
+            self.quote_archive = QuoteArchive()
+
+        # 同一零件清单以相同定价和打印时长重复计算时（STL 模型没有缓存）不再写入报价归档和零件报价历史
+        quote_key = (dict(self.pricing_standard), total_print_duration)
+        record = quote_key != self.recorded_quote
+        self.recorded_quote = quote_key
+
+        # 在后台线程中计算并生成报表（传入定价标准的副本，避免计算过程中被修改）
+        self.run_in_background(calculate_task, self.parts, total_print_duration, dict(self.pricing_standard),
+                               cache=self.quote_cache, parts_digest=self.parts_digest,
+                               archive=self.quote_archive if record else None,
+                               history=self.part_history if record else None, diagnostics=self.diagnostics,
+                               distribution=self.distribution_checkbox.isChecked(),
+                               on_finished=self.on_cost_calculated, error_title="成本计算失败")
+
+    def on_cost_calculated(self, calculation):
+        result, report_lines, self.live_quote = calculation
         self.result_output.setStyleSheet("color: black; font-size: 12pt;")  # 恢复正常字体颜色
-        self.result_output.setPlainText(report)
+        self.record_duration_sample(result['输入参数']['总打印时长'])
+        set_text_incrementally(self.result_output, report_lines)
 
         # 显示结果显示框
         self.result_output.parentWidget().setVisible(True)
@@ -716,15 +934,95 @@ class CostCalculatorApp(QWidget):
         if self.export_checkbox.isChecked():
             filename, _ = QFileDialog.getSaveFileName(self, "保存为 Excel", "多零件预算报告.xlsx", "Excel 文件 (*.xlsx)")
             if filename:
-                export_to_excel(result, filename)
-                self.result_output.appendPlainText(f"\n报表已保存至：{filename}")
+                self.run_in_background(
+                    export_task, result, filename, diagnostics=self.diagnostics,
+                    on_finished=lambda _: self.result_output.appendPlainText(f"\n报表已保存至：{filename}"),
+                    error_title="导出 Excel 失败"
+                )
+
+    def schedule_live_reprice(self):
+        """参数输入框内容改变：重新开始防抖计时"""
+        if self.live_quote is not None:
+            self.live_timer.start()
+
+    def reprice_live(self):
+        """按当前输入框的参数增量重算，只替换报表中的打印时长行和费用明细部分"""
+        if self.live_quote is None or self.current_worker is not None:
+            return
+        fill_timer = getattr(self.result_output, "_fill_timer", None)
+        if fill_timer is not None and fill_timer.isActive():
+            # 报表还在分批写入结果框，稍后再更新
+            self.live_timer.start()
+            return
+
+        pricing_standard = {}
+        for param, input_field in self.param_inputs.items():
+            try:
+                pricing_standard[param] = float(input_field.text())
+            except ValueError:
+                return  # 输入尚未完成（空白、只有小数点等），等待下一次改动
+        total_print_duration = self.duration_input.text().strip()
+        if not total_print_duration:
+            return
+
+        live_quote = reprice_quote(self.live_quote, pricing_standard, total_print_duration)
+        if live_quote is None:
+            return
+        self.apply_live_quote(live_quote)
+
+    def apply_live_quote(self, live_quote):
+        """把增量重算的结果写回报表（按行号替换，零件清单部分保持不动）"""
+        previous = self.live_quote['result']
+        self.live_quote = live_quote
+        self.pricing_standard.update(live_quote['result']['定价标准'])
+
+        result = live_quote['result']
+        self.replace_cost_lines(previous, result)
+        if result['输入参数']['总打印时长'] != previous['输入参数']['总打印时长']:
+            replace_text_lines(self.result_output, REPORT_DURATION_LINE, REPORT_DURATION_LINE,
+                               format_duration_line(result))
+        if 'factors' in live_quote:
+            # 成本分布在后台按同一批样本重新估计，完成前报表中不显示过期的分布
+            self.distribution_worker = start_worker(
+                distribution_task, live_quote['aggregates'], result['定价标准'], live_quote['factors'],
+                on_finished=lambda distribution: self.on_distribution_updated(live_quote, distribution))
+
+    def replace_cost_lines(self, previous, result):
+        """把报表末尾的费用明细从 previous 的内容替换为 result 的内容（两者行数可以不同）"""
+        cost_line = self.live_quote['cost_line']
+        previous_lines = "\n".join(format_cost_lines(previous)).count("\n")
+        replace_text_lines(self.result_output, cost_line, cost_line + previous_lines,
+                           "\n".join(format_cost_lines(result)))
+
+    def on_distribution_updated(self, live_quote, distribution):
+        """后台重新估计的成本分布：参数在此期间没有再改动时写入报表"""
+        if live_quote is not self.live_quote:
+            return
+        result = live_quote['result']
+        previous = dict(result)
+        result['成本分布'] = distribution
+        self.replace_cost_lines(previous, result)
 
 if __name__ == "__main__":
     import sys
     import os
+    import multiprocessing
     from PyQt5.QtGui import QIcon
     from PyQt5.QtWidgets import QApplication
 
+    # 打包后的 exe 中进程池的子进程也从这里启动
+    multiprocessing.freeze_support()
+
+    # 命令行批量报价模式：3dbudgcalc --batch <目录或通配符> [选项]
+    if len(sys.argv) > 1 and sys.argv[1] == "--batch":
+        from batch_cli import main
+        sys.exit(main(sys.argv[2:]))
+
+    # 本地 HTTP 报价服务：3dbudgcalc --serve [--port 8765]
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        from quote_server import main
+        sys.exit(main(sys.argv[2:]))
+
     # 获取图标路径
     if hasattr(sys, '_MEIPASS'):
         icon_path = os.path.join(sys._MEIPASS, "3dprint.ico")
@@ -0,0 +1,181 @@
+"""批量报价命令行：用进程池并行解析、计价整个文件夹的 Magics 体积报告
+
+用法示例：
+    python batch_cli.py reports/ --durations durations.json --summary 汇总.xlsx
+    python batch_cli.py "reports/2025-06/*.xlsm" --pricing pricing.json --default-duration 1天2小时 --export-dir out/
+    python batch_cli.py reports/ --durations durations.json --workbook 本周报价.xlsx
+
+pricing.json 为定价标准（键与 GUI 中的参数名相同，可只写需要覆盖的项）；
+durations.json 为 {"报告文件名（不含扩展名）": "X天Y小时Z分W秒"}，
+未列出的报告使用 --default-duration，两者都没有时在汇总表中标记为失败。
+成功计价的报告同时追加到报价历史归档（见 quote_archive.py）和零件报价历史（见 part_history.py），
+--no-archive 时都不记录。
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cost_module import DEFAULT_PRICING_STANDARD, apply_pricing_overrides, calculate_multipart_cost
+from part_history import PartHistory
+from quote_archive import QuoteArchive, quote_record
+from xlsx_export import export_builds_to_excel, export_to_excel
+from xlsm_fast_reader import read_parts
+
+# 汇总表的列（费用列顺序与 "计算明细" 一致）
+SUMMARY_COLUMNS = ["文件", "零件数量", "总打印时长", "材料费用", "机时费用", "氩气费用",
+                   "后处理费", "总费用", "实际费用", "状态"]
+
+
+def find_reports(inputs):
+    """展开目录和通配符，返回去重排序后的 xlsm 文件列表"""
+    reports = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            reports.update(glob.glob(os.path.join(item, "*.xlsm")))
+        else:
+            reports.update(path for path in glob.glob(item) if os.path.isfile(path))
+    return sorted(reports)
+
+
+def load_pricing(pricing_file):
+    """读取定价文件并覆盖默认定价标准"""
+    if not pricing_file:
+        return dict(DEFAULT_PRICING_STANDARD)
+    with open(pricing_file, encoding="utf-8") as f:
+        overrides = json.load(f)
+    try:
+        return apply_pricing_overrides(overrides)
+    except ValueError as e:
+        raise ValueError(f"定价文件 {pricing_file} 有误：{e}") from None
+
+
+def load_durations(durations_file):
+    """读取 {报告名: 打印时长} 映射"""
+    if not durations_file:
+        return {}
+    with open(durations_file, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def quote_report(task):
+    """子进程任务：解析并计价一个报告，返回 (汇总行, 计价结果, 归档记录)
+
+    只有需要合并报表时才把计价结果（含零件清单）传回主进程，只有需要归档时才生成归档记录，否则为 None。
+    """
+    file_path, total_print_duration, pricing_standard, export_dir, keep_result, keep_record = task
+    row = {"文件": os.path.basename(file_path), "总打印时长": total_print_duration}
+    if not total_print_duration:
+        row["状态"] = "缺少打印时长"
+        return row, None, None
+    try:
+        parts = read_parts(file_path)
+        result = calculate_multipart_cost(parts, total_print_duration, pricing_standard)
+        if export_dir:
+            stem = os.path.splitext(os.path.basename(file_path))[0]
+            export_to_excel(result, os.path.join(export_dir, f"{stem}_预算报告.xlsx"))
+    except Exception as e:
+        row["状态"] = f"失败：{e}"
+        return row, None, None
+
+    row["零件数量"] = len(parts)
+    row.update(result["计算明细"])
+    row["状态"] = "成功"
+    return row, (result if keep_result else None), (quote_record(result) if keep_record else None)
+
+
+def write_summary(rows, summary_path):
+    """写出汇总表（.csv 或 .xlsx）"""
+    import pandas as pd
+
+    frame = pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+    if summary_path.lower().endswith(".csv"):
+        frame.to_csv(summary_path, index=False, encoding="utf-8-sig")
+    else:
+        frame.to_excel(summary_path, index=False, sheet_name="报价汇总")
+
+
+def run_batch(reports, pricing_standard, durations, default_duration=None, export_dir=None, jobs=None,
+              workbook=None, detail_sheets=True, archive=None, history=None):
+    """并行计价全部报告，返回与 reports 顺序一致的汇总行
+
+    给出 workbook 时，另把所有成功计价的报告按 reports 的顺序合并导出到这一个工作簿；
+    给出 archive（QuoteArchive）、history（PartHistory）时，把这些报价一次追加到其中。
+    """
+    keep_result = workbook is not None
+    keep_record = archive is not None or history is not None
+    tasks = [
+        (path, durations.get(os.path.splitext(os.path.basename(path))[0], default_duration),
+         pricing_standard, export_dir, keep_result, keep_record)
+        for path in reports
+    ]
+    # 大文件优先提交，避免最后只剩一个大报告拖慢整体
+    order = sorted(range(len(tasks)), key=lambda i: os.path.getsize(tasks[i][0]), reverse=True)
+    rows = [None] * len(tasks)
+    results = [None] * len(tasks)
+    records = [None] * len(tasks)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for index, (row, result, record) in zip(order, executor.map(quote_report, [tasks[i] for i in order])):
+            rows[index] = row
+            results[index] = result
+            records[index] = record
+
+    records = [record for record in records if record is not None]
+    if archive is not None:
+        archive.append(records)
+    if history is not None:
+        history.add_quotes(records)
+
+    if keep_result:
+        def builds():
+            for index, path in enumerate(reports):
+                result, results[index] = results[index], None  # 写完即释放
+                if result is not None:
+                    yield os.path.splitext(os.path.basename(path))[0], result
+        export_builds_to_excel(builds(), workbook, detail_sheets=detail_sheets,
+                               count=sum(result is not None for result in results))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量计算 Magics 体积报告的打印成本")
+    parser.add_argument("inputs", nargs="+", help="报告所在目录或通配符（如 reports/*.xlsm）")
+    parser.add_argument("--pricing", help="定价标准 JSON 文件（缺省使用默认定价）")
+    parser.add_argument("--durations", help="打印时长 JSON 文件：{报告名: 打印时长}")
+    parser.add_argument("--default-duration", help="未在打印时长文件中列出的报告使用的时长")
+    parser.add_argument("--summary", default="批量报价汇总.xlsx", help="汇总表路径（.xlsx 或 .csv）")
+    parser.add_argument("--export-dir", help="为每个报告生成单独的预算报表到此目录")
+    parser.add_argument("--workbook", help="把所有报告合并导出到这一个工作簿（汇总表 + 每个报告一个明细表）")
+    parser.add_argument("--no-details", action="store_true", help="合并工作簿中只写汇总表，不写各报告的明细表")
+    parser.add_argument("--jobs", type=int, default=None, help="并行进程数（缺省为 CPU 核数）")
+    parser.add_argument("--no-archive", action="store_true", help="不把本次报价记录到报价历史归档和零件报价历史")
+    args = parser.parse_args(argv)
+
+    reports = find_reports(args.inputs)
+    if not reports:
+        print("没有找到任何 xlsm 报告")
+        return 1
+
+    pricing_standard = load_pricing(args.pricing)
+    durations = load_durations(args.durations)
+    if args.export_dir:
+        os.makedirs(args.export_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    rows = run_batch(reports, pricing_standard, durations, args.default_duration, args.export_dir, args.jobs,
+                     workbook=args.workbook, detail_sheets=not args.no_details,
+                     archive=None if args.no_archive else QuoteArchive(),
+                     history=None if args.no_archive else PartHistory())
+    write_summary(rows, args.summary)
+    elapsed = time.perf_counter() - start
+
+    failed = sum(row["状态"] != "成功" for row in rows)
+    print(f"已处理 {len(rows)} 个报告（失败 {failed} 个），耗时 {elapsed:.2f} 秒，汇总表：{args.summary}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""批量报价引擎：一次向量化计算成千上万个打印批次的费用
+
+计算公式与 cost_module.calculate_multipart_cost 完全一致（运算顺序也相同），取整也与其中的
+内置 round 逐项一致（见 round_costs），因此每个批次的结果与逐个调用标量函数的结果分毫不差。
+"""
+import numpy as np
+
+from cost_module import convert_duration_to_hours
+
+# 费用列，顺序与 calculate_multipart_cost 返回的 "计算明细" 一致
+COST_COLUMNS = ("材料费用", "机时费用", "氩气费用", "后处理费", "总费用", "实际费用")
+
+# 放大后的小数部分与 0.5 相差不超过此相对误差的元素视为可能的进位边界，改用内置 round 逐个取整
+ROUND_TIE_TOLERANCE = 1e-12
+
+
+def round_costs(values, decimals=2):
+    """向量化取整，结果与逐项调用内置 round(value, decimals) 完全相同
+
+    np.round 先乘 10^decimals 再取整，乘法的舍入误差会把 7.515（二进制略小于 7.515）变成 751.5，
+    进位为 7.52；内置 round 按二进制的精确值取整得 7.51。只有放大后恰好落在 .5 附近的元素才可能不同，
+    这些元素（通常极少）改用内置 round，其余元素 np.round 的结果即为正确值。
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scaled = values * 10.0 ** decimals
+    rounded = np.round(values, decimals)
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) <= ROUND_TIE_TOLERANCE * np.maximum(np.abs(scaled), 1.0)
+    if ties.any():
+        rounded[ties] = [round(value, decimals) for value in values[ties].tolist()]
+    return rounded
+
+
+def durations_to_hours(durations):
+    """将一整列打印时长一次性转换为小时数组
+
+    数值列直接视为小时；字符串列先去重，每个不同的取值只解析一次；
+    混合了数值和字符串的 object 列逐项经 convert_duration_to_hours 的 LRU 缓存转换。
+    """
+    durations = np.asarray(durations)
+    if durations.dtype.kind in "iuf":
+        return durations.astype(np.float64)
+    if durations.dtype.kind == "U":
+        values, inverse = np.unique(durations, return_inverse=True)
+        hours = np.fromiter(map(convert_duration_to_hours, values.tolist()), dtype=np.float64, count=len(values))
+        return hours[inverse.reshape(-1)]
+    return np.fromiter(map(convert_duration_to_hours, durations.tolist()), dtype=np.float64, count=len(durations))
+
+
+def factorize_builds(build_ids):
+    """按首次出现的顺序为批次编号分配连续整数码
+
+    返回 (批次编号数组, 每行对应的批次码, 每个批次首行的行号)
+    """
+    build_ids = np.asarray(build_ids)
+    if len(build_ids) and np.all(build_ids[1:] >= build_ids[:-1]):
+        # 已排序（历史数据通常按批次连续存放）：线性扫描即可，无需排序去重
+        starts = np.flatnonzero(np.concatenate(([True], build_ids[1:] != build_ids[:-1])))
+        codes = np.cumsum(np.concatenate(([0], build_ids[1:] != build_ids[:-1])))
+        return build_ids[starts], codes, starts
+
+    unique_ids, first_index, inverse = np.unique(build_ids, return_index=True, return_inverse=True)
+    order = np.argsort(first_index, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return unique_ids[order], rank[inverse.reshape(-1)], first_index[order]
+
+
+def broadcast_cost_terms(total_volume, machine_hours, pricing_standard):
+    """按 COST_COLUMNS 的顺序返回各项费用数组（未取整）
+
+    total_volume、machine_hours 以及 pricing_standard 中的各项取值都可以是数组，按 numpy 规则广播，
+    结果数组的形状为所有输入广播后的形状；运算顺序与 calculate_multipart_cost 相同。
+    """
+    # 总材料计算，使用零件体积和支撑体积的总和
+    material_weight_g = (total_volume * 1e-3 * pricing_standard["钛粉密度"]
+                         * pricing_standard["用量比例"] * pricing_standard["致密系数"])
+    material_cost = material_weight_g * pricing_standard["材料单价"] * 1e-3
+
+    # 机时费用
+    machine_cost = machine_hours * pricing_standard["机时费率"]
+
+    # 其他费用（与批次无关的常数项）
+    argon_cost = pricing_standard["氩气单价"] * pricing_standard["氩气用量"] * pricing_standard["氩气数量"]
+    post_processing = pricing_standard["后处理费"]
+
+    # 费用汇总
+    total_cost = material_cost + machine_cost + argon_cost + post_processing
+    actual_cost = total_cost * pricing_standard["折扣优惠"]
+
+    # 只与定价有关的费用项（氩气、后处理）展开成与合计相同的形状
+    shape = np.shape(actual_cost)
+    return tuple(
+        np.asarray(cost, dtype=np.float64) if np.shape(cost) == shape else np.full(shape, cost, dtype=np.float64)
+        for cost in (material_cost, machine_cost, argon_cost, post_processing, total_cost, actual_cost)
+    )
+
+
+def calculate_batch_cost(part_volumes, support_volumes, build_ids, durations, pricing_standard, decimals=2):
+    """批量计算多个打印批次的费用
+
+    part_volumes / support_volumes / build_ids 为逐零件的列（长度相同），
+    support_volumes 可为 None（视为 0）。durations 可以是逐零件的列（取每个批次首行的值），
+    也可以是按批次首次出现顺序排列的逐批次列；取值为时长字符串或小时数。
+
+    返回字典：批次编号、零件数量、机时（小时）以及 COST_COLUMNS 中的各项费用数组，
+    批次按首次出现的顺序排列。费用保留 decimals 位小数，decimals 为 None 时不取整。
+    """
+    part_volumes = np.asarray(part_volumes, dtype=np.float64)
+    if support_volumes is None:
+        support_volumes = np.zeros_like(part_volumes)
+    else:
+        support_volumes = np.asarray(support_volumes, dtype=np.float64)
+    if not (len(part_volumes) == len(support_volumes) == len(build_ids)):
+        raise ValueError("零件体积、支撑体积和批次编号的长度必须一致")
+
+    ids, codes, first_rows = factorize_builds(build_ids)
+    build_count = len(ids)
+
+    durations = np.asarray(durations)
+    if len(durations) == len(part_volumes):
+        durations = durations[first_rows]
+    elif len(durations) != build_count:
+        raise ValueError("打印时长的长度必须等于零件行数或批次数")
+    machine_hours = durations_to_hours(durations)
+
+    # 总材料计算，使用零件体积和支撑体积的总和（bincount 按行顺序累加，与 sum() 一致）
+    total_volume = np.bincount(codes, weights=part_volumes + support_volumes, minlength=build_count)
+    part_count = np.bincount(codes, minlength=build_count)
+
+    costs = broadcast_cost_terms(total_volume, machine_hours, pricing_standard)
+    result = {"批次编号": ids, "零件数量": part_count, "机时": machine_hours}
+    for column, values in zip(COST_COLUMNS, costs):
+        result[column] = values if decimals is None else round_costs(values, decimals)
+    return result
+
+
+def calculate_batch_cost_frame(frame, pricing_standard, volume_column="volume",
+                               support_column="support_volume", build_column="build_id",
+                               duration_column="duration"):
+    """DataFrame 版本的批量报价，返回每个批次一行的 DataFrame"""
+    import pandas as pd
+
+    support_volumes = frame[support_column].to_numpy() if support_column in frame else None
+    result = calculate_batch_cost(
+        frame[volume_column].to_numpy(),
+        support_volumes,
+        frame[build_column].to_numpy(),
+        frame[duration_column].to_numpy(),
+        pricing_standard,
+    )
+    return pd.DataFrame(result)
@@ -0,0 +1,248 @@
+"""多成型版、多机型排产：把一张订单的零件分配到若干成型版上，分别计价并汇总
+
+calculate_multipart_cost 假定所有零件在同一版上打印、只收一次氩气和后处理费；
+订单较大时需要拆成多版、分给不同尺寸和费率的机器。这里的做法：
+  1. 零件按高度从高到低排序，高的零件集中在同一版上，矮的零件填在空位里不增加层数；
+  2. 逐版贪心：对每种机型都尝试用剩余零件排满一版（货架式二维装箱，零件可旋转 90°），
+     取 每单位零件体积费用 最低的机型开出这一版，直到零件全部排完；
+  3. 每版的打印时长由 print_time.estimate_volume_hours 按零件体积和最高零件的高度估算，
+     按该机型的定价（机时费率、氩气单价等覆盖项）调用 calculate_multipart_cost 计价；
+  4. 同一机型的各版按最长加工时间优先（LPT）分配给该机型的各台机器，给出完工时间。
+装箱时遇到放不下的零件会继续向后查看，连续 LOOKAHEAD 个都放不下即结束这一版，
+因此每开一版的耗时与版上零件数成正比，上万个零件的订单也只需几秒。
+
+零件需要占地尺寸：零件字典中的 width、depth、height（mm），或 stl_reader 给出的包围盒 bbox_min、bbox_max。
+机型目录为字典列表，见 DEFAULT_MACHINES；命令行中用 JSON 文件给出。
+
+命令行：python build_scheduler.py 零件.json|零件.stl ... [--machines machines.json] [--workbook 排产报价.xlsx]
+"""
+import argparse
+import glob
+import json
+import sys
+import time
+
+from cost_module import (DEFAULT_PRICING_STANDARD, apply_pricing_overrides, calculate_multipart_cost,
+                         format_duration, price_cost_terms)
+from print_time import DEFAULT_PRINT_PARAMETERS, estimate_volume_hours
+
+# 缺省机型目录：plate 为成型版的宽、深（mm），max_height 为最大成型高度（mm），count 为该机型的台数，
+# pricing 覆盖定价标准中与机型有关的参数，print_parameters 覆盖 print_time 的打印参数
+DEFAULT_MACHINES = [
+    {"name": "标准机型", "plate": (250.0, 250.0), "max_height": 300.0, "count": 1,
+     "pricing": {}, "print_parameters": {}},
+]
+
+# 零件之间的最小间距（mm）
+DEFAULT_GAP = 5.0
+
+# 装箱时连续放不下多少个零件后结束这一版
+LOOKAHEAD = 256
+
+
+def part_footprint(part):
+    """零件的 (宽, 深, 高)（mm）：优先取 width/depth/height，否则由包围盒计算"""
+    if 'width' in part:
+        return float(part['width']), float(part['depth']), float(part['height'])
+    if 'bbox_min' in part:
+        return tuple(float(high - low) for low, high in zip(part['bbox_min'], part['bbox_max']))
+    raise ValueError(f"零件 {part.get('name', '')} 缺少占地尺寸（width/depth/height 或包围盒）")
+
+
+def prepare_machine(machine, pricing_standard=DEFAULT_PRICING_STANDARD, print_parameters=DEFAULT_PRINT_PARAMETERS):
+    """补全机型的缺省字段，合并定价标准和打印参数"""
+    width, depth = machine["plate"]
+    return {
+        "name": machine["name"],
+        "plate": (float(width), float(depth)),
+        "max_height": float(machine.get("max_height", float("inf"))),
+        "count": int(machine.get("count", 1)),
+        "pricing": apply_pricing_overrides(machine.get("pricing", {}), pricing_standard),
+        "print_parameters": {**print_parameters, **machine.get("print_parameters", {})},
+    }
+
+
+def pack_plate(order, footprints, plate, max_height, gap=DEFAULT_GAP, lookahead=LOOKAHEAD):
+    """按 order 的顺序把零件放到一块成型版上（货架式首次适应），返回 [(零件序号, x, y, 是否旋转)]
+
+    货架沿 Y 方向依次排开，深度由开出货架的零件决定；零件优先放进已有货架（取宽度较小且放得下的朝向），
+    放不下时另开货架（取深度较小的朝向）。连续 lookahead 个零件放不下时结束。
+    """
+    plate_width, plate_depth = plate
+    shelves = []  # [货架起点 y, 货架深度, 下一个零件的 x]
+    next_y = 0.0
+    placed = []
+    misses = 0
+    for index in order:
+        width, depth, height = footprints[index]
+        if height > max_height:
+            misses += 1
+            if misses >= lookahead:
+                break
+            continue
+        position = None
+        orientations = sorted({(width, depth, False), (depth, width, True)})  # 宽度较小的朝向在前
+        for shelf in shelves:
+            for w, d, rotated in orientations:
+                if d <= shelf[1] and shelf[2] + w <= plate_width:
+                    position = (shelf[2], shelf[0], rotated)
+                    shelf[2] += w + gap
+                    break
+            if position is not None:
+                break
+        if position is None:
+            # 另开货架：深度较小的朝向
+            for w, d, rotated in sorted(orientations, key=lambda o: (o[1], o[0])):
+                if w <= plate_width and next_y + d <= plate_depth:
+                    position = (0.0, next_y, rotated)
+                    shelves.append([next_y, d, w + gap])
+                    next_y += d + gap
+                    break
+        if position is None:
+            misses += 1
+            if misses >= lookahead:
+                break
+            continue
+        misses = 0
+        placed.append((index, *position))
+    return placed
+
+
+def plate_terms(parts, placed, footprints, machine):
+    """一版的 (机时, 未取整的各项费用, 零件体积)"""
+    volume = sum(parts[index]['volume'] for index, *_ in placed)
+    support = sum(parts[index].get('support_volume', 0.0) for index, *_ in placed)
+    height = max(footprints[index][2] for index, *_ in placed)
+    hours = float(estimate_volume_hours(volume, height, machine["print_parameters"]))
+    terms = price_cost_terms({"总体积": volume + support, "机时": hours}, machine["pricing"])
+    return hours, terms, volume
+
+
+def assign_printers(plates, machines):
+    """同一机型的各版按机时从长到短依次分给当前最早空闲的机器，返回 {机器名称: 总机时}"""
+    printers = {}
+    for machine in machines:
+        loads = {f"{machine['name']}#{k + 1}": 0.0 for k in range(machine["count"])}
+        for plate in sorted((p for p in plates if p["machine"] == machine["name"]), key=lambda p: -p["hours"]):
+            printer = min(loads, key=loads.get)
+            plate["printer"] = printer
+            loads[printer] += plate["hours"]
+        printers.update(loads)
+    return printers
+
+
+def schedule_builds(parts, machines=DEFAULT_MACHINES, pricing_standard=DEFAULT_PRICING_STANDARD,
+                    print_parameters=DEFAULT_PRINT_PARAMETERS, gap=DEFAULT_GAP, progress=None):
+    """把零件分配到各机型的成型版上并逐版计价
+
+    返回字典：
+      'plates'：每版一个字典 {'machine', 'printer', 'parts'（零件字典列表）, 'positions'（[(x, y, 是否旋转)]）,
+                'height', 'hours', 'duration', 'quote'（calculate_multipart_cost 的结果）}
+      'total_cost'（各版实际费用之和）、'printers'（{机器: 总机时}）、'makespan_hours'（最晚完工的机器的机时）
+    progress(已排零件数, 总数) 为可选的进度回调。放不进任何机型的零件抛出 ValueError。
+    """
+    machines = [prepare_machine(machine, pricing_standard, print_parameters) for machine in machines]
+    footprints = [part_footprint(part) for part in parts]
+    for part, (width, depth, height) in zip(parts, footprints):
+        if not any(height <= m["max_height"] and min(width, depth) <= min(m["plate"])
+                   and max(width, depth) <= max(m["plate"]) for m in machines):
+            raise ValueError(f"零件 {part.get('name', '')}（{width:.0f} × {depth:.0f} × {height:.0f} mm）超出所有机型的成型范围")
+
+    remaining = sorted(range(len(parts)), key=lambda i: (-footprints[i][2], -footprints[i][0] * footprints[i][1]))
+    plates = []
+    while remaining:
+        best = None
+        for machine in machines:
+            placed = pack_plate(remaining, footprints, machine["plate"], machine["max_height"], gap)
+            if not placed:
+                continue
+            hours, terms, volume = plate_terms(parts, placed, footprints, machine)
+            score = terms["实际费用"] / volume if volume > 0 else terms["实际费用"] / len(placed)
+            if best is None or score < best[0]:
+                best = (score, machine, placed, hours)
+        if best is None:
+            # 预检查已保证每个零件至少能单独放进某个机型，这里只是防御
+            raise ValueError(f"零件 {parts[remaining[0]].get('name', '')} 无法排入任何机型")
+
+        _, machine, placed, hours = best
+        plate_parts = [parts[index] for index, *_ in placed]
+        duration = format_duration(hours * 3600)
+        plates.append({
+            "machine": machine["name"],
+            "parts": plate_parts,
+            "positions": [tuple(position) for _, *position in placed],
+            "height": max(footprints[index][2] for index, *_ in placed),
+            "hours": hours,
+            "duration": duration,
+            "quote": calculate_multipart_cost(plate_parts, duration, machine["pricing"]),
+        })
+        taken = {index for index, *_ in placed}
+        remaining = [index for index in remaining if index not in taken]
+        if progress is not None:
+            progress(len(parts) - len(remaining), len(parts))
+
+    printers = assign_printers(plates, machines)
+    return {
+        "plates": plates,
+        "total_cost": sum(plate["quote"]["计算明细"]["实际费用"] for plate in plates),
+        "printers": printers,
+        "makespan_hours": max(printers.values(), default=0.0),
+    }
+
+
+def load_order(inputs):
+    """读取零件：.json 为零件字典列表，.stl 由网格计算体积、支撑和包围盒"""
+    parts, stl_files = [], []
+    for item in inputs:
+        for path in sorted(glob.glob(item)) or [item]:
+            if path.lower().endswith(".stl"):
+                stl_files.append(path)
+            else:
+                with open(path, encoding="utf-8") as f:
+                    parts.extend(json.load(f))
+    if stl_files:
+        from stl_reader import load_stl_parts
+        parts.extend(load_stl_parts(stl_files, support={})[0])
+    return parts
+
+
+def main(argv=None):
+    from batch_cli import load_pricing
+    from xlsx_export import export_builds_to_excel
+
+    parser = argparse.ArgumentParser(description="把订单零件分配到多台机器的成型版上并计价")
+    parser.add_argument("inputs", nargs="+", help="零件 JSON 文件（[{name, volume, support_volume, width, depth, height}]）"
+                                                  "或 STL 文件，可用通配符")
+    parser.add_argument("--machines", help="机型目录 JSON 文件（缺省为单一标准机型）")
+    parser.add_argument("--pricing", help="定价标准 JSON 文件（缺省使用默认定价）")
+    parser.add_argument("--gap", type=float, default=DEFAULT_GAP, help="零件间距（mm）")
+    parser.add_argument("--workbook", help="把各版报价导出到这一个工作簿（汇总表 + 每版一个明细表）")
+    args = parser.parse_args(argv)
+
+    machines = DEFAULT_MACHINES
+    if args.machines:
+        with open(args.machines, encoding="utf-8") as f:
+            machines = json.load(f)
+    parts = load_order(args.inputs)
+
+    start = time.perf_counter()
+    try:
+        schedule = schedule_builds(parts, machines, load_pricing(args.pricing), gap=args.gap)
+    except ValueError as e:
+        print(e)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    for number, plate in enumerate(schedule["plates"], 1):
+        print(f"第 {number} 版 {plate['printer']}：{len(plate['parts'])} 个零件，高度 {plate['height']:.1f} mm，"
+              f"{plate['duration']}，实际费用 {plate['quote']['计算明细']['实际费用']:.2f} 元")
+    print(f"{len(parts)} 个零件排为 {len(schedule['plates'])} 版，总费用 {schedule['total_cost']:.2f} 元，"
+          f"完工需 {format_duration(schedule['makespan_hours'] * 3600)}（排产耗时 {elapsed:.2f} 秒）")
+    if args.workbook:
+        export_builds_to_excel([(f"第{number}版_{plate['printer']}", plate["quote"])
+                                for number, plate in enumerate(schedule["plates"], 1)], args.workbook)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""成本计算核心模块（不依赖 Qt，可供 GUI、批量报价等共用）"""
+import re
+from functools import lru_cache
+
+from result_model import PartTable
+
+# 默认定价标准（GUI 初始值，批量/命令行报价的缺省值）
+DEFAULT_PRICING_STANDARD = {
+    "钛粉密度": 4.50,         # 单位：g/cm³
+    "致密系数": 0.9995,       # 无量纲
+    "用量比例": 1.5,          # 无量纲
+    "材料单价": 1800,          # 元/公斤
+    "机时费率": 250,          # 元/小时
+    "氩气数量": 1,            # 无量纲
+    "氩气单价": 1800,         # 元
+    "氩气用量": 0.8,          # 无量纲
+    "后处理费": 1500,         # 元
+    "折扣优惠": 1.0           # 百分比
+}
+
+# 导出等长耗时操作汇报进度的行间隔
+PROGRESS_INTERVAL = 1000
+
+# 各费用项依赖的定价参数和汇总量（"总体积"、"机时" 来自零件清单和打印时长）
+COST_TERM_INPUTS = {
+    "材料费用": ("总体积", "钛粉密度", "用量比例", "致密系数", "材料单价"),
+    "机时费用": ("机时", "机时费率"),
+    "氩气费用": ("氩气单价", "氩气用量", "氩气数量"),
+    "后处理费": ("后处理费",),
+}
+
+
+def _material_cost(aggregates, pricing_standard):
+    material_weight_g = (aggregates["总体积"] * 1e-3 * pricing_standard["钛粉密度"]
+                         * pricing_standard["用量比例"] * pricing_standard["致密系数"])
+    return material_weight_g * pricing_standard["材料单价"] * 1e-3
+
+
+COST_TERM_FUNCTIONS = {
+    "材料费用": _material_cost,
+    "机时费用": lambda aggregates, pricing_standard: aggregates["机时"] * pricing_standard["机时费率"],
+    "氩气费用": lambda aggregates, pricing_standard: (
+        pricing_standard["氩气单价"] * pricing_standard["氩气用量"] * pricing_standard["氩气数量"]),
+    "后处理费": lambda aggregates, pricing_standard: pricing_standard["后处理费"],
+}
+
+
+def apply_pricing_overrides(overrides, base=DEFAULT_PRICING_STANDARD):
+    """用 overrides 覆盖定价标准（可只给出部分参数），返回新字典
+
+    未知参数或无法转换为数字的取值抛出 ValueError。
+    """
+    unknown = set(overrides) - set(base)
+    if unknown:
+        raise ValueError(f"未知的定价参数：{'、'.join(sorted(unknown))}")
+    try:
+        values = {param: float(value) for param, value in overrides.items()}
+    except (TypeError, ValueError):
+        raise ValueError("定价参数的取值必须是数字") from None
+    return {**base, **values}
+
+
+def quote_aggregates(parts, total_print_duration):
+    """与定价无关的汇总量：总体积（零件 + 支撑）、零件数量、机时（小时）"""
+    parts = PartTable.from_parts(parts)
+    return {
+        "总体积": parts.total_volume(),
+        "零件数量": len(parts),
+        "机时": convert_duration_to_hours(total_print_duration),
+    }
+
+
+def price_cost_terms(aggregates, pricing_standard, previous_terms=None, changed=None):
+    """由汇总量计算未取整的各项费用
+
+    给出上次的结果 previous_terms 和改动过的参数/汇总量名称集合 changed 时，
+    只重算依赖这些输入的费用项，其余沿用上次的值；合计与实付金额总是重新汇总。
+    """
+    terms = {}
+    for term, inputs in COST_TERM_INPUTS.items():
+        if previous_terms is None or changed is None or not changed.isdisjoint(inputs):
+            terms[term] = COST_TERM_FUNCTIONS[term](aggregates, pricing_standard)
+        else:
+            terms[term] = previous_terms[term]
+
+    # 费用汇总
+    terms["总费用"] = terms["材料费用"] + terms["机时费用"] + terms["氩气费用"] + terms["后处理费"]
+    terms["实际费用"] = terms["总费用"] * pricing_standard["折扣优惠"]
+    return terms
+
+
+def round_cost_terms(terms):
+    """各项费用保留两位小数（"计算明细" 的取值）"""
+    return {term: round(value, 2) for term, value in terms.items()}
+
+
+def calculate_multipart_cost(parts, total_print_duration, pricing_standard):
+    """计算多零件合并打印的费用
+
+    parts 为零件字典列表或 PartTable；返回结果中的 "零件清单" 是 PartTable，
+    体积保持为数值，由报表/导出在渲染时格式化。
+    """
+    parts = PartTable.from_parts(parts)
+    aggregates = quote_aggregates(parts, total_print_duration)
+    terms = price_cost_terms(aggregates, pricing_standard)
+
+    return {
+        "输入参数": {
+            "零件清单": parts,
+            "总打印时长": total_print_duration,
+            "零件数量": len(parts)
+        },
+        "定价标准": pricing_standard,
+        "计算明细": round_cost_terms(terms)
+    }
+
+# 打印时长解析：一次编译，支持以下格式
+#   "X天Y小时Z分W秒"（MSC SliceViewer 中文界面，各项可省略）
+#   "1d 4h 11m 46s" / "1 day 4 hours 11 min 46 sec"（SliceViewer 英文界面）
+#   "HH:MM:SS" 或 "HH:MM"
+#   "12.5"（小数小时）
+DURATION_UNIT_PATTERN = re.compile(
+    r'(\d+(?:\.\d+)?)\s*(天|小时|时|分钟|分|秒|days?|d|hours?|hrs?|h|minutes?|mins?|m|seconds?|secs?|s)(?![a-z])',
+    re.IGNORECASE
+)
+DURATION_CHINESE_PATTERN = re.compile(r'(?:(\d+)天)?(?:(\d+)小时)?(?:(\d+)分)?(?:(\d+)秒)?')
+DURATION_CLOCK_PATTERN = re.compile(r'(\d+):(\d{1,2})(?::(\d{1,2}(?:\.\d+)?))?')
+DURATION_DECIMAL_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+# 单位 -> 所属字段（天/时/分/秒）
+DURATION_UNITS = {
+    '天': 'days', 'd': 'days', 'day': 'days', 'days': 'days',
+    '小时': 'hours', '时': 'hours', 'h': 'hours', 'hr': 'hours', 'hrs': 'hours', 'hour': 'hours', 'hours': 'hours',
+    '分': 'minutes', '分钟': 'minutes', 'm': 'minutes', 'min': 'minutes', 'mins': 'minutes',
+    'minute': 'minutes', 'minutes': 'minutes',
+    '秒': 'seconds', 's': 'seconds', 'sec': 'seconds', 'secs': 'seconds', 'second': 'seconds', 'seconds': 'seconds',
+}
+
+
+def _to_number(text):
+    """整数保持 int，使换算结果与原先逐项 int() 的写法完全一致"""
+    return float(text) if '.' in text else int(text)
+
+
+def format_duration(seconds):
+    """秒数转为 "X天Y小时Z分W秒"（不足一天时省略天），convert_duration_to_hours 可直接解析"""
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    text = f"{hours}小时{minutes}分{seconds}秒"
+    return f"{days}天{text}" if days else text
+
+
+@lru_cache(maxsize=4096)
+def convert_duration_to_hours(duration_str):
+    """将打印时长转换为小时数；数值视为小时，无法识别的字符串返回 0
+
+    同一批报告的时长大量重复，结果用有界 LRU 缓存。
+    """
+    if not isinstance(duration_str, str):
+        return float(duration_str)
+    text = duration_str.strip()
+
+    # 最常见的 "X天Y小时Z分W秒" 走一次整串匹配
+    chinese = DURATION_CHINESE_PATTERN.fullmatch(text)
+    if chinese and text:
+        days, hours, minutes, seconds = (int(value) if value else 0 for value in chinese.groups())
+        return days * 24 + hours + minutes / 60 + seconds / 3600
+
+    if DURATION_DECIMAL_PATTERN.fullmatch(text):
+        return float(text)
+
+    clock = DURATION_CLOCK_PATTERN.fullmatch(text)
+    if clock:
+        hours, minutes, seconds = clock.groups()
+        return int(hours) + int(minutes) / 60 + (_to_number(seconds) if seconds else 0) / 3600
+
+    # 初始化时间单位
+    values = {'days': 0, 'hours': 0, 'minutes': 0, 'seconds': 0}
+    for number, unit in DURATION_UNIT_PATTERN.findall(text):
+        values[DURATION_UNITS[unit.lower()]] += _to_number(number)
+
+    # 转换为总小时数
+    return (
+        values['days'] * 24 +
+        values['hours'] +
+        values['minutes'] / 60 +
+        values['seconds'] / 3600
+    )
@@ -0,0 +1,195 @@
+"""报价的不确定性：按给定分布对打印时长、体积、致密系数、用量比例抽样，估计实付金额的分布
+
+点估计的报价假定这些输入都是准确的，而 SliceViewer 的时长和 Magics 的体积本身就是估计值。
+这里对每项输入抽取相对误差因子（取值 = 点估计 × 因子），一次抽取全部样本，
+用 batch_pricing.broadcast_cost_terms 对样本数组向量化计价，给出实付金额的 P50/P90/P99。
+体积误差视为整单共有的系统误差（同一个因子乘以总体积）。
+
+误差分布（见 DEFAULT_UNCERTAINTY，可用 JSON 文件覆盖，键与之相同）：
+  {"分布": "正态", "标准差": s}                        因子 = 1 + N(0, s)
+  {"分布": "均匀", "下限": a, "上限": b}                因子 = 1 + U(a, b)
+  {"分布": "三角", "下限": a, "众数": m, "上限": b}     因子 = 1 + 三角分布(a, m, b)
+  {"分布": "固定"}                                      因子 = 1
+样本按 CHUNK_SAMPLES 分块，每块使用独立的随机数种子（由同一个种子派生），
+单进程计算或分给进程池的结果完全相同。100 万个样本单进程约 0.3 秒。
+
+命令行：python cost_uncertainty.py 报告.xlsm --duration 1天2小时 [--samples 1000000] [--jobs 4] [--uncertainty u.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_pricing import broadcast_cost_terms
+from cost_module import DEFAULT_PRICING_STANDARD
+from quote_cache import default_cache_path
+
+# 缺省的相对误差分布：切片软件的时长多为偏低，体积误差较小
+DEFAULT_UNCERTAINTY = {
+    "打印时长": {"分布": "三角", "下限": -0.10, "众数": 0.0, "上限": 0.20},
+    "体积": {"分布": "正态", "标准差": 0.02},
+    "致密系数": {"分布": "均匀", "下限": -0.0005, "上限": 0.0},
+    "用量比例": {"分布": "均匀", "下限": -0.10, "上限": 0.10},
+}
+
+# 缺省样本数和报告的分位数
+DEFAULT_SAMPLES = 1_000_000
+PERCENTILES = (50, 90, 99)
+
+# 每块样本数（每块独立抽样，也是进程池任务的粒度）
+CHUNK_SAMPLES = 1 << 18
+
+# 各分布所需的参数
+DISTRIBUTION_PARAMETERS = {
+    "正态": ("标准差",),
+    "均匀": ("下限", "上限"),
+    "三角": ("下限", "众数", "上限"),
+    "固定": (),
+}
+
+
+def default_uncertainty_path():
+    return os.path.join(os.path.dirname(default_cache_path()), 'uncertainty.json')
+
+
+def validate_uncertainty(uncertainty):
+    """检查误差分布的写法，返回补全了缺省项的新字典；写法有误时抛出 ValueError"""
+    unknown = set(uncertainty) - set(DEFAULT_UNCERTAINTY)
+    if unknown:
+        raise ValueError(f"未知的不确定输入：{'、'.join(sorted(unknown))}")
+    merged = {**DEFAULT_UNCERTAINTY, **uncertainty}
+    for name, spec in merged.items():
+        kind = spec.get("分布")
+        if kind not in DISTRIBUTION_PARAMETERS:
+            raise ValueError(f"{name} 的分布应为 {'、'.join(DISTRIBUTION_PARAMETERS)} 之一")
+        try:
+            values = [float(spec[key]) for key in DISTRIBUTION_PARAMETERS[kind]]
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"{name} 的{kind}分布需要数值参数：{'、'.join(DISTRIBUTION_PARAMETERS[kind])}") from None
+        if kind == "正态" and values[0] < 0 or kind != "正态" and values != sorted(values):
+            raise ValueError(f"{name} 的分布参数不合理：{spec}")
+    return merged
+
+
+def load_uncertainty(path=None):
+    """读取误差分布文件（缺省为用户数据目录下的 uncertainty.json）；文件不存在或有误时使用缺省分布"""
+    path = path or default_uncertainty_path()
+    try:
+        with open(path, encoding='utf-8') as f:
+            return validate_uncertainty(json.load(f))
+    except FileNotFoundError:
+        return dict(DEFAULT_UNCERTAINTY)
+    except (OSError, ValueError, AttributeError, TypeError) as e:
+        print(f"误差分布文件 {path} 有误（使用缺省分布）：{e}")
+        return dict(DEFAULT_UNCERTAINTY)
+
+
+def sample_factor(rng, spec, count):
+    """按一项误差分布抽取 count 个因子（不小于 0）"""
+    kind = spec["分布"]
+    if kind == "正态":
+        noise = rng.normal(0.0, spec["标准差"], count)
+    elif kind == "均匀":
+        noise = rng.uniform(spec["下限"], spec["上限"], count)
+    elif kind == "三角":
+        low, mode, high = spec["下限"], spec["众数"], spec["上限"]
+        noise = rng.triangular(low, mode, high, count) if high > low else np.full(count, low)
+    else:
+        return np.ones(count)
+    return np.maximum(1.0 + noise, 0.0)
+
+
+def chunk_seeds(seed, samples):
+    """各块的 (样本数, 种子)：由 seed 派生，与进程数无关"""
+    counts = [min(CHUNK_SAMPLES, samples - start) for start in range(0, samples, CHUNK_SAMPLES)]
+    return list(zip(counts, np.random.SeedSequence(seed).spawn(len(counts))))
+
+
+def sample_factors(uncertainty=DEFAULT_UNCERTAINTY, samples=DEFAULT_SAMPLES, seed=0):
+    """抽取全部样本的因子，返回 {输入名称: 因子数组}（未给出的输入使用缺省分布）"""
+    uncertainty = validate_uncertainty(uncertainty)
+    chunks = [_sample_chunk(uncertainty, count, chunk_seed) for count, chunk_seed in chunk_seeds(seed, samples)]
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in uncertainty}
+
+
+def _sample_chunk(uncertainty, count, seed):
+    rng = np.random.default_rng(seed)
+    return {name: sample_factor(rng, spec, count) for name, spec in uncertainty.items()}
+
+
+def simulate_costs(aggregates, pricing_standard, factors):
+    """按抽样的因子对 quote_aggregates 的汇总量逐样本计价，返回实付金额数组"""
+    pricing = dict(pricing_standard,
+                   致密系数=pricing_standard["致密系数"] * factors["致密系数"],
+                   用量比例=pricing_standard["用量比例"] * factors["用量比例"])
+    costs = broadcast_cost_terms(aggregates["总体积"] * factors["体积"], aggregates["机时"] * factors["打印时长"],
+                                 pricing)
+    return costs[-1]
+
+
+def _simulate_chunk(aggregates, pricing_standard, uncertainty, count, seed):
+    """进程池任务：抽取一块样本并计价"""
+    return simulate_costs(aggregates, pricing_standard, _sample_chunk(uncertainty, count, seed))
+
+
+def cost_distribution(costs):
+    """实付金额样本的分位数（保留两位小数），返回 {"P50", "P90", "P99", "样本数"}"""
+    values = np.percentile(costs, PERCENTILES)
+    distribution = {f"P{p}": round(float(value), 2) for p, value in zip(PERCENTILES, values)}
+    distribution["样本数"] = len(costs)
+    return distribution
+
+
+def monte_carlo_quote(aggregates, pricing_standard=DEFAULT_PRICING_STANDARD, uncertainty=DEFAULT_UNCERTAINTY,
+                      samples=DEFAULT_SAMPLES, seed=0, workers=1):
+    """抽样估计实付金额的分布，返回 cost_distribution 的结果
+
+    aggregates 为 cost_module.quote_aggregates 的汇总量（总体积、机时）；
+    workers 为进程数（1 表示在当前进程中计算，None 为 CPU 核数），结果与进程数无关。
+    """
+    uncertainty = validate_uncertainty(uncertainty)
+    if workers == 1:
+        return cost_distribution(simulate_costs(aggregates, pricing_standard,
+                                                sample_factors(uncertainty, samples, seed)))
+    chunks = chunk_seeds(seed, samples)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        costs = list(pool.map(_simulate_chunk, *zip(*((aggregates, pricing_standard, uncertainty, count, chunk_seed)
+                                                       for count, chunk_seed in chunks))))
+    return cost_distribution(np.concatenate(costs))
+
+
+def main(argv=None):
+    from batch_cli import load_pricing
+    from cost_module import quote_aggregates
+    from xlsm_fast_reader import read_parts
+
+    parser = argparse.ArgumentParser(description="蒙特卡洛估计报价的不确定性")
+    parser.add_argument("report", help="Magics 体积报告（xlsm）")
+    parser.add_argument("--duration", required=True, help="打印时长（点估计）")
+    parser.add_argument("--pricing", help="定价标准 JSON 文件（缺省使用默认定价）")
+    parser.add_argument("--uncertainty", help=f"误差分布 JSON 文件（缺省为 {default_uncertainty_path()}）")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="样本数")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument("--jobs", type=int, default=1, help="并行进程数（缺省在当前进程中计算）")
+    args = parser.parse_args(argv)
+
+    aggregates = quote_aggregates(read_parts(args.report), args.duration)
+    if aggregates["机时"] <= 0:
+        print(f"无法识别的打印时长：{args.duration}")
+        return 1
+    start = time.perf_counter()
+    distribution = monte_carlo_quote(aggregates, load_pricing(args.pricing), load_uncertainty(args.uncertainty),
+                                     args.samples, args.seed, args.jobs)
+    elapsed = time.perf_counter() - start
+    print(f"{distribution['样本数']:,} 个样本（耗时 {elapsed:.2f} 秒）：")
+    for p in PERCENTILES:
+        print(f"  P{p} 实付金额：¥{distribution[f'P{p}']:,.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
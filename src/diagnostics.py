@@ -0,0 +1,97 @@
+"""诊断记录：测量报价各环节（读取、计价、生成报表、导出）的耗时、内存峰值和行数
+
+默认关闭（tracemalloc 会让被测代码明显变慢），在界面中勾选或设置环境变量
+BUDGCALC_DIAGNOSTICS=1 后启用。每个环节结束时追加一行 JSON 到日志文件：
+
+    {"time": "...", "stage": "calculate", "seconds": 0.038, "peak_bytes": 1234567, "rows": 100000}
+
+内存峰值为该环节期间 Python 分配的内存相对环节开始时的最大增量（tracemalloc 统计所有线程，
+主线程在此期间的少量分配也会计入）。环节抛出异常时同样记录，并带上 error 字段。
+写日志失败只在终端提示，不影响正常计算。
+"""
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+from quote_cache import default_cache_path
+
+# 启用诊断记录的环境变量
+DIAGNOSTICS_ENV = 'BUDGCALC_DIAGNOSTICS'
+
+# 界面中保留的最近记录条数
+RECENT_RECORDS = 50
+
+
+def default_log_path():
+    """诊断日志与报价缓存放在同一用户数据目录下"""
+    return os.path.join(os.path.dirname(default_cache_path()), 'diagnostics.jsonl')
+
+
+class Diagnostics:
+    """按环节记录耗时、内存峰值和行数，写入 JSON Lines 日志并保留最近的记录"""
+
+    def __init__(self, log_path=None, enabled=None):
+        self.log_path = log_path or default_log_path()
+        if enabled is None:
+            enabled = os.environ.get(DIAGNOSTICS_ENV, '') not in ('', '0')
+        self.enabled = enabled
+        self.records = deque(maxlen=RECENT_RECORDS)
+
+    @contextlib.contextmanager
+    def stage(self, name, **fields):
+        """测量 with 块内的一个环节，产出记录字典（调用方可在块内填入 rows 等字段）"""
+        record = {'time': datetime.now().isoformat(timespec='milliseconds'), 'stage': name, **fields}
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            record['peak_bytes'] = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+            if started_tracing:
+                tracemalloc.stop()
+            self._emit(record)
+
+    def _emit(self, record):
+        self.records.append(record)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except OSError as e:
+            print(f"诊断日志写入失败（已忽略）：{e}")
+
+
+def measure(diagnostics, name, **fields):
+    """diagnostics 为 None 或未启用时不做任何测量，只产出一个不会被记录的字典"""
+    if diagnostics is None or not diagnostics.enabled:
+        return contextlib.nullcontext(dict(fields))
+    return diagnostics.stage(name, **fields)
+
+
+# 诊断面板的表头（按全角字符占两列与 format_record 的各列对齐）
+RECORD_HEADER = "时间" + " " * 10 + "环节" + " " * 15 + "耗时" + " " * 5 + "内存峰值" + " " * 9 + "行数"
+
+
+def format_record(record):
+    """诊断记录的单行描述"""
+    rows = record.get('rows')
+    line = (f"{record['time'][11:23]}  {record['stage']:<10}{record['seconds'] * 1000:>10.1f} ms"
+            f"{record['peak_bytes'] / 2 ** 20:>10.1f} MB{rows if rows is not None else '-':>10} 行")
+    if record.get('cached'):
+        line += "  （缓存）"
+    if 'error' in record:
+        line += f"  失败：{record['error']}"
+    return line
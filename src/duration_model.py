@@ -0,0 +1,155 @@
+"""打印时长回归模型：由历史报价中的零件体积与实际打印时长拟合机时，在没有填写时长时给出预测
+
+特征（见 FEATURES）：零件体积、支撑体积（cm³）、零件数量，以及零件带包围盒（STL）时的最大高度（mm）。
+模型为 机时 = w · [1, 特征...]，用 numpy.linalg.lstsq 最小二乘拟合。
+训练样本与系数一起保存在用户数据目录下的 JSON 文件中（与报价缓存同一目录），
+每次计算出用户手动填写时长的报价后追加一个样本并重新拟合（样本只有几个数，拟合耗时可忽略）。
+预测只需求一次特征和一次点积，每次更换零件清单时都可以直接调用。
+
+命令行：python duration_model.py --from-cache   由报价缓存中已有的报价重新训练并保存模型
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from cost_module import convert_duration_to_hours
+from quote_cache import QuoteCache, default_cache_path
+from result_model import PartTable
+
+# 模型文件格式版本
+MODEL_VERSION = 1
+
+# 候选特征（最大高度只有 STL 零件才有，训练样本都带有时才使用）
+FEATURES = ("零件体积", "支撑体积", "零件数量", "最大高度")
+
+# 拟合所需的最少样本数（多于 常数项 + 特征数）
+MIN_SAMPLES = len(FEATURES) + 2
+
+
+def default_model_path():
+    return os.path.join(os.path.dirname(default_cache_path()), 'duration_model.json')
+
+
+def part_features(parts):
+    """零件清单（零件字典列表或 PartTable）的特征字典；零件没有包围盒时不含 "最大高度" """
+    table = PartTable.from_parts(parts)
+    features = {
+        "零件体积": sum(table.volumes) / 1000,  # mm³ → cm³
+        "支撑体积": sum(table.support_volumes) / 1000,
+        "零件数量": len(table),
+    }
+    if parts and not isinstance(parts, PartTable) and all('bbox_min' in part for part in parts):
+        features["最大高度"] = max(part['bbox_max'][2] - part['bbox_min'][2] for part in parts)
+    return features
+
+
+class DurationModel:
+    """机时的线性回归模型（样本与系数保存在 JSON 文件中）"""
+
+    def __init__(self, path=None):
+        self.path = path or default_model_path()
+        self.samples = []  # [(特征字典, 机时)]
+        self.features = ()  # 拟合时使用的特征
+        self.coefficients = None  # 常数项 + 各特征的系数
+        self.rmse = None
+
+    @classmethod
+    def load(cls, path=None):
+        """读取模型文件；文件不存在或损坏时返回空模型"""
+        model = cls(path)
+        try:
+            with open(model.path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MODEL_VERSION:
+                model.samples = [(features, hours) for features, hours in data['samples']]
+                model.features = tuple(data['features'])
+                model.coefficients = data['coefficients']
+                model.rmse = data['rmse']
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"打印时长模型读取失败（已忽略）：{e}")
+        return model
+
+    def save(self):
+        data = {
+            'version': MODEL_VERSION,
+            'fitted': datetime.now().isoformat(timespec='seconds'),
+            'features': list(self.features),
+            'coefficients': self.coefficients,
+            'rmse': self.rmse,
+            'samples': self.samples,
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"打印时长模型保存失败（已忽略）：{e}")
+
+    def add_sample(self, features, hours):
+        """追加一个样本（与已有样本完全相同时忽略），返回是否新增"""
+        sample = (dict(features), float(hours))
+        if hours <= 0 or sample in self.samples:
+            return False
+        self.samples.append(sample)
+        return True
+
+    def fit(self):
+        """用全部样本拟合，样本不足时保持未拟合状态；返回是否已拟合"""
+        if len(self.samples) < MIN_SAMPLES:
+            return False
+        features = tuple(name for name in FEATURES if all(name in sample for sample, _ in self.samples))
+        x = np.array([[1.0, *(sample[name] for name in features)] for sample, _ in self.samples])
+        y = np.array([hours for _, hours in self.samples])
+        coefficients = np.linalg.lstsq(x, y, rcond=None)[0]
+        self.features = features
+        self.coefficients = coefficients.tolist()
+        self.rmse = float(np.sqrt(np.mean((x @ coefficients - y) ** 2)))
+        return True
+
+    def predict(self, features):
+        """预测机时（小时）；模型未拟合或缺少所需特征时返回 None"""
+        if self.coefficients is None or any(name not in features for name in self.features):
+            return None
+        intercept, *weights = self.coefficients
+        hours = intercept + sum(weight * features[name] for weight, name in zip(weights, self.features))
+        return max(hours, 0.0)
+
+
+def fit_from_cache(cache, model):
+    """把报价缓存中每份报告与其打印时长的组合作为样本加入模型并重新拟合，返回新增的样本数"""
+    added = 0
+    for parts, total_print_duration in cache.iter_quote_history():
+        added += model.add_sample(part_features(parts), convert_duration_to_hours(total_print_duration))
+    model.fit()
+    return added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="打印时长回归模型")
+    parser.add_argument("--from-cache", action="store_true", help="由报价缓存中的历史报价训练")
+    parser.add_argument("--model", help=f"模型文件（缺省 {default_model_path()}）")
+    args = parser.parse_args(argv)
+
+    model = DurationModel.load(args.model)
+    if args.from_cache:
+        print(f"从报价缓存新增 {fit_from_cache(QuoteCache(), model)} 个样本")
+        model.save()
+    if model.coefficients is None:
+        print(f"样本不足（{len(model.samples)} 个，至少需要 {MIN_SAMPLES} 个），尚未拟合")
+        return 1
+    print(f"{len(model.samples)} 个样本，均方根误差 {model.rmse:.2f} 小时")
+    intercept, *weights = model.coefficients
+    print(f"  常数项：{intercept:.4f} 小时")
+    for name, weight in zip(model.features, weights):
+        print(f"  {name}：{weight:.6f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
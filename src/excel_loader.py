@@ -0,0 +1,71 @@
+"""Magics 体积报告（xlsm）流式读取
+
+script/Volume.xltm 导出的报告布局固定：C2 为零件数量，第 8 行起 B~D 列依次为
+零件名称、零件体积、支撑体积。这里以只读模式打开工作簿，按 C2 给出的范围用
+iter_rows 逐行读取，内存占用与零件数量无关。
+"""
+import time
+
+from cost_module import PROGRESS_INTERVAL
+
+# 报告模板的固定布局
+PART_COUNT_ROW = 2
+PART_COUNT_COLUMN = 3  # C 列
+FIRST_PART_ROW = 8
+FIRST_PART_COLUMN = 2  # B 列
+LAST_PART_COLUMN = 4  # D 列
+
+
+def read_part_count(sheet):
+    """读取 C2 中的零件数量"""
+    row = next(sheet.iter_rows(min_row=PART_COUNT_ROW, max_row=PART_COUNT_ROW,
+                               min_col=PART_COUNT_COLUMN, max_col=PART_COUNT_COLUMN,
+                               values_only=True))
+    return int(row[0])
+
+
+def iter_parts(file_path, progress=None):
+    """逐个产出零件记录 {'name', 'volume', 'support_volume'}（惰性读取）
+
+    progress(已读行数, 总行数) 为可选的进度回调。
+    """
+    # openpyxl 只在需要回退到它时才导入，不拖慢程序启动
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        part_count = read_part_count(sheet)
+        rows = sheet.iter_rows(min_row=FIRST_PART_ROW, max_row=FIRST_PART_ROW + part_count - 1,
+                               min_col=FIRST_PART_COLUMN, max_col=LAST_PART_COLUMN,
+                               values_only=True)
+        for index, (name, volume, support_volume) in enumerate(rows, 1):
+            if progress is not None and index % PROGRESS_INTERVAL == 0:
+                progress(index, part_count)
+            yield {'name': name, 'volume': float(volume), 'support_volume': float(support_volume)}
+    finally:
+        # 只读模式会一直占用文件句柄，必须显式关闭
+        workbook.close()
+
+
+def load_parts(file_path, reader=iter_parts, progress=None):
+    """读取全部零件，返回 (零件列表, 读取统计)
+
+    reader 为读取函数（默认 iter_parts，也可传入 xlsm_fast_reader.read_parts），
+    progress 原样传给读取函数。
+    读取统计包含行数、耗时（秒）和吞吐量（行/秒）。
+    """
+    start = time.perf_counter()
+    parts = list(reader(file_path, progress=progress))
+    elapsed = time.perf_counter() - start
+    stats = {
+        'rows': len(parts),
+        'seconds': elapsed,
+        'rows_per_second': len(parts) / elapsed if elapsed > 0 else float('inf'),
+    }
+    return parts, stats
+
+
+def format_load_stats(stats):
+    """读取统计的单行描述"""
+    return f"已读取 {stats['rows']} 个零件，耗时 {stats['seconds']:.2f} 秒（{stats['rows_per_second']:,.0f} 行/秒）"
@@ -0,0 +1,186 @@
+"""成型方向优化：对零件网格评估一组候选成型方向的支撑体积和成型高度，取报价最低的方向
+
+候选方向为 6 个坐标轴方向加上单位球面上按斐波那契螺旋均匀分布的方向，第一个候选为 +Z（即当前摆放方向），
+因此优化结果不会比当前摆放更贵。绕成型方向自身的旋转不改变支撑和高度，无需枚举。
+支撑体积的算法与 support_estimator.estimate_support 相同，这里一次对一批方向做矩阵运算：
+每块三角形的面向量只算一次，与 (方向数, 3) 的方向矩阵相乘即得到所有方向下的投影面积和顶点高度。
+各批方向分给进程池并行计算，子进程自行 mmap 同一个 STL 文件，不传递网格数据。
+
+打印时长按方向由 print_time.estimate_volume_hours 估算：填充扫描时间只与零件体积有关，
+铺粉时间随成型高度（层数）变化；轮廓扫描和支撑的扫描时间未计入。
+各候选方向用 batch_pricing.calculate_batch_cost 一次性计价，最后对最优方向调用 calculate_multipart_cost 给出报价。
+
+命令行：python orientation.py 零件.stl [零件2.stl ...] [--candidates 500] [--pricing pricing.json]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_pricing import calculate_batch_cost
+from cost_module import DEFAULT_PRICING_STANDARD, calculate_multipart_cost, format_duration
+from print_time import DEFAULT_PRINT_PARAMETERS, estimate_volume_hours
+from stl_reader import coordinate_chunks, face_vectors, map_triangles, mesh_properties
+from support_estimator import DEFAULT_FILL_RATIO, DEFAULT_OVERHANG_ANGLE
+
+# 缺省的候选方向数
+DEFAULT_CANDIDATES = 500
+
+# 每次矩阵运算同时处理的方向数（中间数组约 方向数 × CHUNK_TRIANGLES × 8 字节）
+DIRECTIONS_PER_BATCH = 32
+
+# 每个进程池任务处理的方向数
+DIRECTIONS_PER_TASK = 64
+
+
+def candidate_directions(count=DEFAULT_CANDIDATES):
+    """count 个候选方向，返回 (count, 3) 的单位向量数组
+
+    前 6 个为坐标轴方向（+Z 即当前摆放在最前，平放、侧放的零件常常正好沿坐标轴最省），
+    其余在单位球面上按斐波那契螺旋近似均匀分布。
+    """
+    axes = np.array([(0, 0, 1), (0, 0, -1), (1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0)], dtype=np.float64)
+    spread = max(count - len(axes), 0)
+    index = np.arange(spread) + 0.5
+    z = 1 - 2 * index / max(spread, 1)
+    radius = np.sqrt(1 - z * z)
+    theta = math.pi * (3 - math.sqrt(5)) * index
+    return np.concatenate([axes, np.column_stack([radius * np.cos(theta), radius * np.sin(theta), z])])[:count]
+
+
+def rotation_angles(direction):
+    """把 direction 转到 +Z 所需的旋转：先绕 X 轴转 a 度，再绕 Y 轴转 b 度，返回 (a, b)
+
+    在 Magics 中按此角度旋转零件后，原来朝 direction 的一侧朝上。
+    """
+    dx, dy, dz = direction
+    about_x = math.degrees(math.atan2(dy, dz))
+    about_y = math.degrees(math.atan2(-dx, math.hypot(dy, dz)))
+    return about_x, about_y
+
+
+def evaluate_directions(triangles, directions, overhang_angle=DEFAULT_OVERHANG_ANGLE, lift=0.0,
+                        fill_ratio=DEFAULT_FILL_RATIO):
+    """对 (方向数, 3) 的单位方向数组逐一评估零件，返回 {'support_volume', 'overhang_area', 'height'} 数组"""
+    directions = np.asarray(directions, dtype=np.float64)
+    count = len(directions)
+    threshold = math.cos(math.radians(overhang_angle))
+    weighted_height = np.zeros(count)
+    projected_area = np.zeros(count)
+    lowest = np.full(count, np.inf)
+    highest = np.full(count, -np.inf)
+
+    for xyz in coordinate_chunks(triangles):
+        normals = np.stack(face_vectors(xyz))  # (3, 块大小)
+        limit = threshold * np.sqrt((normals * normals).sum(axis=0))
+        for start in range(0, count, DIRECTIONS_PER_BATCH):
+            batch = directions[start:start + DIRECTIONS_PER_BATCH]
+            rows = slice(start, start + len(batch))
+            facing = -(batch @ normals)  # 2 × 面积 × (-n · d)，(批大小, 块大小)
+            heights = [batch @ xyz[:, k] for k in range(3)]  # 各顶点沿成型方向的高度
+            lowest[rows] = np.minimum(lowest[rows], np.minimum(np.minimum(*heights[:2]), heights[2]).min(axis=1))
+            highest[rows] = np.maximum(highest[rows], np.maximum(np.maximum(*heights[:2]), heights[2]).max(axis=1))
+
+            area = np.where(facing > limit, facing, 0.0) / 2
+            weighted_height[rows] += (area * (heights[0] + heights[1] + heights[2])).sum(axis=1) / 3
+            projected_area[rows] += area.sum(axis=1)
+
+    if len(triangles) == 0:
+        lowest[:] = highest[:] = 0.0
+    envelope = weighted_height - (lowest - lift) * projected_area
+    return {
+        'support_volume': np.maximum(envelope, 0.0) * fill_ratio,
+        'overhang_area': projected_area,
+        'height': highest - lowest,
+    }
+
+
+def _evaluate_file(file_path, directions, overhang_angle, lift, fill_ratio):
+    """子进程任务：映射 STL 文件并评估一批方向"""
+    return map_triangles(file_path, evaluate_directions, directions, overhang_angle, lift, fill_ratio)
+
+
+def optimize_orientation(file_path, candidates=DEFAULT_CANDIDATES, pricing_standard=DEFAULT_PRICING_STANDARD,
+                         print_parameters=DEFAULT_PRINT_PARAMETERS, overhang_angle=DEFAULT_OVERHANG_ANGLE, lift=0.0,
+                         fill_ratio=DEFAULT_FILL_RATIO, workers=None):
+    """搜索 STL 零件报价最低的成型方向
+
+    workers 为进程数（缺省为 CPU 核数，1 表示在当前进程中计算）。返回字典：
+      'name'、'direction'、'rotation'（rotation_angles 的 (绕 X, 绕 Y) 角度）、
+      'support_volume'、'height'、'duration'、'quote'（最优方向的 calculate_multipart_cost 结果）、
+      'current'（当前摆放即 +Z 方向的 support_volume、height、duration、quote）、'candidates'（各方向的评估数组）
+    """
+    directions = candidate_directions(candidates)
+    volume = map_triangles(file_path, mesh_properties)['volume']
+    batches = [directions[i:i + DIRECTIONS_PER_TASK] for i in range(0, len(directions), DIRECTIONS_PER_TASK)]
+    options = (overhang_angle, lift, fill_ratio)
+    if workers == 1 or len(batches) == 1:
+        results = [_evaluate_file(file_path, batch, *options) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_evaluate_file, [file_path] * len(batches), batches,
+                                    *([option] * len(batches) for option in options)))
+    evaluated = {key: np.concatenate([result[key] for result in results]) for key in results[0]}
+    evaluated['hours'] = estimate_volume_hours(volume, evaluated['height'], print_parameters)
+
+    costs = calculate_batch_cost(np.full(len(directions), volume), evaluated['support_volume'],
+                                 np.arange(len(directions)), evaluated['hours'], pricing_standard, decimals=None)
+    evaluated['cost'] = costs["实际费用"]
+
+    def summary(index):
+        duration = format_duration(evaluated['hours'][index] * 3600)
+        part = {'name': os.path.basename(file_path), 'volume': volume,
+                'support_volume': float(evaluated['support_volume'][index])}
+        return {
+            'support_volume': part['support_volume'],
+            'height': float(evaluated['height'][index]),
+            'duration': duration,
+            'quote': calculate_multipart_cost([part], duration, pricing_standard),
+        }
+
+    best = int(np.argmin(evaluated['cost']))
+    return {
+        'name': os.path.basename(file_path),
+        'direction': tuple(directions[best].tolist()),
+        'rotation': rotation_angles(directions[best]),
+        **summary(best),
+        'current': summary(0),
+        'candidates': dict(evaluated, direction=directions),
+    }
+
+
+def main(argv=None):
+    from batch_cli import load_pricing
+
+    parser = argparse.ArgumentParser(description="搜索 STL 零件报价最低的成型方向")
+    parser.add_argument("files", nargs="+", help="STL 文件")
+    parser.add_argument("--candidates", type=int, default=DEFAULT_CANDIDATES, help="候选方向数")
+    parser.add_argument("--pricing", help="定价标准 JSON 文件（缺省使用默认定价）")
+    parser.add_argument("--overhang-angle", type=float, default=DEFAULT_OVERHANG_ANGLE, help="自支撑角度（度）")
+    parser.add_argument("--fill-ratio", type=float, default=DEFAULT_FILL_RATIO, help="支撑的实体占比")
+    parser.add_argument("--jobs", type=int, default=None, help="并行进程数（缺省为 CPU 核数）")
+    args = parser.parse_args(argv)
+
+    pricing_standard = load_pricing(args.pricing)
+    for file_path in args.files:
+        start = time.perf_counter()
+        result = optimize_orientation(file_path, args.candidates, pricing_standard, overhang_angle=args.overhang_angle,
+                                      fill_ratio=args.fill_ratio, workers=args.jobs)
+        elapsed = time.perf_counter() - start
+        current = result['current']
+        about_x, about_y = result['rotation']
+        print(f"{result['name']}（{args.candidates} 个方向，耗时 {elapsed:.2f} 秒）")
+        print(f"  当前摆放：支撑 {current['support_volume']:.0f} mm³，高度 {current['height']:.1f} mm，"
+              f"{current['duration']}，实际费用 {current['quote']['计算明细']['实际费用']:.2f} 元")
+        print(f"  最优方向：绕 X 轴 {about_x:.1f}°，再绕 Y 轴 {about_y:.1f}°；支撑 {result['support_volume']:.0f} mm³，"
+              f"高度 {result['height']:.1f} mm，{result['duration']}，"
+              f"实际费用 {result['quote']['计算明细']['实际费用']:.2f} 元")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
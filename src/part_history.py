@@ -0,0 +1,171 @@
+"""零件报价历史：每次报价的零件逐个写入用户数据目录下带索引的 SQLite 数据库，加载零件时查出以前的报价
+
+同一零件（名称和体积都相同）反复报价时，加载零件清单即可看到它上次报价的分摊费用和机时。
+单个零件的费用和机时按其体积（零件 + 支撑）占整版总体积的比例分摊实付金额和机时：
+材料费用本来就与体积成正比，机时、氩气和后处理费是整版共担的，按体积分摊是最直接的近似。
+
+表结构：quotes 每次报价一行；parts 每个零件一行，(name, volume_key, quote_id) 上建有索引，
+volume_key 为体积按 0.001 mm³ 取整的整数（与零件信息框显示的精度一致），
+查找某个零件最近一次报价只需一次索引查找，数百万行时也在 1 毫秒以内。
+写入按报价批量进行，每批在一个事务中完成。与报价缓存相同，任何数据库错误只在终端提示，不影响报价。
+"""
+import json
+import os
+import sqlite3
+
+from cost_module import DEFAULT_PRICING_STANDARD
+from quote_cache import default_cache_path
+from result_model import PartTable
+
+# 数据库格式版本；表结构变化时加一，旧版本的数据会被清空
+HISTORY_VERSION = 1
+
+# 体积取整的倍数（volume_key = round(体积 × VOLUME_SCALE)）
+VOLUME_SCALE = 1000
+
+
+def default_history_path():
+    return os.path.join(os.path.dirname(default_cache_path()), 'part_history.sqlite3')
+
+
+def volume_key(volume):
+    return round(volume * VOLUME_SCALE)
+
+
+class PartHistory:
+    """按零件名称和体积查询以前报价的 SQLite 数据库（每次操作单独连接，可在不同的后台线程中使用）"""
+
+    def __init__(self, path=None):
+        self.path = path or default_history_path()
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            with conn:
+                if conn.execute("PRAGMA user_version").fetchone()[0] != HISTORY_VERSION:
+                    conn.execute("DROP TABLE IF EXISTS parts")
+                    conn.execute("DROP TABLE IF EXISTS quotes")
+                    conn.execute(f"PRAGMA user_version = {HISTORY_VERSION}")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS quotes (
+                        id INTEGER PRIMARY KEY,
+                        created TEXT NOT NULL,
+                        machine_hours REAL NOT NULL,
+                        total_volume REAL NOT NULL,
+                        part_count INTEGER NOT NULL,
+                        total_cost REAL NOT NULL,
+                        actual_cost REAL NOT NULL,
+                        pricing TEXT NOT NULL
+                    )""")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS parts (
+                        quote_id INTEGER NOT NULL REFERENCES quotes (id),
+                        name TEXT NOT NULL,
+                        volume_key INTEGER NOT NULL,
+                        volume REAL NOT NULL,
+                        support_volume REAL NOT NULL,
+                        share REAL NOT NULL
+                    )""")
+                conn.execute("CREATE INDEX IF NOT EXISTS parts_lookup ON parts (name, volume_key, quote_id)")
+            conn.execute("PRAGMA journal_mode = WAL")
+            self._initialized = True
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA cache_size = -65536")  # 64 MB 页缓存：大批写入时索引页不必反复换出
+        return conn
+
+    def add_quotes(self, records):
+        """在一个事务中写入多次报价（quote_archive.quote_record 生成的记录），返回写入的零件数"""
+        written = 0
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    for record in records:
+                        parts = PartTable.from_parts(record['parts'])
+                        total_volume = record['总体积']
+                        pricing = {param: record[param] for param in DEFAULT_PRICING_STANDARD}
+                        quote_id = conn.execute(
+                            "INSERT INTO quotes (created, machine_hours, total_volume, part_count, total_cost,"
+                            " actual_cost, pricing) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (str(record['时间']), record['机时'], total_volume, len(parts), record['总费用'],
+                             record['实际费用'], json.dumps(pricing, ensure_ascii=False))).lastrowid
+                        conn.executemany(
+                            "INSERT INTO parts (quote_id, name, volume_key, volume, support_volume, share)"
+                            " VALUES (?, ?, ?, ?, ?, ?)",
+                            ((quote_id, name, volume_key(volume), volume, support,
+                              (volume + support) / total_volume if total_volume > 0 else 0.0)
+                             for name, volume, support in parts.rows()))
+                        written += len(parts)
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"零件报价历史写入失败（已忽略）：{e}")
+            return 0
+        return written
+
+    def lookup(self, parts):
+        """查出每个零件最近一次报价，返回与 parts 对应的列表（没有报价过的零件为 None）
+
+        每项为 {"时间", "分摊费用", "机时", "份额"}：报价时间、按体积分摊的实付金额（元）、机时（小时）和体积占比。
+        """
+        parts = PartTable.from_parts(parts)
+        keys = {(name, volume_key(volume)) for name, volume in zip(parts.names, parts.volumes)}
+        if not keys:
+            return []
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("CREATE TEMP TABLE wanted (name TEXT NOT NULL, volume_key INTEGER NOT NULL)")
+                conn.executemany("INSERT INTO wanted VALUES (?, ?)", keys)
+                # 每个零件在索引上取 quote_id 最大（最近）的一行
+                rows = conn.execute("""
+                    SELECT w.name, w.volume_key, q.created, p.share * q.actual_cost, p.share * q.machine_hours, p.share
+                    FROM wanted w
+                    JOIN parts p ON p.rowid = (SELECT rowid FROM parts
+                                               WHERE name = w.name AND volume_key = w.volume_key
+                                               ORDER BY quote_id DESC LIMIT 1)
+                    JOIN quotes q ON q.id = p.quote_id""").fetchall()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"零件报价历史读取失败（已忽略）：{e}")
+            return [None] * len(parts)
+        found = {(name, key): {"时间": created, "分摊费用": cost, "机时": hours, "份额": share}
+                 for name, key, created, cost, hours, share in rows}
+        return [found.get((name, volume_key(volume))) for name, volume in zip(parts.names, parts.volumes)]
+
+    def lookup_part(self, name, volume):
+        """单个零件最近一次报价（格式同 lookup 的每一项），没有报价过时返回 None"""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("""
+                    SELECT q.created, p.share * q.actual_cost, p.share * q.machine_hours, p.share
+                    FROM parts p JOIN quotes q ON q.id = p.quote_id
+                    WHERE p.name = ? AND p.volume_key = ?
+                    ORDER BY p.quote_id DESC LIMIT 1""", (name, volume_key(volume))).fetchone()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"零件报价历史读取失败（已忽略）：{e}")
+            return None
+        if row is None:
+            return None
+        created, cost, hours, share = row
+        return {"时间": created, "分摊费用": cost, "机时": hours, "份额": share}
+
+    def stats(self):
+        """返回 (报价数, 零件行数)"""
+        try:
+            conn = self._connect()
+            try:
+                return (conn.execute("SELECT COUNT(*) FROM quotes").fetchone()[0],
+                        conn.execute("SELECT COUNT(*) FROM parts").fetchone()[0])
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"零件报价历史读取失败（已忽略）：{e}")
+            return 0, 0
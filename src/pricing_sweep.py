@@ -0,0 +1,228 @@
+"""定价敏感性分析：对任意几项定价参数给出取值范围，一次算出所有组合下各批次的费用
+
+每个批次只需两个与定价无关的汇总量（总体积、机时）。第 k 个变动参数的取值数组沿第 k + 1 维排列，
+与批次维一起交给 batch_pricing.broadcast_cost_terms 按 numpy 广播规则一次求值、round_costs 取整，
+结果为 (批次数, 参数1取值数, 参数2取值数, ...) 的费用数组，每个单元格与用该组定价调用
+calculate_multipart_cost 的结果完全一致。100 万个单元格的网格约 0.1 秒。
+
+命令行：python pricing_sweep.py 报告目录/ --durations durations.json --vary 材料单价=1500:2100:7 --vary 折扣优惠=0.8,0.9,1
+         --output 敏感性分析.xlsx
+取值范围写作 起点:终点:个数（含两端的等差数列）或逗号分隔的取值。
+工作簿中：只变动一项参数时为一张 批次 × 取值 的热力图；变动两项及以上时每个批次一张热力图
+（前两项参数为行和列，其余参数取最接近当前定价的值），另附全部组合的明细表（行数不超过工作表上限时）。
+输出 .csv 时只写明细表。
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+
+from batch_pricing import COST_COLUMNS, broadcast_cost_terms, round_costs
+from cost_module import DEFAULT_PRICING_STANDARD, apply_pricing_overrides, convert_duration_to_hours
+from result_model import PartTable
+
+# Excel 单个工作表的列数上限（热力图的列为第二项参数的取值）
+MAX_SHEET_COLUMNS = 16384
+
+
+def parse_range(spec):
+    """取值范围："起点:终点:个数"（等差数列，含两端）、逗号分隔的取值或单个数值，返回一维数组"""
+    try:
+        if ':' in spec:
+            start, stop, count = spec.split(':')
+            values = np.linspace(float(start), float(stop), int(count))
+        else:
+            values = np.array([float(value) for value in spec.split(',')])
+    except ValueError:
+        raise ValueError(f"无法识别的取值范围：{spec}（应为 起点:终点:个数 或 逗号分隔的数值）") from None
+    if len(values) == 0:
+        raise ValueError(f"取值范围为空：{spec}")
+    return values
+
+
+def sweep_costs(builds, ranges, pricing_standard=DEFAULT_PRICING_STANDARD, decimals=2):
+    """计算所有参数组合下各批次的费用
+
+    builds 为 [(批次名称, 总体积 mm³, 机时 小时)]；ranges 为 {定价参数: 取值数组}（按给出的顺序排列各维）。
+    返回字典：'builds'（批次名称列表）、'parameters'（[(参数, 取值数组)]）、'pricing'（基准定价）、
+    'costs'（{费用列: (批次数, 各参数取值数...) 数组}，保留 decimals 位小数，None 时不取整）。
+    """
+    apply_pricing_overrides({param: 0 for param in ranges}, pricing_standard)  # 检查参数名
+    names = [name for name, _, _ in builds]
+    dimensions = len(ranges) + 1
+    volume = np.array([volume for _, volume, _ in builds], dtype=np.float64).reshape((-1,) + (1,) * len(ranges))
+    hours = np.array([hours for _, _, hours in builds], dtype=np.float64).reshape(volume.shape)
+
+    pricing = dict(pricing_standard)
+    parameters = []
+    for axis, (param, values) in enumerate(ranges.items(), 1):
+        values = np.asarray(values, dtype=np.float64)
+        parameters.append((param, values))
+        shape = [1] * dimensions
+        shape[axis] = len(values)
+        pricing[param] = values.reshape(shape)
+
+    costs = {}
+    for column, values in zip(COST_COLUMNS, broadcast_cost_terms(volume, hours, pricing)):
+        costs[column] = values if decimals is None else round_costs(values, decimals)
+    return {'builds': names, 'parameters': parameters, 'pricing': dict(pricing_standard), 'costs': costs}
+
+
+def sweep_rows(sweep):
+    """逐行产出明细表：(批次, 各参数取值..., 各项费用...)"""
+    costs = [sweep['costs'][column] for column in COST_COLUMNS]
+    axes = [range(len(sweep['builds']))] + [range(len(values)) for _, values in sweep['parameters']]
+    for index in itertools.product(*axes):
+        yield (sweep['builds'][index[0]],
+               *(float(values[k]) for (_, values), k in zip(sweep['parameters'], index[1:])),
+               *(float(cost[index]) for cost in costs))
+
+
+def sweep_headers(sweep):
+    return ['批次', *(param for param, _ in sweep['parameters']), *COST_COLUMNS]
+
+
+def base_index(sweep, axis):
+    """第 axis 项变动参数中最接近基准定价的取值的下标"""
+    param, values = sweep['parameters'][axis]
+    return int(np.argmin(np.abs(values - sweep['pricing'][param])))
+
+
+def write_heatmap(worksheet, formats, title, row_label, row_values, column_label, column_values, grid):
+    """写出一张热力图：左上角为标题，行、列表头为参数取值，单元格按大小着色（绿 → 红）"""
+    worksheet.set_column(0, 0, 22)
+    worksheet.set_column(1, len(column_values), 12)
+    worksheet.write_string(0, 0, title, formats['title'])
+    worksheet.write_string(1, 0, f"{row_label} \\ {column_label}", formats['header'])
+    for column, value in enumerate(column_values, 1):
+        worksheet.write(1, column, value, formats['header'])
+    for row, (label, values) in enumerate(zip(row_values, grid), 2):
+        worksheet.write(row, 0, label, formats['part_name'])
+        worksheet.write_row(row, 1, values.tolist(), formats['currency'])
+    worksheet.conditional_format(2, 1, len(row_values) + 1, len(column_values), {
+        'type': '3_color_scale', 'min_color': '#63BE7B', 'mid_color': '#FFEB84', 'max_color': '#F8696B'})
+
+
+def write_sweep_workbook(sweep, filename, column="实际费用"):
+    """导出热力图工作簿（热力图为 column 列的费用）；返回写入的工作表数
+
+    变动多项参数时每个批次一张热力图，工作簿以常量内存模式写出（每个工作表占用一个文件句柄），
+    因此最多写出前 MAX_OPEN_SHEETS - 1 个批次的热力图，其余批次只在“全部组合”明细表中。
+    """
+    from xlsx_export import (MAX_OPEN_SHEETS, MAX_SHEET_ROWS, FormatRegistry, close_workbook, detail_sheet_name,
+                             open_workbook)
+
+    grid = sweep['costs'][column]
+    parameters = sweep['parameters']
+    if len(parameters[-1 if len(parameters) == 1 else 1][1]) >= MAX_SHEET_COLUMNS:
+        raise ValueError(f"热力图的列数超出了 Excel 单个工作表 {MAX_SHEET_COLUMNS} 列的上限")
+
+    workbook = open_workbook(filename)
+    formats = FormatRegistry(workbook)
+    sheets = 0
+    if len(parameters) == 1:
+        param, values = parameters[0]
+        write_heatmap(workbook.add_worksheet(f"{column}热力图"), formats, f"{column}（元）", "批次", sweep['builds'],
+                      param, values.tolist(), grid)
+        sheets += 1
+    else:
+        (row_param, row_values), (column_param, column_values) = parameters[:2]
+        fixed = tuple(base_index(sweep, axis) for axis in range(2, len(parameters)))
+        note = "".join(f"，{param}={values[k]:g}" for (param, values), k in zip(parameters[2:], fixed))
+        builds = sweep['builds']
+        if len(builds) > MAX_OPEN_SHEETS - 1:
+            print(f"批次数 {len(builds)} 过多，只为前 {MAX_OPEN_SHEETS - 1} 个批次写热力图（其余见明细表或 .csv）")
+            builds = builds[:MAX_OPEN_SHEETS - 1]
+        for index, name in enumerate(builds, 1):
+            worksheet = workbook.add_worksheet(detail_sheet_name(index, name))
+            write_heatmap(worksheet, formats, f"{name} {column}（元）{note}", row_param, row_values.tolist(),
+                          column_param, column_values.tolist(), grid[(index - 1, slice(None), slice(None), *fixed)])
+            sheets += 1
+
+    if grid.size < MAX_SHEET_ROWS:
+        worksheet = workbook.add_worksheet("全部组合")
+        worksheet.set_column(0, len(parameters) + len(COST_COLUMNS), 14)
+        worksheet.write_row(0, 0, sweep_headers(sweep), formats['header'])
+        for row, values in enumerate(sweep_rows(sweep), 1):
+            worksheet.write_row(row, 0, values)
+        sheets += 1
+    else:
+        print(f"组合数 {grid.size} 超出工作表行数上限，未写明细表（可改为输出 .csv）")
+    close_workbook(workbook)
+    print(f"\n敏感性分析报表已生成：{filename}")
+    return sheets
+
+
+def write_sweep_csv(sweep, filename):
+    """把全部组合写成 CSV（UTF-8 带 BOM，Excel 可直接打开）"""
+    import pandas as pd
+
+    names = np.asarray(sweep['builds'], dtype=object)
+    grids = np.meshgrid(np.arange(len(names)), *(values for _, values in sweep['parameters']), indexing='ij')
+    frame = pd.DataFrame({'批次': names[grids[0].ravel()]})
+    for (param, _), values in zip(sweep['parameters'], grids[1:]):
+        frame[param] = values.ravel()
+    for column in COST_COLUMNS:
+        frame[column] = sweep['costs'][column].ravel()
+    frame.to_csv(filename, index=False, encoding='utf-8-sig')
+    print(f"\n敏感性分析明细已生成：{filename}（{len(frame)} 行）")
+
+
+def load_builds(reports, durations, default_duration=None):
+    """读取报告，返回 [(批次名称, 总体积, 机时)]；没有打印时长的报告抛出 ValueError"""
+    from xlsm_fast_reader import read_parts
+
+    builds = []
+    for path in reports:
+        name = os.path.splitext(os.path.basename(path))[0]
+        duration = durations.get(name, default_duration)
+        if not duration:
+            raise ValueError(f"报告 {name} 缺少打印时长")
+        builds.append((name, PartTable.from_parts(read_parts(path)).total_volume(), convert_duration_to_hours(duration)))
+    return builds
+
+
+def main(argv=None):
+    from batch_cli import find_reports, load_durations, load_pricing
+
+    parser = argparse.ArgumentParser(description="定价参数敏感性分析：计算参数取值网格上各批次的费用")
+    parser.add_argument("inputs", nargs="+", help="报告所在目录或通配符（如 reports/*.xlsm）")
+    parser.add_argument("--vary", action="append", required=True, metavar="参数=范围",
+                        help="变动的定价参数及取值范围，如 材料单价=1500:2100:7 或 折扣优惠=0.8,0.9,1（可重复）")
+    parser.add_argument("--pricing", help="基准定价标准 JSON 文件（缺省使用默认定价）")
+    parser.add_argument("--durations", help="打印时长 JSON 文件：{报告名: 打印时长}")
+    parser.add_argument("--default-duration", help="未在打印时长文件中列出的报告使用的时长")
+    parser.add_argument("--column", default="实际费用", choices=COST_COLUMNS, help="热力图展示的费用列")
+    parser.add_argument("--output", default="敏感性分析.xlsx", help="输出文件（.xlsx 热力图工作簿或 .csv 明细）")
+    args = parser.parse_args(argv)
+
+    try:
+        ranges = {}
+        for item in args.vary:
+            param, _, spec = item.partition("=")
+            ranges[param.strip()] = parse_range(spec)
+        reports = find_reports(args.inputs)
+        if not reports:
+            print("没有找到任何 xlsm 报告")
+            return 1
+        builds = load_builds(reports, load_durations(args.durations), args.default_duration)
+        start = time.perf_counter()
+        sweep = sweep_costs(builds, ranges, load_pricing(args.pricing))
+    except ValueError as e:
+        print(e)
+        return 1
+    print(f"{len(builds)} 个批次 × {' × '.join(f'{p} {len(v)} 个取值' for p, v in sweep['parameters'])}："
+          f"{sweep['costs']['实际费用'].size:,} 个组合，计算耗时 {time.perf_counter() - start:.3f} 秒")
+
+    if args.output.lower().endswith(".csv"):
+        write_sweep_csv(sweep, args.output)
+    else:
+        write_sweep_workbook(sweep, args.output, args.column)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
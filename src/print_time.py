@@ -0,0 +1,179 @@
+"""打印时长估算：把零件网格切片成层，按每层的扫描面积和轮廓周长换算成打印时间
+
+切片（沿 +Z，零件最低点为平台）：第 k 层的切平面高度为 (k + 0.5) × 层厚。
+每个与切平面相交的三角形贡献一条线段，按三角形法向定向（实体在线段左侧），
+于是截面面积 = Σ (p × q) / 2、周长 = Σ |q - p|，无需把线段连成闭合轮廓。
+交点坐标是切平面高度的线性函数，先对所有三角形一次性求出求交公式的系数（数组运算），
+各层再按 LAYERS_PER_TASK 分段在线程池中并行累加（numpy 运算期间释放 GIL），
+耗时与 三角形数 + 层数 成正比，而不是与 三角形数 × 每个三角形跨越的层数 成正比。
+
+时间模型（参数见 DEFAULT_PRINT_PARAMETERS）：
+  每层扫描时间 = 截面面积 / (扫描间距 × 扫描速度) + 周长 × 轮廓次数 / 扫描速度
+  整版打印时间 = Σ 各零件扫描时间 + 层数（最高零件）× 铺粉时间
+各零件的扫描时间可以分别计算后相加，同一版上的零件共用铺粉时间。
+支撑结构的扫描时间未计入。结果可直接交给 cost_module.convert_duration_to_hours（时长字符串或小时数）。
+"""
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from cost_module import format_duration
+
+# 缺省打印参数（钛合金 SLM 的常用取值）
+DEFAULT_PRINT_PARAMETERS = {
+    "扫描速度": 1200.0,     # mm/s
+    "扫描间距": 0.12,       # mm
+    "层厚": 0.03,           # mm
+    "铺粉时间": 10.0,       # 秒/层
+    "轮廓次数": 1,          # 每层轮廓扫描的圈数
+}
+
+# 每个并行任务处理的层数
+LAYERS_PER_TASK = 256
+
+
+def _interval_terms(p0, p1, q0, q1, pinch, sign):
+    """线段端点 p(h) = p0 + p1·h、q(h) = q0 + q1·h 在一段高度区间内的截面贡献
+
+    返回 (叉积 p × q 的常数项、一次项、二次项（均已乘以定向符号 sign）, 长度斜率, pinch)；
+    区间一端线段收缩为一个顶点（高度 pinch），长度 |q - p| = |q1 - p1| × |h - pinch| 随高度线性变化。
+    """
+    cross0 = p0[0] * q0[1] - p0[1] * q0[0]
+    cross1 = p0[0] * q1[1] - p0[1] * q1[0] + p1[0] * q0[1] - p1[1] * q0[0]
+    cross2 = p1[0] * q1[1] - p1[1] * q1[0]
+    slope = np.hypot(q1[0] - p1[0], q1[1] - p1[1])
+    return sign * cross0, sign * cross1, sign * cross2, slope, pinch
+
+
+def _layer_range(low, high, layer_thickness):
+    """切平面高度 (k + 0.5) × 层厚 落在 [low, high) 内的层号范围 [first, end)"""
+    return (np.ceil(low / layer_thickness - 0.5).astype(np.int64),
+            np.ceil(high / layer_thickness - 0.5).astype(np.int64))
+
+
+def _slice_band(intervals, layer_thickness, first, last):
+    """累加第 first ~ last - 1 层的截面面积和周长
+
+    intervals 为各三角形高度区间的 (起始层, 结束层, 叉积系数 ×3, 长度斜率, 收缩高度, 长度符号)；
+    每个区间的系数在起始层加上、在结束层减去，前缀和即为每层所有相交三角形的系数之和。
+    """
+    size = last - first
+    sums = np.zeros((5, size + 1))
+    for start, end, c0, c1, c2, slope, pinch, side in intervals:
+        active = (start < last) & (end > first) & (end > start)
+        if not active.any():
+            continue
+        begin = np.maximum(start[active], first) - first
+        stop = np.minimum(end[active], last) - first
+        # 长度 = 斜率 × side × (h - 收缩高度)，side 为 +1（区间下端收缩）或 -1（上端收缩）
+        weights = (c0[active], c1[active], c2[active], slope[active] * side, -slope[active] * side * pinch[active])
+        for row, weight in enumerate(weights):
+            sums[row] += np.bincount(begin, weights=weight, minlength=size + 1)
+            sums[row] -= np.bincount(stop, weights=weight, minlength=size + 1)
+    c0, c1, c2, l1, l0 = np.cumsum(sums[:, :size], axis=1)
+    h = (np.arange(first, last) + 0.5) * layer_thickness
+    return (c0 + c1 * h + c2 * h * h) / 2, l1 * h + l0
+
+
+def slice_mesh(triangles, layer_thickness, workers=None):
+    """把 (三角形数, 3, 3) 的顶点数组切片，返回 (各层高度, 各层截面面积 mm², 各层周长 mm)
+
+    零件最低点为平台（高度 0）；workers 为线程数，缺省为 CPU 核数。
+    每个三角形按顶点高度排序为 a ≤ b ≤ c：切平面在 [za, zb) 时与边 ac、ab 相交，在 [zb, zc) 时与边 ac、bc 相交，
+    交点是高度的线性函数，因此一个三角形在每段区间内对截面面积的贡献是高度的二次式、对周长的贡献是一次式。
+    先对所有三角形一次性求出这些系数，再按层分段并行累加。
+    """
+    if len(triangles) == 0:
+        return np.zeros(0), np.zeros(0), np.zeros(0)
+    xyz = np.asarray(triangles).transpose(2, 1, 0).astype(np.float64, order='C')
+    xyz[2] -= xyz[2].min()
+    # 外法向 e1 × e2 在平面上的分量（按原顶点顺序），逆时针转 90° 为外轮廓的前进方向
+    x, y, z = xyz
+    normal_x = (y[1] - y[0]) * (z[2] - z[0]) - (z[1] - z[0]) * (y[2] - y[0])
+    normal_y = (z[1] - z[0]) * (x[2] - x[0]) - (x[1] - x[0]) * (z[2] - z[0])
+
+    order = np.argsort(z, axis=0)
+    a, b, c = (np.take_along_axis(xyz, order[k][None, None, :].repeat(3, axis=0), axis=1)[:, 0] for k in range(3))
+    za, zb, zc = a[2], b[2], c[2]
+
+    def edge_line(start, end):
+        """边 start→end 与切平面的交点 = p0 + p1·h（边水平时系数为 0，对应的区间为空）"""
+        rise = end[2] - start[2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p1 = np.where(rise > 0, (end[:2] - start[:2]) / rise, 0.0)
+        return start[:2] - p1 * start[2], p1
+
+    ac0, ac1 = edge_line(a, c)
+    ab0, ab1 = edge_line(a, b)
+    bc0, bc1 = edge_line(b, c)
+
+    def orientation(p1, q1, side):
+        """线段 p→q 的方向为 side × (q1 - p1)，与轮廓前进方向反向时取 -1"""
+        return np.where(side * ((q1[0] - p1[0]) * -normal_y + (q1[1] - p1[1]) * normal_x) < 0, -1.0, 1.0)
+
+    lower_start, lower_end = _layer_range(za, zb, layer_thickness)
+    upper_start, upper_end = _layer_range(zb, zc, layer_thickness)
+    intervals = [
+        (lower_start, lower_end, *_interval_terms(ac0, ac1, ab0, ab1, za, orientation(ac1, ab1, 1.0)), 1.0),
+        (upper_start, upper_end, *_interval_terms(ac0, ac1, bc0, bc1, zc, orientation(ac1, bc1, -1.0)), -1.0),
+    ]
+
+    layer_count = max(math.ceil(float(zc.max()) / layer_thickness), 1)
+    bands = [(first, min(first + LAYERS_PER_TASK, layer_count)) for first in range(0, layer_count, LAYERS_PER_TASK)]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        results = list(pool.map(lambda band: _slice_band(intervals, layer_thickness, *band), bands))
+    heights = (np.arange(layer_count) + 0.5) * layer_thickness
+    # 法向整体朝内的网格面积为负，取绝对值
+    return heights, np.abs(np.concatenate([r[0] for r in results])), np.concatenate([r[1] for r in results])
+
+
+def estimate_part_time(triangles, parameters=DEFAULT_PRINT_PARAMETERS, workers=None):
+    """估算单个零件的扫描时间（不含铺粉）
+
+    返回 {'scan_seconds', 'height'（mm）, 'layers', 'scan_area'（各层面积之和，mm²）}。
+    """
+    parameters = {**DEFAULT_PRINT_PARAMETERS, **parameters}
+    heights, areas, perimeters = slice_mesh(triangles, parameters["层厚"], workers)
+    speed = parameters["扫描速度"]
+    scan_area = float(areas.sum())
+    scan_seconds = scan_area / (parameters["扫描间距"] * speed) + float(perimeters.sum()) * parameters["轮廓次数"] / speed
+    z = np.asarray(triangles)[..., 2]
+    height = float(z.max() - z.min()) if len(heights) else 0.0
+    return {'scan_seconds': scan_seconds, 'height': height, 'layers': len(heights), 'scan_area': scan_area}
+
+
+def estimate_build_time(parts, parameters=DEFAULT_PRINT_PARAMETERS):
+    """由各零件的扫描时间和高度估算整版打印时间
+
+    parts 为带有 scan_seconds、height 的零件字典（stl_reader.read_stl_part 给出 print_parameters 时生成）。
+    返回 {'seconds', 'hours', 'layers', 'scan_seconds', 'recoat_seconds', 'duration'（"X天Y小时Z分W秒"）}。
+    """
+    parameters = {**DEFAULT_PRINT_PARAMETERS, **parameters}
+    scan_seconds = sum(part['scan_seconds'] for part in parts)
+    height = max((part['height'] for part in parts), default=0.0)
+    layers = math.ceil(round(height / parameters["层厚"], 6))
+    recoat_seconds = layers * parameters["铺粉时间"]
+    seconds = scan_seconds + recoat_seconds
+    return {
+        'seconds': seconds,
+        'hours': seconds / 3600,
+        'layers': layers,
+        'scan_seconds': scan_seconds,
+        'recoat_seconds': recoat_seconds,
+        'duration': format_duration(seconds),
+    }
+
+
+def estimate_volume_hours(volume, height, parameters=DEFAULT_PRINT_PARAMETERS):
+    """不切片的粗略估算：由零件体积（mm³）和成型高度（mm）估算打印时长（小时）
+
+    各层截面面积之和 = 体积 / 层厚，因此填充扫描时间 = 体积 / (层厚 × 扫描间距 × 扫描速度)，与摆放无关；
+    铺粉时间 = 层数 × 铺粉时间。轮廓扫描和支撑的扫描时间未计入。height 可以是数组（返回同形状的数组）。
+    """
+    parameters = {**DEFAULT_PRINT_PARAMETERS, **parameters}
+    layer = parameters["层厚"]
+    scan_seconds = volume / (layer * parameters["扫描间距"] * parameters["扫描速度"])
+    layers = np.ceil(np.round(np.asarray(height) / layer, 6))
+    return (scan_seconds + layers * parameters["铺粉时间"]) / 3600
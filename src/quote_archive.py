@@ -0,0 +1,407 @@
+"""报价历史归档：每次报价的输入、定价标准和费用明细按列追加到磁盘，供事后统计查询
+
+布局为分块的 NumPy 列存储（不依赖 pyarrow），位于用户数据目录下的 quote_archive/：
+  chunk_<序号>-<随机后缀>/
+    meta.json            报价数、零件数，以及时间和各费用列的最小/最大值（查询时先按此跳过整块）
+    <报价列>.npy         每个报价一行：时间、机时、总体积、零件数量、各定价参数、各费用、P50/P90/P99
+    零件报价.npy          每个零件一行：所属报价在本块中的行号
+    零件名称编号.npy      零件名称在 零件名称表.npy（本块内去重排序的名称）中的下标
+    零件体积.npy / 零件支撑体积.npy
+查询用 np.load(mmap_mode='r') 打开，只读取过滤条件和结果用到的列；100 万个报价按月汇总各项费用约 0.1 秒。
+
+每次追加写成一个新块（先写到临时目录再改名，写到一半中断不会留下残缺的块）；
+未满的小块超过 COMPACT_CHUNKS 个时合并为一块，合并出的块在 meta.json 中记下被替换的块名，
+旧块即使未能删除也不会被重复读取。时间为本地时间，精确到秒。
+
+命令行：python quote_archive.py [--start 2026-01-01] [--end 2026-07-01] [--part 零件名称] [--min 1000] [--max 5000]
+         [--by 月] [--csv 报价明细.csv]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+from batch_pricing import COST_COLUMNS
+from cost_module import DEFAULT_PRICING_STANDARD, convert_duration_to_hours
+from quote_cache import default_cache_path
+from result_model import PartTable
+
+# 成本分布的分位数列（报价没有成本分布时为 NaN）
+DISTRIBUTION_COLUMNS = ("P50", "P90", "P99")
+
+# 报价列及其类型
+QUOTE_COLUMNS = {
+    "时间": "datetime64[s]",
+    "机时": np.float64,
+    "总体积": np.float64,
+    "零件数量": np.int64,
+    **{param: np.float64 for param in DEFAULT_PRICING_STANDARD},
+    **{column: np.float64 for column in COST_COLUMNS + DISTRIBUTION_COLUMNS},
+}
+
+# meta.json 中记录最小/最大值的列（查询时据此跳过整块）
+STATS_COLUMNS = ("时间",) + COST_COLUMNS
+
+# 报价数或零件数达到以下值的块不再参与合并
+CHUNK_QUOTES = 1 << 16
+CHUNK_PARTS = 1 << 22
+
+# 未满的小块达到此数量时合并
+COMPACT_CHUNKS = 32
+
+# 合并时的锁文件超过此时间（秒）视为上次合并中断遗留
+STALE_LOCK_SECONDS = 600
+
+# 汇总的分组粒度
+GROUP_UNITS = {"日": "D", "月": "M", "年": "Y"}
+
+
+def default_archive_path():
+    return os.path.join(os.path.dirname(default_cache_path()), 'quote_archive')
+
+
+def quote_record(result, timestamp=None):
+    """由 calculate_multipart_cost 的结果生成一条归档记录（timestamp 为 datetime，缺省为当前时间）"""
+    parts = PartTable.from_parts(result['输入参数']['零件清单'])
+    record = {
+        "时间": np.datetime64((timestamp or datetime.now()).replace(microsecond=0), 's'),
+        "机时": convert_duration_to_hours(result['输入参数']['总打印时长']),
+        "总体积": parts.total_volume(),
+        "零件数量": len(parts),
+        **{param: result['定价标准'].get(param, np.nan) for param in DEFAULT_PRICING_STANDARD},
+        **{column: result['计算明细'][column] for column in COST_COLUMNS},
+        'parts': parts,
+    }
+    distribution = result.get('成本分布', {})
+    for column in DISTRIBUTION_COLUMNS:
+        record[column] = distribution.get(column, np.nan)
+    return record
+
+
+def records_to_columns(records):
+    """把 quote_record 的记录列表转换为 (报价列字典, 零件列字典)，供 append_columns 写入"""
+    quotes = {column: np.array([record[column] for record in records], dtype=dtype)
+              for column, dtype in QUOTE_COLUMNS.items()}
+    tables = [record['parts'] for record in records]
+    parts = {
+        "零件报价": np.repeat(np.arange(len(tables)), [len(table) for table in tables]),
+        "零件名称": [name for table in tables for name in table.names],
+        "零件体积": np.concatenate([np.asarray(table.volumes) for table in tables] or [np.empty(0)]),
+        "零件支撑体积": np.concatenate([np.asarray(table.support_volumes) for table in tables] or [np.empty(0)]),
+    }
+    return quotes, parts
+
+
+class QuoteArchive:
+    """分块列存储的报价历史（追加写入，按时间、零件名称、费用区间查询）"""
+
+    def __init__(self, path=None):
+        self.path = path or default_archive_path()
+
+    # ---- 写入 ----
+
+    def append(self, records):
+        """追加 quote_record 生成的记录；归档只是附带功能，磁盘错误只在终端提示，返回是否写入"""
+        records = list(records)
+        if not records:
+            return False
+        try:
+            self.append_columns(*records_to_columns(records))
+        except OSError as e:
+            print(f"报价归档写入失败（已忽略）：{e}")
+            return False
+        return True
+
+    def append_columns(self, quotes, parts):
+        """按列追加：quotes 为 {报价列: 数组}（缺少的定价/分布列补 NaN），
+        parts 为 {"零件报价": 报价行号, "零件名称": 名称序列, "零件体积", "零件支撑体积"}；返回新块的名称"""
+        count = len(quotes["时间"])
+        columns = {}
+        for column, dtype in QUOTE_COLUMNS.items():
+            values = quotes.get(column)
+            columns[column] = np.full(count, np.nan) if values is None else np.asarray(values, dtype=dtype)
+        names, codes = np.unique(np.asarray(parts["零件名称"], dtype=str), return_inverse=True)
+        columns["零件报价"] = np.asarray(parts["零件报价"], dtype=np.int32)
+        columns["零件名称编号"] = codes.astype(np.int32)
+        columns["零件名称表"] = names
+        columns["零件体积"] = np.asarray(parts["零件体积"], dtype=np.float64)
+        columns["零件支撑体积"] = np.asarray(parts["零件支撑体积"], dtype=np.float64)
+        name = self._write_chunk(columns)
+        self.compact()
+        return name
+
+    def _write_chunk(self, columns, replaces=()):
+        """写出一个块（临时目录写完后改名），返回块名"""
+        os.makedirs(self.path, exist_ok=True)
+        chunks = self._chunk_names()
+        sequence = int(chunks[-1].split('_')[1].split('-')[0]) + 1 if chunks else 0
+        name = f"chunk_{sequence:08d}-{uuid.uuid4().hex[:8]}"
+        staging = os.path.join(self.path, f".{name}.tmp")
+        os.makedirs(staging)
+        try:
+            for column, values in columns.items():
+                np.save(os.path.join(staging, f"{column}.npy"), values, allow_pickle=False)
+            meta = {'quotes': len(columns["时间"]), 'parts': len(columns["零件报价"]), 'replaces': list(replaces),
+                    'stats': {column: _value_range(columns[column]) for column in STATS_COLUMNS}}
+            with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.rename(staging, os.path.join(self.path, name))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return name
+
+    def compact(self):
+        """合并未满的小块（另一进程正在合并时跳过），返回合并的块数"""
+        chunks = self.chunks()
+        small = [name for name, meta in chunks if meta['quotes'] < CHUNK_QUOTES and meta['parts'] < CHUNK_PARTS]
+        if len(small) < COMPACT_CHUNKS:
+            return 0
+        lock = os.path.join(self.path, '.compact.lock')
+        try:
+            if time.time() - os.path.getmtime(lock) > STALE_LOCK_SECONDS:
+                os.remove(lock)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return 0
+        try:
+            # 从最小的块开始合并，直到合并后的块达到上限
+            metas = dict(chunks)
+            merged, quotes, parts = [], 0, 0
+            for name in sorted(small, key=lambda name: metas[name]['quotes']):
+                if merged and (quotes + metas[name]['quotes'] > CHUNK_QUOTES or parts + metas[name]['parts'] > CHUNK_PARTS):
+                    break
+                merged.append(name)
+                quotes += metas[name]['quotes']
+                parts += metas[name]['parts']
+            if len(merged) < 2:
+                return 0
+            self._write_chunk(self._merge_columns(merged), replaces=merged)
+            for name in merged:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+            return len(merged)
+        finally:
+            try:
+                os.remove(lock)
+            except OSError:
+                pass
+
+    def _merge_columns(self, names):
+        columns = {column: [] for column in QUOTE_COLUMNS}
+        part_quotes, part_names, volumes, supports = [], [], [], []
+        offset = 0
+        for name in names:
+            chunk = self._open(name)
+            for column in QUOTE_COLUMNS:
+                columns[column].append(chunk.column(column))
+            part_quotes.append(chunk.column("零件报价") + offset)
+            part_names.append(chunk.column("零件名称表")[chunk.column("零件名称编号")])
+            volumes.append(chunk.column("零件体积"))
+            supports.append(chunk.column("零件支撑体积"))
+            offset += chunk.meta['quotes']
+        merged = {column: np.concatenate(values).astype(QUOTE_COLUMNS[column]) for column, values in columns.items()}
+        names, codes = np.unique(np.concatenate(part_names), return_inverse=True)
+        merged.update({"零件报价": np.concatenate(part_quotes).astype(np.int32),
+                       "零件名称编号": codes.astype(np.int32), "零件名称表": names,
+                       "零件体积": np.concatenate(volumes), "零件支撑体积": np.concatenate(supports)})
+        return merged
+
+    # ---- 读取 ----
+
+    def _chunk_names(self):
+        try:
+            return sorted(name for name in os.listdir(self.path) if name.startswith('chunk_'))
+        except FileNotFoundError:
+            return []
+
+    def chunks(self):
+        """按块名顺序返回 [(块名, meta)]，跳过已被合并替换的块"""
+        metas = []
+        for name in self._chunk_names():
+            try:
+                with open(os.path.join(self.path, name, 'meta.json'), encoding='utf-8') as f:
+                    metas.append((name, json.load(f)))
+            except (OSError, ValueError):
+                continue
+        replaced = {old for _, meta in metas for old in meta['replaces']}
+        return [(name, meta) for name, meta in metas if name not in replaced]
+
+    def _open(self, name, meta=None):
+        return _Chunk(os.path.join(self.path, name), meta)
+
+    def query(self, columns=None, start=None, end=None, part_name=None, cost_min=None, cost_max=None,
+              cost_column="实际费用"):
+        """查询符合条件的报价，返回 {列名: 数组}（各块依次排列，合并过的块中不一定保持写入顺序）
+
+        columns 为要返回的报价列（缺省为全部）；start/end 为时间范围（含 start、不含 end，
+        datetime 或 ISO 格式字符串）；part_name 为零件名称（包含该零件的报价）；
+        cost_min/cost_max 为 cost_column 列的费用区间（含两端）。只读取条件和结果用到的列。
+        """
+        columns = list(QUOTE_COLUMNS) if columns is None else list(columns)
+        unknown = set(columns) - set(QUOTE_COLUMNS)
+        if unknown or cost_column not in COST_COLUMNS:
+            raise ValueError(f"未知的报价列：{'、'.join(sorted(unknown)) or cost_column}")
+        start = None if start is None else np.datetime64(start, 's')
+        end = None if end is None else np.datetime64(end, 's')
+
+        selected = {column: [] for column in columns}
+        for name, meta in self.chunks():
+            if meta['quotes'] == 0 or not _chunk_may_match(meta, start, end, cost_column, cost_min, cost_max):
+                continue
+            chunk = self._open(name, meta)
+            mask = None
+            if start is not None or end is not None:
+                times = chunk.column("时间")
+                mask = _and(mask, times >= start if start is not None else None)
+                mask = _and(mask, times < end if end is not None else None)
+            if cost_min is not None or cost_max is not None:
+                costs = chunk.column(cost_column)
+                mask = _and(mask, costs >= cost_min if cost_min is not None else None)
+                mask = _and(mask, costs <= cost_max if cost_max is not None else None)
+            if part_name is not None:
+                mask = _and(mask, chunk.quotes_with_part(part_name))
+            if mask is not None and not mask.any():
+                continue
+            for column in columns:
+                values = chunk.column(column)
+                selected[column].append(np.array(values if mask is None else values[mask]))
+        return {column: np.concatenate(values) if values else np.empty(0, QUOTE_COLUMNS[column])
+                for column, values in selected.items()}
+
+    def aggregate(self, columns=COST_COLUMNS, by=None, **filters):
+        """符合条件（同 query）的报价按时间分组汇总
+
+        by 为 None（全部合计）或 GROUP_UNITS 中的 "日"、"月"、"年"；
+        返回 {"分组": 分组标签数组, "报价数": 数组, 各列: 合计数组}。
+        """
+        if by is not None and by not in GROUP_UNITS:
+            raise ValueError(f"分组应为 {'、'.join(GROUP_UNITS)} 之一")
+        data = self.query(list(columns) + (["时间"] if by and "时间" not in columns else []), **filters)
+        if by is None:
+            labels = np.array(["全部"])
+            groups = np.zeros(len(next(iter(data.values()))), dtype=np.intp)
+        else:
+            # 时间截断到分组单位后相对最早一组的序号即分组编号，bincount 一遍汇总，无需排序
+            keys = data["时间"].astype(f"datetime64[{GROUP_UNITS[by]}]")
+            first = keys.min() if len(keys) else np.datetime64(0, GROUP_UNITS[by])
+            groups = (keys - first).astype(np.intp)
+            labels = (first + np.arange(groups.max() + 1 if len(groups) else 0)).astype(str)
+        summary = {"分组": labels, "报价数": np.bincount(groups, minlength=len(labels))}
+        for column in columns:
+            values = np.nan_to_num(data[column].astype(np.float64))  # 没有成本分布等缺失值（NaN）不计入合计
+            summary[column] = np.bincount(groups, weights=values, minlength=len(labels))
+        if by is not None:  # 去掉没有报价的分组
+            present = summary["报价数"] > 0
+            summary = {key: values[present] for key, values in summary.items()}
+        return summary
+
+
+class _Chunk:
+    """一个块：按需以内存映射方式打开各列"""
+
+    def __init__(self, path, meta=None):
+        self.path = path
+        if meta is None:
+            with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        self.meta = meta
+        self._columns = {}
+
+    def column(self, column):
+        if column not in self._columns:
+            file_path = os.path.join(self.path, f"{column}.npy")
+            if os.path.exists(file_path):
+                self._columns[column] = np.load(file_path, mmap_mode='r')
+            else:  # 写入该块时还没有这一列（如后来新增的定价参数）
+                self._columns[column] = np.full(self.meta['quotes'], np.nan)
+        return self._columns[column]
+
+    def quotes_with_part(self, part_name):
+        """包含名为 part_name 的零件的报价掩码"""
+        mask = np.zeros(self.meta['quotes'], dtype=bool)
+        names = self.column("零件名称表")
+        index = np.searchsorted(names, part_name)
+        if index < len(names) and names[index] == part_name:
+            mask[self.column("零件报价")[self.column("零件名称编号") == index]] = True
+        return mask
+
+
+def _value_range(values):
+    if len(values) == 0:
+        return None
+    if np.issubdtype(values.dtype, np.datetime64):
+        return [str(values.min()), str(values.max())]
+    values = values[~np.isnan(values)]
+    return [float(values.min()), float(values.max())] if len(values) else None
+
+
+def _chunk_may_match(meta, start, end, cost_column, cost_min, cost_max):
+    """按块的最小/最大值判断是否可能有符合条件的报价"""
+    stats = meta['stats']
+    if stats["时间"] is not None:
+        first, last = (np.datetime64(value, 's') for value in stats["时间"])
+        if start is not None and last < start or end is not None and first >= end:
+            return False
+    if stats.get(cost_column) is not None:
+        low, high = stats[cost_column]
+        if cost_min is not None and high < cost_min or cost_max is not None and low > cost_max:
+            return False
+    return True
+
+
+def _and(mask, condition):
+    if condition is None:
+        return mask
+    return condition if mask is None else mask & condition
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="查询报价历史归档")
+    parser.add_argument("--archive", help=f"归档目录（缺省 {default_archive_path()}）")
+    parser.add_argument("--start", help="起始时间（含），如 2026-01-01")
+    parser.add_argument("--end", help="截止时间（不含），如 2026-07-01")
+    parser.add_argument("--part", help="只统计包含该零件的报价（零件名称须完全一致）")
+    parser.add_argument("--min", type=float, help="费用下限（元）")
+    parser.add_argument("--max", type=float, help="费用上限（元）")
+    parser.add_argument("--column", default="实际费用", choices=COST_COLUMNS, help="费用区间所用的费用列")
+    parser.add_argument("--by", choices=GROUP_UNITS, help="按日/月/年分组汇总")
+    parser.add_argument("--csv", help="把符合条件的报价明细写入 CSV 文件")
+    args = parser.parse_args(argv)
+
+    archive = QuoteArchive(args.archive)
+    filters = dict(start=args.start, end=args.end, part_name=args.part, cost_min=args.min, cost_max=args.max,
+                   cost_column=args.column)
+    start = time.perf_counter()
+    try:
+        summary = archive.aggregate(by=args.by, **filters)
+    except ValueError as e:
+        print(e)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(f"共 {summary['报价数'].sum():,} 个报价（查询耗时 {elapsed:.3f} 秒）")
+    for index, label in enumerate(summary["分组"]):
+        count = summary["报价数"][index]
+        if count:
+            total = summary["实际费用"][index]
+            print(f"  {label}：{count:,} 个报价，实际费用合计 ¥{total:,.2f}，平均 ¥{total / count:,.2f}")
+
+    if args.csv:
+        import pandas as pd
+
+        frame = pd.DataFrame(archive.query(**filters))
+        frame.to_csv(args.csv, index=False, encoding='utf-8-sig')
+        print(f"\n报价明细已生成：{args.csv}（{len(frame)} 行）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
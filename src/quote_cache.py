@@ -0,0 +1,229 @@
+"""报价缓存：把解析出的零件清单和计算结果存入用户数据目录下的 SQLite 数据库
+
+键为报告文件内容的哈希（与文件名、修改时间无关）以及定价标准、打印时长的哈希，
+再次打开同一份报告或只改动价格参数时可直接复用，省去重新解析工作簿。
+条目按最近使用时间淘汰（LRU），总大小不超过 max_bytes。
+键以数据格式版本开头，打开缓存时删除其他版本的条目；个别条目无法还原（例如程序升级后类的定义变了）时
+同样视为未命中并删除该条目。
+缓存只是加速手段：任何数据库错误都视为未命中，并在终端给出提示，不影响正常计算。
+"""
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+import zlib
+
+# 数据库表结构版本；表结构变化时加一，旧版本的数据库会被清空
+SCHEMA_VERSION = 1
+
+# 缓存数据格式版本（写在每个键的开头）；零件/结果的结构变化时加一，旧版本的条目在打开缓存时删除
+CACHE_VERSION = 2
+
+# 缓存总大小上限（压缩后的字节数）
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# 计算文件哈希时每次读取的块大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def default_cache_path():
+    """用户数据目录下的缓存文件路径（Windows 为 %LOCALAPPDATA%，其他系统为 ~/.cache）"""
+    base = (os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME')
+            or os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, '3dbudgcalc', 'quote_cache.sqlite3')
+
+
+def file_digest(file_path):
+    """文件内容的 BLAKE2b 哈希（十六进制）"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def pricing_digest(pricing_standard):
+    """定价标准字典的哈希（与键的顺序无关）"""
+    payload = json.dumps(pricing_standard, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _key_prefix():
+    return f"v{CACHE_VERSION}:"
+
+
+def _load(data):
+    """还原缓存的条目；无法还原时（数据损坏、程序升级后类的定义变了等）返回 None"""
+    try:
+        return pickle.loads(zlib.decompress(data))
+    except Exception as e:  # 反序列化可能抛出任意异常（AttributeError、ImportError 等）
+        print(f"报价缓存条目无法读取（已忽略）：{e}")
+        return None
+
+
+class QuoteCache:
+    """基于 SQLite 的 LRU 报价缓存（每次操作单独连接，可在不同的后台线程中使用）"""
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            with conn:
+                if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                    conn.execute("DROP TABLE IF EXISTS entries")
+                    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS entries (
+                        key TEXT PRIMARY KEY,
+                        data BLOB NOT NULL,
+                        size INTEGER NOT NULL,
+                        last_used REAL NOT NULL
+                    )""")
+                conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+                # 键的主键索引按前缀范围查找，只删除其他数据格式版本的条目
+                prefix = _key_prefix()
+                conn.execute("DELETE FROM entries WHERE key < ? OR key >= ?", (prefix, prefix[:-1] + ';'))
+            self._initialized = True
+        return conn
+
+    def _get(self, key):
+        key = _key_prefix() + key
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    row = conn.execute("SELECT data FROM entries WHERE key = ?", (key,)).fetchone()
+                    if row is None:
+                        return None
+                    conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"报价缓存读取失败（已忽略）：{e}")
+            return None
+        value = _load(row[0])
+        if value is None:
+            self._delete(key)
+        return value
+
+    def _delete(self, key):
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"报价缓存写入失败（已忽略）：{e}")
+
+    def _put(self, key, value):
+        key = _key_prefix() + key
+        data = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        if len(data) > self.max_bytes:
+            return
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("INSERT OR REPLACE INTO entries (key, data, size, last_used) VALUES (?, ?, ?, ?)",
+                                 (key, data, len(data), time.time()))
+                    self._evict(conn)
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"报价缓存写入失败（已忽略）：{e}")
+
+    def _evict(self, conn):
+        """按最近使用时间从旧到新删除条目，直到总大小不超过上限"""
+        excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            stale.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def get_parts(self, digest):
+        """按报告内容哈希取出零件清单，未命中返回 None"""
+        return self._get(f"parts:{digest}")
+
+    def put_parts(self, digest, parts):
+        self._put(f"parts:{digest}", parts)
+
+    @staticmethod
+    def _quote_key(digest, pricing_standard, total_print_duration):
+        return f"quote:{digest}:{pricing_digest(pricing_standard)}:{total_print_duration}"
+
+    def get_quote(self, digest, pricing_standard, total_print_duration):
+        """取出计算结果（不含零件清单，由调用方补回），未命中返回 None"""
+        return self._get(self._quote_key(digest, pricing_standard, total_print_duration))
+
+    def put_quote(self, digest, pricing_standard, total_print_duration, result):
+        """存入计算结果；零件清单已按报告单独缓存，这里不再重复保存"""
+        stored = dict(result, 输入参数={k: v for k, v in result['输入参数'].items() if k != '零件清单'})
+        self._put(self._quote_key(digest, pricing_standard, total_print_duration), stored)
+
+    def iter_quote_history(self):
+        """逐个产出缓存中报价过的 (零件清单, 打印时长)
+
+        同一份报告在同一打印时长下只产出一次（与定价标准无关）；零件清单已被淘汰的报价跳过。
+        只读取，不更新条目的最近使用时间。
+        """
+        prefix = _key_prefix()
+        try:
+            conn = self._connect()
+            try:
+                keys = [key for (key,) in conn.execute("SELECT key FROM entries WHERE key LIKE ?",
+                                                       (f"{prefix}quote:%",))]
+                seen = set()
+                for key in keys:
+                    # 打印时长可能是 "HH:MM:SS" 格式，本身带冒号
+                    _, digest, _, total_print_duration = key[len(prefix):].split(':', 3)
+                    if (digest, total_print_duration) in seen:
+                        continue
+                    seen.add((digest, total_print_duration))
+                    row = conn.execute("SELECT data FROM entries WHERE key = ?",
+                                       (f"{prefix}parts:{digest}",)).fetchone()
+                    parts = _load(row[0]) if row is not None else None
+                    if parts is not None:
+                        yield parts, total_print_duration
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"报价缓存读取失败（已忽略）：{e}")
+
+    def stats(self):
+        """返回 (条目数, 总字节数)"""
+        try:
+            conn = self._connect()
+            try:
+                return conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"报价缓存读取失败（已忽略）：{e}")
+            return 0, 0
+
+    def clear(self):
+        """清空缓存"""
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM entries")
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"报价缓存清空失败（已忽略）：{e}")
@@ -0,0 +1,272 @@
+"""本地 HTTP 报价服务：供销售门户等程序直接调用计价核心，无需打开界面
+
+接口（JSON 使用 UTF-8 编码）：
+    POST /quote   请求体 {"parts": [{"name": "...", "volume": 1234.5, "support_volume": 67.8}, ...],
+                          "duration": "1天2小时3分4秒"（或小时数）,
+                          "pricing": {"材料单价": 1900, ...}（可选，只写需要覆盖的参数）}
+                  返回与 calculate_multipart_cost 相同结构的结果（零件清单为零件字典列表）
+    GET  /health  返回服务状态和累计的报价数、批次数
+
+同一轮事件循环中到达的请求（可用 --batch-window-ms 再多等一会）合并成一批：
+定价标准相同的报价一起交给 batch_pricing.calculate_batch_cost 向量化计算，
+结果（含取整）与逐个调用 calculate_multipart_cost 完全一致。
+只依赖标准库 asyncio（HTTP/1.1，支持 keep-alive），默认只监听本机 127.0.0.1。
+
+用法：
+    python quote_server.py [--host 127.0.0.1] [--port 8765] [--max-batch 1024] [--batch-window-ms 0]
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+
+import numpy as np
+
+from batch_pricing import COST_COLUMNS, calculate_batch_cost
+from cost_module import apply_pricing_overrides, convert_duration_to_hours
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# 一批最多合并的报价数（达到后立即计算，不再等待）
+MAX_BATCH_SIZE = 1024
+
+# 请求体大小上限（字节）
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class QuoteRequestError(ValueError):
+    """请求内容无效（返回 400）"""
+
+
+async def read_headers(reader):
+    """读取到空行为止的请求头，返回 {小写名称: 值}"""
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+def parse_quote_request(payload):
+    """校验请求 JSON，返回 (零件字典列表, 打印时长, 完整的定价标准)"""
+    if not isinstance(payload, dict):
+        raise QuoteRequestError("请求体必须是 JSON 对象")
+    parts = payload.get("parts")
+    if not isinstance(parts, list) or not parts:
+        raise QuoteRequestError("parts 必须是非空的零件列表")
+    try:
+        parts = [
+            {"name": part.get("name", ""), "volume": float(part["volume"]),
+             "support_volume": float(part.get("support_volume", 0.0))}
+            for part in parts
+        ]
+    except (AttributeError, KeyError, TypeError, ValueError):
+        raise QuoteRequestError('每个零件须为 {"name", "volume", "support_volume"（可选）}，体积为数字') from None
+    # json 模块接受 NaN、Infinity，这样的体积会让结果无法编码为合法的 JSON
+    if not all(math.isfinite(part["volume"]) and math.isfinite(part["support_volume"]) for part in parts):
+        raise QuoteRequestError("零件体积必须是有限的数字")
+
+    duration = payload.get("duration")
+    if (isinstance(duration, bool) or not isinstance(duration, (str, int, float)) or duration == ""
+            or (isinstance(duration, float) and not math.isfinite(duration))):
+        raise QuoteRequestError("duration 必须是打印时长字符串或有限的小时数")
+
+    overrides = payload.get("pricing") or {}
+    if not isinstance(overrides, dict):
+        raise QuoteRequestError("pricing 必须是 {参数名: 数值} 对象")
+    try:
+        pricing_standard = apply_pricing_overrides(overrides)
+    except ValueError as e:
+        raise QuoteRequestError(str(e)) from None
+    if not all(math.isfinite(value) for value in pricing_standard.values()):
+        raise QuoteRequestError("定价参数的取值必须是有限的数字")
+    return parts, duration, pricing_standard
+
+
+def price_quote_batch(quotes, pricing_standard):
+    """定价标准相同的一组报价 [(零件清单, 打印时长)] 合并为一次向量化计算
+
+    返回与 calculate_multipart_cost 结构相同的结果列表（零件清单为零件字典列表）。
+    """
+    counts = [len(parts) for parts, _ in quotes]
+    rows = sum(counts)
+    volumes = np.fromiter((part["volume"] for parts, _ in quotes for part in parts), np.float64, rows)
+    supports = np.fromiter((part["support_volume"] for parts, _ in quotes for part in parts), np.float64, rows)
+    build_ids = np.repeat(np.arange(len(quotes)), counts)
+    hours = np.fromiter((convert_duration_to_hours(duration) for _, duration in quotes), np.float64, len(quotes))
+
+    batch = calculate_batch_cost(volumes, supports, build_ids, hours, pricing_standard)
+    columns = [batch[column].tolist() for column in COST_COLUMNS]
+    return [
+        {
+            "输入参数": {"零件清单": parts, "总打印时长": duration, "零件数量": len(parts)},
+            "定价标准": pricing_standard,
+            "计算明细": dict(zip(COST_COLUMNS, terms)),
+        }
+        for (parts, duration), *terms in zip(quotes, *columns)
+    ]
+
+
+class QuoteBatcher:
+    """收集并发到达的报价请求，按定价标准分组后批量计算"""
+
+    def __init__(self, max_batch=MAX_BATCH_SIZE, window=0.0):
+        self.max_batch = max_batch
+        self.window = window  # 第一个请求到达后最多再等待的秒数（0 表示只合并同一轮事件循环中的请求）
+        self.pending = []
+        self._flush_handle = None
+        self.quotes = 0
+        self.batches = 0
+
+    def submit(self, parts, duration, pricing_standard):
+        """加入待计算队列，返回报价结果的 Future"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((parts, duration, pricing_standard, future))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self._flush_handle is None:
+            if self.window > 0:
+                self._flush_handle = loop.call_later(self.window, self.flush)
+            else:
+                self._flush_handle = loop.call_soon(self.flush)
+        return future
+
+    def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+
+        groups = {}
+        for parts, duration, pricing_standard, future in pending:
+            group = groups.setdefault(tuple(pricing_standard.values()), (pricing_standard, []))
+            group[1].append((parts, duration, future))
+        for pricing_standard, group in groups.values():
+            try:
+                results = price_quote_batch([(parts, duration) for parts, duration, _ in group], pricing_standard)
+            except Exception as e:
+                for _, _, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, _, future), result in zip(group, results):
+                    if not future.done():
+                        future.set_result(result)
+            self.batches += 1
+        self.quotes += len(pending)
+
+
+def http_response(status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("ascii") + body
+
+
+class QuoteServer:
+    """asyncio HTTP 报价服务"""
+
+    def __init__(self, max_batch=MAX_BATCH_SIZE, window=0.0):
+        self.batcher = QuoteBatcher(max_batch, window)
+
+    async def dispatch(self, method, path, body):
+        """处理一个请求，返回 (状态码, 响应 JSON)"""
+        if path == "/health":
+            if method != "GET":
+                return 405, {"error": "请使用 GET"}
+            return 200, {"status": "ok", "quotes": self.batcher.quotes, "batches": self.batcher.batches}
+        if path != "/quote":
+            return 404, {"error": f"未知的路径：{path}"}
+        if method != "POST":
+            return 405, {"error": "请使用 POST"}
+        try:
+            quote = parse_quote_request(json.loads(body))
+        except (QuoteRequestError, UnicodeDecodeError) as e:
+            return 400, {"error": str(e)}
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"请求体不是有效的 JSON：{e}"}
+        try:
+            return 200, await self.batcher.submit(*quote)
+        except Exception as e:
+            return 500, {"error": f"报价计算失败：{e}"}
+
+    async def handle_connection(self, reader, writer):
+        """一个连接上依次处理多个请求（keep-alive），直到客户端关闭或要求关闭"""
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+                    headers = await read_headers(reader)
+                    method, target, version = request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError(length)
+                except (ValueError, asyncio.LimitOverrunError):
+                    # 请求行或请求头格式不对、超过读取缓冲区上限（readline 抛出 ValueError），或 Content-Length 为负数
+                    writer.write(http_response(400, {"error": "无效的 HTTP 请求"}, False))
+                    break
+                if length > MAX_BODY_BYTES:
+                    writer.write(http_response(413, {"error": f"请求体超过 {MAX_BODY_BYTES} 字节"}, False))
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+                status, payload = await self.dispatch(method, target.split("?", 1)[0], body)
+                writer.write(http_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        bound_port = server.sockets[0].getsockname()[1]
+        # 端口为 0 时由系统分配，这里打印实际端口（负载测试脚本从这一行读取地址）
+        print(f"报价服务已启动：http://{host}:{bound_port}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地 HTTP 报价服务")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"监听地址（缺省 {DEFAULT_HOST}，只接受本机请求）")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"监听端口（缺省 {DEFAULT_PORT}，0 表示自动分配）")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH_SIZE, help="一批最多合并的报价数（1 表示不合并）")
+    parser.add_argument("--batch-window-ms", type=float, default=0.0,
+                        help="收到第一个请求后最多再等待多少毫秒凑成一批（缺省 0，只合并同时到达的请求）")
+    args = parser.parse_args(argv)
+
+    server = QuoteServer(max_batch=max(args.max_batch, 1), window=args.batch_window_ms / 1000)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("报价服务已停止")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
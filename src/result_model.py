@@ -0,0 +1,44 @@
+"""计算结果中的零件清单模型：数值按列存储，只在显示/导出时才格式化
+
+原先计算函数为每个零件拼接 "名称 (体积mm³)" 之类的显示字符串，导出时再把数字从字符串中
+解析回来；这里改为名称列表 + double 数组（array 模块，不引入 numpy），数值原样传到渲染端。
+"""
+from array import array
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class PartTable:
+    """零件清单（列式）：names[i]、volumes[i]、support_volumes[i] 描述第 i 个零件，体积单位 mm³"""
+    names: list = field(default_factory=list)
+    volumes: array = field(default_factory=lambda: array('d'))
+    support_volumes: array = field(default_factory=lambda: array('d'))
+
+    @classmethod
+    def from_parts(cls, parts):
+        """由 [{'name', 'volume', 'support_volume'(可选)}] 构建；传入 PartTable 时原样返回"""
+        if isinstance(parts, cls):
+            return parts
+        return cls(
+            [part['name'] for part in parts],
+            array('d', [part['volume'] for part in parts]),
+            array('d', [part.get('support_volume', 0.0) for part in parts]),
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def rows(self):
+        """逐个零件返回 (名称, 体积, 支撑体积)"""
+        return zip(self.names, self.volumes, self.support_volumes)
+
+    def total_volume(self):
+        """零件体积与支撑体积之和（按零件顺序逐个累加，与批量报价的累加顺序一致）"""
+        return sum(volume + support for volume, support in zip(self.volumes, self.support_volumes))
+
+    def to_dicts(self):
+        """转换回零件字典列表"""
+        return [
+            {'name': name, 'volume': volume, 'support_volume': support}
+            for name, volume, support in self.rows()
+        ]
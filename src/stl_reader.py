@@ -0,0 +1,180 @@
+"""STL 模型直接读取：不经过 Magics 报告，由网格计算零件体积、表面积和包围盒
+
+二进制 STL 用 mmap 映射后以 numpy 结构化数组直接查看三角形数据（不复制整个文件），
+按块（CHUNK_TRIANGLES 个三角形）转为 float64 计算：
+  体积   = Σ v0 · (e1 × e2) / 6（有符号四面体体积之和，法向朝外时为正）
+  表面积 = Σ |e1 × e2| / 2
+其中 e1 = v1 - v0、e2 = v2 - v0。内存占用只与块大小有关，与三角形数量无关。
+ASCII STL 没有固定的记录长度，只能整体解析，作为兼容回退。
+映射只在 map_triangles 调用期间存在，返回（或抛出异常）前关闭，不依赖垃圾回收。
+STL 不带单位，这里按 Magics 的习惯视为毫米，体积单位 mm³，与体积报告一致。
+"""
+import mmap
+import os
+import re
+import time
+import traceback
+
+import numpy as np
+
+# 二进制 STL：80 字节文件头 + 4 字节三角形数量，之后每个三角形 50 字节
+HEADER_SIZE = 84
+TRIANGLE_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attribute', '<u2'),
+])
+
+# 每块计算的三角形数（float64 中间结果约 CHUNK_TRIANGLES × 200 字节，块小一些能留在 CPU 缓存中）
+CHUNK_TRIANGLES = 1 << 15
+
+ASCII_VERTEX_PATTERN = re.compile(rb'vertex\s+(\S+)\s+(\S+)\s+(\S+)')
+
+
+def binary_triangle_count(file_size, header):
+    """按文件长度判断是否为二进制 STL：是则返回三角形数，否则返回 None
+
+    二进制 STL 的长度为 84 + 50 × 三角形数。长度恰好相等时即使文件头以 solid 开头（部分软件如此）也是二进制；
+    末尾另有填充字节时，只要文件头不以 solid 开头也按二进制读取（ASCII STL 必须以 solid 开头）。
+    """
+    if file_size < HEADER_SIZE:
+        return None
+    count = int.from_bytes(header[80:84], 'little')
+    expected = HEADER_SIZE + count * TRIANGLE_DTYPE.itemsize
+    if file_size == expected or (file_size > expected and not header.lstrip().startswith(b'solid')):
+        return count
+    return None
+
+
+def map_triangles(file_path, fn, *args, **kwargs):
+    """以 STL 文件的 (三角形数, 3, 3) float32 顶点数组调用 fn(triangles, *args, **kwargs)，返回 fn 的结果
+
+    二进制 STL 的顶点数组是指向 mmap 的只读视图（不复制），返回前关闭映射，因此 fn 的结果中不能引用该数组；
+    ASCII STL 为解析出的普通数组。
+    """
+    with open(file_path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        header = f.read(HEADER_SIZE)
+        count = binary_triangle_count(file_size, header)
+        if count is None:
+            f.seek(0)
+            return fn(parse_ascii_triangles(f.read(), file_path), *args, **kwargs)
+        if count == 0:
+            return fn(np.empty((0, 3, 3), dtype=np.float32), *args, **kwargs)
+
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return _call_with_mapping(mapping, count, fn, args, kwargs)
+        finally:
+            mapping.close()
+
+
+def _call_with_mapping(mapping, count, fn, args, kwargs):
+    """视图只作为 fn 的参数存在，fn 返回后即释放；出错时清除回溯中各栈帧的局部变量（其中引用着视图）"""
+    try:
+        return fn(np.frombuffer(mapping, dtype=TRIANGLE_DTYPE, count=count, offset=HEADER_SIZE)['vertices'],
+                  *args, **kwargs)
+    except BaseException as e:
+        traceback.clear_frames(e.__traceback__)
+        raise
+
+
+def parse_ascii_triangles(data, file_path=''):
+    """解析 ASCII STL 的全部顶点，返回 (三角形数, 3, 3) 的 float32 数组"""
+    vertices = np.array(ASCII_VERTEX_PATTERN.findall(data), dtype=np.float32)
+    if len(vertices) == 0 or len(vertices) % 3:
+        # 没有任何三角形的文件多半是格式不符（例如末尾带填充且文件头以 solid 开头的二进制 STL），不能按体积 0 报价
+        raise ValueError(f"无法识别的 STL 文件（没有读到完整的三角形）：{file_path}")
+    return vertices.reshape(-1, 3, 3)
+
+
+def coordinate_chunks(triangles, progress=None):
+    """按块产出 float64 坐标数组 xyz（3, 3, 块大小）：xyz[c, k] 为各三角形第 k 个顶点的第 c 个坐标
+
+    按坐标分量连续存放，后续运算都是一维连续数组上的逐元素计算。
+    progress(已处理三角形数, 总数) 为可选的进度回调。
+    """
+    count = len(triangles)
+    for start in range(0, count, CHUNK_TRIANGLES):
+        yield triangles[start:start + CHUNK_TRIANGLES].transpose(2, 1, 0).astype(np.float64, order='C')
+        if progress is not None:
+            progress(min(start + CHUNK_TRIANGLES, count), count)
+
+
+def face_vectors(xyz):
+    """各三角形的 e1 × e2（长度为面积的两倍，方向为按顶点顺序的外法向），返回 (cx, cy, cz)"""
+    (x0, x1, x2), (y0, y1, y2), (z0, z1, z2) = xyz
+    e1x, e1y, e1z = x1 - x0, y1 - y0, z1 - z0
+    e2x, e2y, e2z = x2 - x0, y2 - y0, z2 - z0
+    return e1y * e2z - e1z * e2y, e1z * e2x - e1x * e2z, e1x * e2y - e1y * e2x
+
+
+def mesh_properties(triangles, progress=None):
+    """由顶点数组计算体积（mm³）、表面积（mm²）和包围盒
+
+    返回 {'volume', 'surface_area', 'bbox_min', 'bbox_max', 'triangles'}；
+    法向整体朝内的网格体积为负，这里取绝对值。progress(已处理三角形数, 总数) 为可选的进度回调。
+    """
+    count = len(triangles)
+    volume = area = 0.0
+    lower = np.full(3, np.inf)
+    upper = np.full(3, -np.inf)
+    for xyz in coordinate_chunks(triangles, progress):
+        cx, cy, cz = face_vectors(xyz)
+        volume += float(xyz[0, 0] @ cx + xyz[1, 0] @ cy + xyz[2, 0] @ cz)
+        area += float(np.sqrt(cx * cx + cy * cy + cz * cz).sum())
+        np.minimum(lower, xyz.reshape(3, -1).min(axis=1), out=lower)
+        np.maximum(upper, xyz.reshape(3, -1).max(axis=1), out=upper)
+
+    if count == 0:
+        lower = upper = np.zeros(3)
+    return {
+        'volume': abs(volume) / 6,
+        'surface_area': area / 2,
+        'bbox_min': tuple(lower.tolist()),
+        'bbox_max': tuple(upper.tolist()),
+        'triangles': count,
+    }
+
+
+def read_stl_part(file_path, progress=None, support=None, print_parameters=None):
+    """读取一个 STL 文件，返回零件字典（可直接传给 calculate_multipart_cost）
+
+    除 name/volume/support_volume 外还带有 surface_area、bbox_min、bbox_max、triangles。
+    support 为 support_estimator.estimate_support 的关键字参数字典（可以为空字典）时估算支撑体积，
+    并附带 overhang_area、overhang_triangles；为 None 时 support_volume 为 0。
+    给出 print_parameters（print_time 的打印参数，可以为空字典）时切片估算扫描时间，
+    附带 scan_seconds、height、layers、scan_area，可交给 print_time.estimate_build_time 估算整版打印时长。
+    """
+    part = {'name': os.path.basename(file_path), 'support_volume': 0.0}
+    part.update(map_triangles(file_path, _mesh_part, progress, support, print_parameters))
+    return part
+
+
+def _mesh_part(triangles, progress, support, print_parameters):
+    """read_stl_part 在映射期间计算的各项（结果只含数值，不引用顶点数组）"""
+    part = mesh_properties(triangles, progress)
+    if support is not None:
+        from support_estimator import estimate_support
+        part.update(estimate_support(triangles, **support))
+    if print_parameters is not None:
+        from print_time import estimate_part_time
+        part.update(estimate_part_time(triangles, print_parameters))
+    return part
+
+
+def load_stl_parts(file_paths, progress=None, support=None, print_parameters=None):
+    """读取多个 STL 文件，返回 (零件列表, 读取统计)，读取统计与 excel_loader.load_parts 相同"""
+    start = time.perf_counter()
+    parts = []
+    for index, file_path in enumerate(file_paths):
+        parts.append(read_stl_part(file_path, support=support, print_parameters=print_parameters))
+        if progress is not None:
+            progress(index + 1, len(file_paths))
+    elapsed = time.perf_counter() - start
+    stats = {
+        'rows': len(parts),
+        'seconds': elapsed,
+        'rows_per_second': len(parts) / elapsed if elapsed > 0 else float('inf'),
+    }
+    return parts, stats
@@ -0,0 +1,62 @@
+"""支撑体积估算：由网格的悬垂面投影到成型平台估算支撑体积，代替 Magics 导出的支撑体积
+
+对给定的成型方向 d（单位向量，缺省 +Z），朝下且与平台夹角小于 overhang_angle 的面
+（-n · d > cos(overhang_angle)）视为需要支撑的悬垂面。每个悬垂面向平台投影成一个直棱柱：
+  投影面积 = -(e1 × e2) · d / 2
+  柱高     = 三角形重心的高度 - 平台高度
+三角形的高度是线性的，棱柱体积按重心高度计算是精确的。平台高度为零件最低点再减去 lift（零件被支撑抬高的距离）。
+这是包络体积的上限估计：悬垂面下方若是零件自身，实际支撑只到零件表面为止；
+支撑一般为网格/块状结构而非实体，可用 fill_ratio 按支撑类型与 Magics 的结果标定。
+"""
+import math
+
+import numpy as np
+
+from stl_reader import coordinate_chunks, face_vectors
+
+# 缺省的成型方向和自支撑角度（与平台的夹角小于此角度的朝下表面需要支撑）
+DEFAULT_BUILD_DIRECTION = (0.0, 0.0, 1.0)
+DEFAULT_OVERHANG_ANGLE = 45.0
+
+# 支撑的实体占比（1 表示按投影包络的全部体积计价）
+DEFAULT_FILL_RATIO = 1.0
+
+
+def estimate_support(triangles, build_direction=DEFAULT_BUILD_DIRECTION, overhang_angle=DEFAULT_OVERHANG_ANGLE,
+                     lift=0.0, fill_ratio=DEFAULT_FILL_RATIO, progress=None):
+    """估算 (三角形数, 3, 3) 顶点数组所描述零件的支撑
+
+    返回 {'support_volume'（mm³）, 'overhang_area'（悬垂面投影面积，mm²）, 'overhang_triangles'}。
+    """
+    direction = np.asarray(build_direction, dtype=np.float64)
+    length = np.linalg.norm(direction)
+    if not length > 0:
+        raise ValueError("成型方向不能为零向量")
+    dx, dy, dz = direction / length
+    threshold = math.cos(math.radians(overhang_angle))
+
+    # 平台高度在读完整个网格前未知：分别累加 Σ 投影面积 × 重心高度 与 Σ 投影面积，最后再减去平台高度
+    weighted_height = projected_area = 0.0
+    overhang_count = 0
+    plate = np.inf
+    for xyz in coordinate_chunks(triangles, progress):
+        cx, cy, cz = face_vectors(xyz)
+        facing = -(cx * dx + cy * dy + cz * dz)  # 2 × 面积 × (-n · d)
+        overhang = facing > threshold * np.sqrt(cx * cx + cy * cy + cz * cz)
+        heights = xyz[0] * dx + xyz[1] * dy + xyz[2] * dz  # 各顶点沿成型方向的高度 (3, 块大小)
+        plate = min(plate, float(heights.min()))
+
+        area = facing[overhang] / 2
+        centroid = heights[:, overhang].sum(axis=0) / 3
+        weighted_height += float(area @ centroid)
+        projected_area += float(area.sum())
+        overhang_count += int(np.count_nonzero(overhang))
+
+    if overhang_count == 0:
+        return {'support_volume': 0.0, 'overhang_area': 0.0, 'overhang_triangles': 0}
+    envelope = weighted_height - (plate - lift) * projected_area
+    return {
+        'support_volume': max(envelope, 0.0) * fill_ratio,
+        'overhang_area': projected_area,
+        'overhang_triangles': overhang_count,
+    }
@@ -0,0 +1,103 @@
+"""后台任务层：在 QThreadPool 中执行加载、计算和导出，避免阻塞 Qt 主线程
+
+任务函数须接受关键字参数 progress，并在循环中定期调用 progress(已完成, 总数)。
+调用 Worker.cancel() 后，下一次 progress 回调会抛出 TaskCancelled 终止任务。
+所有信号都在工作线程中发出，由 Qt 排队投递到主线程的槽函数中处理。
+"""
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QTextCursor
+
+# 大段文本分批写入文本框时每批的条目数
+TEXT_CHUNK_SIZE = 500
+
+
+class TaskCancelled(Exception):
+    """任务被用户取消"""
+
+
+class WorkerSignals(QObject):
+    """Worker 的信号（QRunnable 不是 QObject，不能直接定义信号）"""
+    progress = pyqtSignal(int, int)  # 已完成, 总数（总数为 0 表示无法估计进度）
+    finished = pyqtSignal(object)    # 任务返回值
+    error = pyqtSignal(object)       # 任务抛出的异常对象
+    cancelled = pyqtSignal()
+
+
+class Worker(QRunnable):
+    """在线程池中执行 fn(*args, progress=..., **kwargs)"""
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        """请求取消任务（在任务下一次汇报进度时生效）"""
+        self._cancelled = True
+
+    def report_progress(self, done, total):
+        if self._cancelled:
+            raise TaskCancelled
+        self.signals.progress.emit(done, total)
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            result = self.fn(*self.args, progress=self.report_progress, **self.kwargs)
+        except TaskCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.error.emit(e)
+        else:
+            self.signals.finished.emit(result)
+
+
+def start_worker(fn, *args, on_finished=None, on_error=None, on_progress=None, on_cancelled=None, **kwargs):
+    """创建 Worker、连接回调并提交到全局线程池，返回 Worker 以便取消"""
+    worker = Worker(fn, *args, **kwargs)
+    for signal, slot in ((worker.signals.finished, on_finished), (worker.signals.error, on_error),
+                         (worker.signals.progress, on_progress), (worker.signals.cancelled, on_cancelled)):
+        if slot is not None:
+            signal.connect(slot)
+    QThreadPool.globalInstance().start(worker)
+    return worker
+
+
+def set_text_incrementally(text_edit, entries, chunk_size=TEXT_CHUNK_SIZE):
+    """分批把大量文本条目写入 QPlainTextEdit，每批之间让出事件循环
+
+    一次性 setPlainText 几十万行会卡住主线程；这里用 0 间隔的 QTimer 每轮追加一批，
+    写完后滚动回顶部。对同一文本框再次调用会中止上一次尚未写完的填充。
+    """
+    previous = getattr(text_edit, "_fill_timer", None)
+    if previous is not None:
+        previous.stop()
+    text_edit.clear()
+
+    starts = iter(range(0, len(entries), chunk_size))
+    timer = QTimer(text_edit)
+    timer.setInterval(0)
+
+    def append_next_chunk():
+        start = next(starts, None)
+        if start is None:
+            timer.stop()
+            text_edit.verticalScrollBar().setValue(0)
+            return
+        text_edit.appendPlainText("\n".join(entries[start:start + chunk_size]))
+
+    timer.timeout.connect(append_next_chunk)
+    text_edit._fill_timer = timer
+    timer.start()
+
+
+def replace_text_lines(text_edit, first_line, last_line, text):
+    """把文本框中第 first_line~last_line 行（含，从 0 开始）替换为 text，不重排其余内容"""
+    document = text_edit.document()
+    cursor = QTextCursor(document.findBlockByNumber(first_line))
+    end = document.findBlockByNumber(last_line)
+    cursor.setPosition(end.position() + end.length() - 1, QTextCursor.KeepAnchor)
+    cursor.insertText(text)
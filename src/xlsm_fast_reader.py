@@ -0,0 +1,226 @@
+"""Magics 体积报告（xlsm）快速读取：绕过 openpyxl 直接解析压缩包中的 XML
+
+xlsm 本质上是 zip 压缩包。报告布局固定（C2 为零件数量，第 8 行起 B~D 列为零件数据），
+因此只需增量解析活动工作表的 XML 和共享字符串表，读到最后一个零件行即可停止。
+布局不符合预期时回退到 openpyxl 流式读取（excel_loader.iter_parts）。
+"""
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+
+from cost_module import PROGRESS_INTERVAL
+from excel_loader import FIRST_PART_ROW, PART_COUNT_ROW, iter_parts
+
+# OOXML 命名空间（ElementTree 形式，用于解析 workbook.xml 等小文件）
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+DOC_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# expat 增量解析时的标签名（"命名空间 本地名" 形式）
+MAIN_URI = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+ROW_TAG = f"{MAIN_URI} row"
+CELL_TAG = f"{MAIN_URI} c"
+VALUE_TAG = f"{MAIN_URI} v"
+TEXT_TAG = f"{MAIN_URI} t"
+PHONETIC_TAG = f"{MAIN_URI} rPh"
+SHARED_ITEM_TAG = f"{MAIN_URI} si"
+
+PART_COLUMNS = ("B", "C", "D")
+
+
+class LayoutError(ValueError):
+    """工作簿不是预期的 Magics 报告布局"""
+
+
+def active_sheet_path(archive):
+    """根据 workbook.xml 的 activeTab 找到活动工作表在压缩包中的路径"""
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    view = workbook.find(f"{MAIN_NS}bookViews/{MAIN_NS}workbookView")
+    active_tab = int(view.get("activeTab", 0)) if view is not None else 0
+    sheets = workbook.findall(f"{MAIN_NS}sheets/{MAIN_NS}sheet")
+    rel_id = sheets[active_tab].get(f"{DOC_REL_NS}id")
+
+    rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels.iter(f"{PKG_REL_NS}Relationship"):
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target")
+            if target.startswith("/"):
+                return target[1:]
+            return posixpath.normpath(posixpath.join("xl", target))
+    raise LayoutError(f"找不到活动工作表 {rel_id}")
+
+
+class _StopParsing(Exception):
+    """已读到所需数据，提前结束解析"""
+
+
+def parse_incrementally(archive, member, handler, chunk_size=1 << 16):
+    """用 expat 分块增量解析压缩包内的 XML，handler 抛出 _StopParsing 时提前结束"""
+    parser = expat.ParserCreate(namespace_separator=" ")
+    parser.buffer_text = True
+    parser.StartElementHandler = handler.start
+    parser.EndElementHandler = handler.end
+    parser.CharacterDataHandler = handler.data
+    with archive.open(member) as stream:
+        try:
+            while chunk := stream.read(chunk_size):
+                parser.Parse(chunk, False)
+            parser.Parse(b"", True)
+        except _StopParsing:
+            pass
+
+
+class LayoutRowsHandler:
+    """收集 C2 的零件数量和第 8 行起的 B~D 列原始单元格 (类型, 文本)
+
+    共享字符串类型的文本为字符串表索引。读到最后一个零件行后停止解析。
+    progress(已读行数, 总行数) 为可选的进度回调。
+    """
+
+    def __init__(self, progress=None):
+        self.progress = progress
+        self.part_count = None
+        self.part_rows = []
+        self.expected_row = FIRST_PART_ROW
+        self.row_number = 0
+        self.cells = {}
+        self.column = self.cell_type = None
+        self.text = None
+        self.collecting = False
+
+    def start(self, tag, attrs):
+        if tag == CELL_TAG:
+            ref = attrs.get("r")
+            if ref is None:
+                raise LayoutError("单元格缺少引用地址")
+            self.column = ref.rstrip("0123456789")
+            self.cell_type = attrs.get("t", "n")
+            self.text = None
+        elif tag == VALUE_TAG or tag == TEXT_TAG:
+            self.collecting = True
+            if self.text is None:
+                self.text = ""
+        elif tag == ROW_TAG:
+            self.row_number = int(attrs.get("r", 0))
+            self.cells = {}
+
+    def data(self, text):
+        if self.collecting:
+            self.text += text
+
+    def end(self, tag):
+        if tag == VALUE_TAG or tag == TEXT_TAG:
+            self.collecting = False
+        elif tag == CELL_TAG:
+            self.cells[self.column] = (self.cell_type, self.text)
+        elif tag == ROW_TAG:
+            self.end_row()
+
+    def end_row(self):
+        if self.row_number == PART_COUNT_ROW:
+            cell_type, text = self.cells.get("C", ("n", None))
+            if cell_type != "n" or text is None:
+                raise LayoutError("C2 不是零件数量")
+            self.part_count = int(float(text))
+            if self.part_count <= 0:
+                raise _StopParsing
+        elif self.row_number >= FIRST_PART_ROW:
+            if self.part_count is None or self.row_number != self.expected_row:
+                raise LayoutError(f"第 {self.row_number} 行不在预期的零件区域内")
+            self.part_rows.append(tuple(self.cells.get(column, ("n", None)) for column in PART_COLUMNS))
+            self.expected_row += 1
+            if self.progress is not None and len(self.part_rows) % PROGRESS_INTERVAL == 0:
+                self.progress(len(self.part_rows), self.part_count)
+            if len(self.part_rows) == self.part_count:
+                raise _StopParsing
+
+
+class SharedStringsHandler:
+    """收集共享字符串表的前 count 项（只拼接正文和富文本片段，忽略注音 rPh）"""
+
+    def __init__(self, count):
+        self.count = count
+        self.strings = []
+        self.text = ""
+        self.collecting = False
+        self.in_phonetic = False
+
+    def start(self, tag, attrs):
+        if tag == TEXT_TAG and not self.in_phonetic:
+            self.collecting = True
+        elif tag == SHARED_ITEM_TAG:
+            self.text = ""
+        elif tag == PHONETIC_TAG:
+            self.in_phonetic = True
+
+    def data(self, text):
+        if self.collecting:
+            self.text += text
+
+    def end(self, tag):
+        if tag == TEXT_TAG:
+            self.collecting = False
+        elif tag == PHONETIC_TAG:
+            self.in_phonetic = False
+        elif tag == SHARED_ITEM_TAG:
+            self.strings.append(self.text)
+            if len(self.strings) == self.count:
+                raise _StopParsing
+
+
+def resolve_value(cell_type, text, strings):
+    """将原始单元格文本转换为与 openpyxl(data_only=True) 一致的值"""
+    if text is None:
+        return None
+    if cell_type == "s":
+        return strings[int(text)]
+    if cell_type == "n":
+        number = float(text)
+        return int(number) if number.is_integer() and "." not in text and "E" not in text.upper() else number
+    if cell_type == "b":
+        return text == "1"
+    return text
+
+
+def read_parts_xml(file_path, progress=None):
+    """直接解析 xlsm 的 XML 读取零件列表；布局不符时抛出 LayoutError"""
+    with zipfile.ZipFile(file_path) as archive:
+        layout = LayoutRowsHandler(progress)
+        parse_incrementally(archive, active_sheet_path(archive), layout)
+        if layout.part_count is None:
+            raise LayoutError("找不到 C2 中的零件数量")
+        if len(layout.part_rows) < layout.part_count:
+            raise LayoutError("工作表中的零件行数少于 C2 中的零件数量")
+        part_rows = layout.part_rows
+
+        shared_indexes = [int(text) for row in part_rows for cell_type, text in row if cell_type == "s"]
+        strings = SharedStringsHandler(max(shared_indexes) + 1 if shared_indexes else 0)
+        if strings.count:
+            parse_incrementally(archive, "xl/sharedStrings.xml", strings)
+        strings = strings.strings
+
+    try:
+        return [
+            {
+                'name': resolve_value(*name, strings),
+                'volume': float(resolve_value(*volume, strings)),
+                'support_volume': float(resolve_value(*support_volume, strings)),
+            }
+            for name, volume, support_volume in part_rows
+        ]
+    except (TypeError, ValueError, IndexError) as e:
+        raise LayoutError(f"零件数据格式不符：{e}") from e
+
+
+def read_parts(file_path, progress=None, notes=None):
+    """读取零件列表：优先走 XML 快速路径，布局不符时回退到 openpyxl
+
+    notes 为列表时，回退的原因作为一条提示追加到其中（GUI 显示在状态栏中）。
+    """
+    try:
+        return read_parts_xml(file_path, progress)
+    except (LayoutError, KeyError, IndexError, ET.ParseError, expat.ExpatError) as e:
+        if notes is not None:
+            notes.append(f"快速读取失败（{e}），已改用 openpyxl 读取")
+        return list(iter_parts(file_path, progress))
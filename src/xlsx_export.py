@@ -0,0 +1,300 @@
+"""预算报表导出引擎：直接基于 xlsxwriter，常量内存模式逐行写出
+
+与原先经 pandas.ExcelWriter 创建工作簿、逐单元格判断格式的写法相比：
+  - constant_memory 模式下每写完一行就落盘，字符串内联写入，内存占用与零件数无关；
+    但每个工作表在关闭工作簿前都占用一个打开的临时文件，工作表多于 MAX_OPEN_SHEETS 个时改用普通模式
+  - 格式定义集中在 FORMAT_SPECS 中，FormatRegistry 保证每个工作簿内每种格式只创建一次
+  - 零件行的格式按行类型直接确定，无需逐行做关键词判断，字符串直接 write_string 写出，
+    省去 write 的类型分派（也不会把以 = 开头的零件名称误当作公式）
+"""
+import re
+from datetime import datetime
+from itertools import islice
+
+from cost_module import PROGRESS_INTERVAL
+from result_model import PartTable
+
+# 报表格式定义（名称 -> xlsxwriter 格式属性）
+FORMAT_SPECS = {
+    'title': {
+        'bold': True, 'font_size': 14, 'bg_color': '#4F81BD', 'font_color': '#FFFFFF',
+        'align': 'center', 'border': 1
+    },
+    'header': {
+        'bold': True, 'bg_color': '#4F81BD', 'font_color': '#FFFFFF', 'border': 1,
+        'align': 'center', 'valign': 'vcenter'
+    },
+    'part_name': {
+        'bold': True, 'bg_color': '#D9E1F2', 'border': 1,
+        'align': 'center', 'valign': 'vcenter'
+    },
+    'part_detail': {
+        'bg_color': '#FCE4D6', 'border': 1,
+        'align': 'center', 'valign': 'vcenter'
+    },
+    'currency': {
+        'num_format': '¥##0.00', 'bg_color': '#E2EFDA', 'border': 1,
+        'align': 'center', 'valign': 'vcenter'
+    },
+    'number': {
+        'num_format': '0.00', 'bg_color': '#FFF2CC', 'border': 1,
+        'align': 'center', 'valign': 'vcenter'
+    },
+    'normal': {
+        'bg_color': '#FFFFFF', 'border': 1,
+        'align': 'center', 'valign': 'vcenter'
+    },
+}
+
+# 定价标准的单位
+PRICING_UNITS = {
+    "钛粉密度": "g/cm³",
+    "致密系数": "",  # 无单位
+    "用量比例": "",  # 无单位
+    "材料单价": "元/公斤",
+    "机时费率": "元/小时",
+    "氩气数量": "瓶",
+    "氩气单价": "元",
+    "氩气用量": "瓶",  # 无单位
+    "后处理费": "元",
+    "折扣优惠": ""  # 无单位
+}
+
+
+# Excel 单元格字符串的长度上限和单个工作表的行数上限
+MAX_STRING_LENGTH = 32767
+MAX_SHEET_ROWS = 1048576
+
+# 常量内存模式下一个工作簿的工作表数上限：每个工作表占用一个文件句柄直到关闭工作簿，
+# 远低于常见的进程文件句柄上限（Linux 缺省 1024）；超过时工作簿改用普通模式，单元格留在内存中直到关闭时写出
+MAX_OPEN_SHEETS = 200
+
+# 工作表名称：最长 31 个字符，不能包含 []:*?/\\
+MAX_SHEET_NAME_LENGTH = 31
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+# 多批次汇总表的工作表名称和固定列（其后为各项费用列）
+SUMMARY_SHEET_NAME = '报价汇总'
+SUMMARY_HEADERS = ('批次', '零件数量', '总打印时长')
+
+
+class FormatRegistry:
+    """按名称缓存工作簿中的格式对象，同一工作簿内每种格式只 add_format 一次"""
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self._formats = {}
+
+    def __getitem__(self, name):
+        cell_format = self._formats.get(name)
+        if cell_format is None:
+            cell_format = self._formats[name] = self.workbook.add_format(FORMAT_SPECS[name])
+        return cell_format
+
+
+def open_workbook(filename, sheet_count=1):
+    """创建工作簿：sheet_count（预计的工作表数，未知时为 None）不超过 MAX_OPEN_SHEETS 时用常量内存模式"""
+    import xlsxwriter
+
+    constant_memory = sheet_count is not None and sheet_count <= MAX_OPEN_SHEETS
+    return xlsxwriter.Workbook(filename, {'constant_memory': constant_memory})
+
+
+def close_workbook(workbook):
+    """关闭（落盘）工作簿；文件被占用时抛出 PermissionError，与原 pandas 写法一致"""
+    from xlsxwriter.exceptions import FileCreateError
+
+    try:
+        workbook.close()
+    except FileCreateError as e:
+        if isinstance(e.args[0], PermissionError):
+            raise e.args[0] from None
+        raise
+
+
+def detail_sheet_name(index, build_name):
+    """批次明细表名称：序号-批次名称，去掉非法字符并截断到 31 个字符（序号保证唯一）"""
+    name = _INVALID_SHEET_CHARS.sub('_', f"{index}-{build_name}")
+    return name[:MAX_SHEET_NAME_LENGTH].rstrip("'")
+
+
+def write_string_rows(worksheet, first_row, rows):
+    """从 first_row 起写出若干行两列字符串 [(A 列, B 列, 格式), ...]，返回下一个空行的行号"""
+    write_string = worksheet.write_string
+    for row, (label, value, cell_format) in enumerate(rows, first_row):
+        write_string(row, 0, label, cell_format)
+        write_string(row, 1, value, cell_format)
+    return first_row + len(rows)
+
+
+def cell_format_for_value(formats, value):
+    """定价标准等普通区块：数值用数字格式，其余用普通格式"""
+    return formats['number'] if isinstance(value, (int, float)) else formats['normal']
+
+
+def distribution_rows(result):
+    """成本分布区块的 (标签, 金额) 行（结果中没有成本分布时为空）"""
+    distribution = result.get('成本分布') or {}
+    return [(f"{label} 实付金额", value) for label, value in distribution.items() if label != '样本数']
+
+
+def budget_sheet_rows(result):
+    """预算报表占用的行数：标题和输入参数 6 行、每个零件 3 行，再加定价标准、费用明细和成本分布区块"""
+    distribution = distribution_rows(result)
+    return (3 * result['输入参数']['零件数量'] + 10
+            + len(result['定价标准']) + len(result['计算明细'])
+            + (2 + len(distribution) if distribution else 0))
+
+
+def write_budget_sheet(worksheet, formats, result, progress=None):
+    """在常量内存模式的工作表中按行写出一个批次的预算报表
+
+    常量内存模式要求按行号递增的顺序写入，因此各区块严格自上而下写出。
+    progress(已写行数, 总行数) 为可选的进度回调。
+    """
+    if budget_sheet_rows(result) > MAX_SHEET_ROWS:
+        raise ValueError(f"零件过多（{result['输入参数']['零件数量']} 个）：预算报表每个零件占 3 行，"
+                         f"超出了 Excel 单个工作表 {MAX_SHEET_ROWS} 行的上限")
+    parts = PartTable.from_parts(result['输入参数']['零件清单'])
+    pricing_rows = [
+        (param, f"{value} {PRICING_UNITS.get(param, '')}".strip())
+        for param, value in result['定价标准'].items()
+    ]
+    cost_rows = list(result['计算明细'].items())
+    distribution = distribution_rows(result)
+    total_rows = 2 + 3 * len(parts) + len(pricing_rows) + len(cost_rows) + len(distribution)
+
+    # 智能列宽设置
+    worksheet.set_column(0, 1, 25)
+
+    # 标题区块
+    worksheet.merge_range(0, 0, 0, 1, '多零件合并打印预算报告', formats['title'])
+    worksheet.merge_range(1, 0, 1, 1, f"生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M')}",
+                          formats['normal'])
+
+    # 输入参数
+    row = 3
+    worksheet.merge_range(row, 0, row, 1, "输入参数", formats['header'])
+    duration = result['输入参数']['总打印时长']
+    worksheet.write_row(row + 1, 0, ('总打印时长', duration), cell_format_for_value(formats, duration))
+    worksheet.write_row(row + 2, 0, ('零件数量', f"{result['输入参数']['零件数量']}件"), formats['normal'])
+    row += 3
+
+    # 零件行：每个零件三行（名称、体积、支撑体积），格式按行类型固定，每 PROGRESS_INTERVAL 个零件写一批
+    name_format = formats['part_name']
+    detail_format = formats['part_detail']
+    part_rows = enumerate(parts.rows(), 1)
+    for start in range(0, len(parts), PROGRESS_INTERVAL):
+        rows = []
+        for i, (name, volume, support) in islice(part_rows, PROGRESS_INTERVAL):
+            rows += (
+                (f'零件{i}名称', str(name), name_format),
+                (f'零件{i}体积', f"{volume:.3f}mm³", detail_format),
+                (f'零件{i}支撑体积', f"{support:.3f}mm³", detail_format),
+            )
+        row = write_string_rows(worksheet, row, rows)
+        if progress is not None:
+            progress(2 + 3 * (start + len(rows) // 3), total_rows)
+
+    # 定价标准
+    row += 1
+    worksheet.merge_range(row, 0, row, 1, "定价标准", formats['header'])
+    for label, value in pricing_rows:
+        row += 1
+        worksheet.write_row(row, 0, (label, value), cell_format_for_value(formats, value))
+
+    # 费用明细（各项均为金额）
+    row += 2
+    worksheet.merge_range(row, 0, row, 1, "费用明细", formats['header'])
+    currency_format = formats['currency']
+    for label, value in cost_rows:
+        row += 1
+        worksheet.write_row(row, 0, (label, value), currency_format)
+
+    # 成本分布（蒙特卡洛估计的实付金额分位数）
+    if distribution:
+        row += 2
+        worksheet.merge_range(row, 0, row, 1, f"成本分布（蒙特卡洛 {result['成本分布']['样本数']:,} 次）",
+                              formats['header'])
+        for label, value in distribution:
+            row += 1
+            worksheet.write_row(row, 0, (label, value), currency_format)
+
+    if progress is not None:
+        progress(total_rows, total_rows)
+    return row + 1
+
+
+def export_to_excel(result, filename="多零件预算报告.xlsx", progress=None):
+    """专业级多零件报表
+
+    文件被占用时抛出 PermissionError，由调用方提示用户；
+    progress(已写行数, 总行数) 为可选的进度回调（供后台任务汇报进度、响应取消）。
+    返回写入的行数。
+    """
+    workbook = open_workbook(filename)
+    formats = FormatRegistry(workbook)
+    rows = write_budget_sheet(workbook.add_worksheet('预算总览'), formats, result, progress)
+    close_workbook(workbook)
+    print(f"\n专业级报表已生成：{filename}")
+    return rows
+
+
+def export_builds_to_excel(builds, filename="批量预算报告.xlsx", detail_sheets=True, progress=None, count=None):
+    """多批次合并报表：所有批次流式写入同一个工作簿
+
+    builds 为 (批次名称, result) 的可迭代对象（可以是生成器，写完一个批次即可释放）。
+    第一个工作表为报价汇总（每个批次一行，末行为合计），detail_sheets 为 True 时
+    每个批次另有一个与 export_to_excel 相同版式的明细表，汇总表中的批次名称链接到该表。
+    所有工作表共用一套格式；progress(已写批次数, 总批次数) 为可选的进度回调。
+    builds 没有长度时可由 count 给出批次数，否则进度的总数为 0，且带明细表时不用常量内存模式
+    （批次数未知，明细表可能超过 MAX_OPEN_SHEETS 个）。返回写入的批次数。
+    """
+    total = len(builds) if hasattr(builds, '__len__') else count
+    workbook = open_workbook(filename, (1 + total if total is not None else None) if detail_sheets else 1)
+    total = total or 0
+    formats = FormatRegistry(workbook)
+    summary = workbook.add_worksheet(SUMMARY_SHEET_NAME)
+    summary.set_column(0, 0, 30)
+    summary.set_column(1, len(SUMMARY_HEADERS) + 5, 14)
+
+    cost_labels = None
+    count = part_total = 0
+    cost_totals = []
+    for count, (build_name, result) in enumerate(builds, 1):
+        if cost_labels is None:
+            cost_labels = list(result['计算明细'])
+            summary.write_row(0, 0, SUMMARY_HEADERS + tuple(cost_labels), formats['header'])
+            summary.freeze_panes(1, 1)
+            cost_totals = [0.0] * len(cost_labels)
+
+        if detail_sheets:
+            sheet_name = detail_sheet_name(count, build_name)
+            worksheet = workbook.add_worksheet(sheet_name)
+            write_budget_sheet(worksheet, formats, result)
+            summary.write_url(count, 0, f"internal:'{sheet_name}'!A1", formats['part_name'], string=str(build_name))
+        else:
+            summary.write_string(count, 0, str(build_name), formats['part_name'])
+        duration = result['输入参数']['总打印时长']
+        summary.write_number(count, 1, result['输入参数']['零件数量'], formats['normal'])
+        summary.write(count, 2, duration, cell_format_for_value(formats, duration))
+        costs = [result['计算明细'][label] for label in cost_labels]
+        summary.write_row(count, 3, costs, formats['currency'])
+        part_total += result['输入参数']['零件数量']
+        cost_totals = [subtotal + cost for subtotal, cost in zip(cost_totals, costs)]
+
+        if progress is not None:
+            progress(count, total)
+
+    # 合计行：公式求和，同时写入计算好的结果，未重新计算公式的阅读器也能显示
+    if count:
+        total_row = count + 1
+        summary.write_string(total_row, 0, '合计', formats['header'])
+        summary.write_formula(total_row, 1, f"=SUM(B2:B{count + 1})", formats['normal'], value=part_total)
+        for column, subtotal in enumerate(cost_totals, 3):
+            letter = chr(ord('A') + column)
+            summary.write_formula(total_row, column, f"=SUM({letter}2:{letter}{count + 1})",
+                                  formats['currency'], value=round(subtotal, 2))
+    close_workbook(workbook)
+    print(f"\n批量报表已生成：{filename}（{count} 个批次）")
+    return count
@@ -0,0 +1,37 @@
+"""批量报价与标量报价逐分一致"""
+import numpy as np
+import pytest
+
+from batch_pricing import COST_COLUMNS, calculate_batch_cost, round_costs
+from cost_module import DEFAULT_PRICING_STANDARD, calculate_multipart_cost, format_duration
+
+
+def scalar_quote(volume, duration, pricing):
+    return calculate_multipart_cost([{"name": "零件", "volume": volume}], duration, pricing)
+
+
+def test_rounding_tie_matches_scalar():
+    # 250.5 × 0.03 = 7.515（二进制略小于 7.515）：内置 round 得 7.51，np.round 得 7.52
+    pricing = dict(DEFAULT_PRICING_STANDARD, 机时费率=250.5)
+    batch = calculate_batch_cost([1000.0], None, ["b"], [0.03], pricing)
+    assert batch["机时费用"][0] == scalar_quote(1000.0, "108秒", pricing)["计算明细"]["机时费用"] == 7.51
+
+
+@pytest.mark.parametrize("rate", [250.5, 187.35, 312.77])
+def test_batch_matches_scalar_with_fractional_rates_and_durations(rate):
+    rng = np.random.default_rng(0)
+    count = 2000
+    volumes = rng.uniform(1e3, 1e6, count)
+    # 两条路径解析同一个时长字符串
+    durations = [format_duration(seconds) for seconds in rng.integers(1, 5 * 86400, count).tolist()]
+    pricing = dict(DEFAULT_PRICING_STANDARD, 机时费率=rate, 材料单价=1799.9, 折扣优惠=0.87)
+    batch = calculate_batch_cost(volumes, None, np.arange(count), durations, pricing)
+    for i in range(count):
+        expected = scalar_quote(float(volumes[i]), durations[i], pricing)["计算明细"]
+        assert {column: batch[column][i] for column in COST_COLUMNS} == expected, i
+
+
+def test_round_costs_matches_builtin_round():
+    values = np.concatenate([np.random.default_rng(1).uniform(0, 1e5, 100_000),
+                             np.arange(0, 100, 0.005), np.round(np.random.default_rng(2).uniform(0, 1e4, 10_000), 3)])
+    assert round_costs(values).tolist() == [round(value, 2) for value in values.tolist()]
@@ -0,0 +1,61 @@
+"""多版排产：每版零件不重叠、不超出成型版，每个零件恰好排入一次"""
+import pytest
+
+from bench_build_scheduler import MACHINES, make_order
+from build_scheduler import DEFAULT_GAP, pack_plate, part_footprint, schedule_builds
+
+EPS = 1e-9
+
+
+def rectangles(placed, footprints):
+    """[(零件序号, x, y, 是否旋转)] → [(零件序号, x0, y0, x1, y1)]"""
+    boxes = []
+    for index, x, y, rotated in placed:
+        width, depth, _ = footprints[index]
+        if rotated:
+            width, depth = depth, width
+        boxes.append((index, x, y, x + width, y + depth))
+    return boxes
+
+
+def assert_valid_layout(boxes, plate, gap=DEFAULT_GAP):
+    plate_width, plate_depth = plate
+    for _, x0, y0, x1, y1 in boxes:
+        assert -EPS <= x0 and x1 <= plate_width + EPS
+        assert -EPS <= y0 and y1 <= plate_depth + EPS
+    for k, (a, ax0, ay0, ax1, ay1) in enumerate(boxes):
+        for b, bx0, by0, bx1, by1 in boxes[k + 1:]:
+            apart = (ax1 + gap <= bx0 + EPS or bx1 + gap <= ax0 + EPS
+                     or ay1 + gap <= by0 + EPS or by1 + gap <= ay0 + EPS)
+            assert apart, f"零件 {a} 与 {b} 重叠"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pack_plate_layout(seed):
+    parts = make_order(300, seed)
+    footprints = [part_footprint(part) for part in parts]
+    order = sorted(range(len(parts)), key=lambda i: -footprints[i][2])
+    plate = (250.0, 250.0)
+    placed = pack_plate(order, footprints, plate, max_height=150.0)
+
+    assert placed
+    indexes = [index for index, *_ in placed]
+    assert len(indexes) == len(set(indexes))
+    assert all(footprints[index][2] <= 150.0 for index in indexes)
+    assert_valid_layout(rectangles(placed, footprints), plate)
+
+
+def test_every_part_scheduled_once():
+    parts = make_order(500)
+    schedule = schedule_builds(parts, MACHINES)
+
+    scheduled = [id(part) for plate in schedule["plates"] for part in plate["parts"]]
+    assert sorted(scheduled) == sorted(id(part) for part in parts)
+
+    plate_sizes = {machine["name"]: machine["plate"] for machine in MACHINES}
+    for plate in schedule["plates"]:
+        footprints = [part_footprint(part) for part in plate["parts"]]
+        placed = [(k, *position) for k, position in enumerate(plate["positions"])]
+        assert_valid_layout(rectangles(placed, footprints), plate_sizes[plate["machine"]])
+    assert schedule["total_cost"] == pytest.approx(
+        sum(plate["quote"]["计算明细"]["实际费用"] for plate in schedule["plates"]))
@@ -0,0 +1,42 @@
+"""打印时长的解析与格式化"""
+import pytest
+
+from cost_module import convert_duration_to_hours, format_duration
+
+
+@pytest.mark.parametrize("text, hours", [
+    ("1天2小时3分4秒", 26 + 3 / 60 + 4 / 3600),
+    ("11天11小时11分11秒", 11 * 24 + 11 + 11 / 60 + 11 / 3600),
+    ("2小时", 2.0),
+    ("45分", 0.75),
+    (" 3天 ", 72.0),
+    ("2.5", 2.5),
+    ("12:30", 12.5),
+    ("1:02:03.6", 1 + 2 / 60 + 3.6 / 3600),
+    ("3h 30min", 3.5),
+    ("1 day 2 hours 30 seconds", 26 + 30 / 3600),
+    ("1.5小时20分钟", 1.5 + 20 / 60),
+    ("", 0.0),
+    ("不知道", 0.0),
+])
+def test_convert_duration_to_hours(text, hours):
+    assert convert_duration_to_hours(text) == pytest.approx(hours, abs=1e-12)
+
+
+def test_numbers_are_hours():
+    assert convert_duration_to_hours(4) == 4.0
+    assert convert_duration_to_hours(1.25) == 1.25
+
+
+@pytest.mark.parametrize("seconds, text", [
+    (0, "0小时0分0秒"),
+    (59.6, "0小时1分0秒"),
+    (3600 * 25 + 61, "1天1小时1分1秒"),
+])
+def test_format_duration(seconds, text):
+    assert format_duration(seconds) == text
+
+
+def test_format_duration_round_trip():
+    for seconds in range(0, 40 * 86400, 86400 // 7 + 13):
+        assert convert_duration_to_hours(format_duration(seconds)) == pytest.approx(seconds / 3600, abs=1e-12)
@@ -0,0 +1,41 @@
+"""零件报价历史：写入报价后按名称和体积查出最近一次报价，名称或体积不同的零件查不到"""
+from datetime import datetime
+
+import pytest
+
+from cost_module import DEFAULT_PRICING_STANDARD, calculate_multipart_cost
+from part_history import PartHistory
+from quote_archive import quote_record
+
+PARTS = [{"name": "A.step", "volume": 1000.0, "support_volume": 100.0},
+         {"name": "B.step", "volume": 2500.1234, "support_volume": 0.0}]
+
+
+def record(parts, duration, timestamp):
+    return quote_record(calculate_multipart_cost(parts, duration, DEFAULT_PRICING_STANDARD), timestamp)
+
+
+def test_add_quotes_then_lookup(tmp_path):
+    history = PartHistory(str(tmp_path / "history.sqlite3"))
+    first = record(PARTS, "2小时", datetime(2026, 3, 1, 9, 0, 0))
+    latest = record(PARTS[:1], "5小时", datetime(2026, 3, 2, 9, 0, 0))
+    assert history.add_quotes([first, latest]) == 3
+    assert history.stats() == (2, 3)
+
+    misses = [{"name": "A.step", "volume": 1001.0, "support_volume": 100.0},  # 体积不同
+              {"name": "C.step", "volume": 1000.0, "support_volume": 100.0}]  # 名称不同
+    a, b, *missed = history.lookup(PARTS + misses)
+    assert missed == [None, None]
+
+    # A 两次报价都有，取最近一次（只有 A 一个零件，分摊全部实付金额和机时）
+    assert a == {"时间": str(latest["时间"]), "分摊费用": pytest.approx(latest["实际费用"]),
+                 "机时": pytest.approx(5.0), "份额": pytest.approx(1.0)}
+    share = 2500.1234 / first["总体积"]
+    assert b == {"时间": str(first["时间"]), "分摊费用": pytest.approx(share * first["实际费用"]),
+                 "机时": pytest.approx(share * 2.0), "份额": pytest.approx(share)}
+
+    assert history.lookup_part("B.step", 2500.1234) == b
+    # 体积按 0.001 mm³ 取整比较
+    assert history.lookup_part("B.step", 2500.12338) == b
+    assert history.lookup_part("B.step", 2500.125) is None
+    assert history.lookup_part("C.step", 1000.0) is None
@@ -0,0 +1,43 @@
+"""敏感性分析：网格的每个单元格与用该组定价的标量报价一致，批次很多时工作簿仍能写出"""
+import itertools
+
+import numpy as np
+from openpyxl import load_workbook
+
+from batch_pricing import COST_COLUMNS
+from cost_module import DEFAULT_PRICING_STANDARD, calculate_multipart_cost, convert_duration_to_hours
+from pricing_sweep import parse_range, sweep_costs, write_sweep_workbook
+from xlsx_export import MAX_OPEN_SHEETS
+
+
+def test_rounding_tie_cell_matches_scalar():
+    sweep = sweep_costs([("b", 1000.0, 0.03)], {"机时费率": np.array([250.5, 250.0])})
+    expected = calculate_multipart_cost([{"name": "b", "volume": 1000.0}], "108秒",
+                                        dict(DEFAULT_PRICING_STANDARD, 机时费率=250.5))
+    assert sweep["costs"]["机时费用"][0, 0] == expected["计算明细"]["机时费用"] == 7.51
+
+
+def test_every_cell_matches_scalar():
+    durations = ["1天2小时3分4秒", "7小时31分", "45分12秒"]
+    volumes = [123456.789, 98765.4321, 5555.5]
+    builds = [(f"b{i}", volume, convert_duration_to_hours(duration))
+              for i, (volume, duration) in enumerate(zip(volumes, durations))]
+    ranges = {"机时费率": parse_range("200.5:300.5:11"), "材料单价": parse_range("1500.3,1800.7"),
+              "折扣优惠": parse_range("0.85:1:4")}
+    sweep = sweep_costs(builds, ranges)
+
+    for index in itertools.product(*(range(n) for n in sweep["costs"]["实际费用"].shape)):
+        pricing = dict(DEFAULT_PRICING_STANDARD)
+        for (param, values), k in zip(sweep["parameters"], index[1:]):
+            pricing[param] = float(values[k])
+        b = index[0]
+        expected = calculate_multipart_cost([{"name": "零件", "volume": volumes[b]}], durations[b], pricing)
+        assert {column: sweep["costs"][column][index] for column in COST_COLUMNS} == expected["计算明细"], index
+
+
+def test_many_builds_with_two_parameters(tmp_path, low_fd_limit):
+    builds = [(f"b{i}", 1000.0 + i, 1.5) for i in range(low_fd_limit + 100)]
+    sweep = sweep_costs(builds, {"机时费率": parse_range("200:300:3"), "材料单价": parse_range("1500,1800")})
+    sheets = write_sweep_workbook(sweep, str(tmp_path / "sweep.xlsx"))
+    assert sheets == MAX_OPEN_SHEETS
+    assert len(load_workbook(str(tmp_path / "sweep.xlsx"), read_only=True).sheetnames) == sheets
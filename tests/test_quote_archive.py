@@ -0,0 +1,62 @@
+"""报价归档：逐次追加、小块合并后，按零件、时间和费用区间查询的结果与写入的记录一致"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from cost_module import DEFAULT_PRICING_STANDARD, calculate_multipart_cost
+from quote_archive import COMPACT_CHUNKS, QuoteArchive, quote_record
+
+START = datetime(2026, 1, 1, 8, 0, 0)
+
+
+def make_records(count):
+    """第 i 次报价在 START 之后 i 天，零件为 共用件 与 零件i，体积与机时逐次增加"""
+    records = []
+    for i in range(count):
+        parts = [{"name": "共用件", "volume": 1000.0, "support_volume": 50.0},
+                 {"name": f"零件{i}", "volume": 200.0 + 100.0 * i, "support_volume": 10.0}]
+        result = calculate_multipart_cost(parts, f"{i + 1}小时", DEFAULT_PRICING_STANDARD)
+        records.append(quote_record(result, START + timedelta(days=i)))
+    return records
+
+
+def test_append_compact_query(tmp_path):
+    archive = QuoteArchive(str(tmp_path / "archive"))
+    records = make_records(COMPACT_CHUNKS + 8)
+    for record in records:
+        assert archive.append([record])
+
+    # 第 COMPACT_CHUNKS 次追加后前面的小块合并为一块，其后的追加各占一块
+    chunks = archive.chunks()
+    assert sorted(meta['quotes'] for _, meta in chunks) == [1] * (len(records) - COMPACT_CHUNKS) + [COMPACT_CHUNKS]
+    assert sorted(path.name for path in (tmp_path / "archive").iterdir()) == sorted(name for name, _ in chunks)
+    assert sum(meta['quotes'] for _, meta in chunks) == len(records)
+
+    times = np.array([record["时间"] for record in records])
+    costs = np.array([record["实际费用"] for record in records])
+
+    everything = archive.query()
+    assert sorted(everything["时间"]) == sorted(times)
+    assert sorted(everything["实际费用"]) == sorted(costs)
+
+    # 按零件：共用件出现在每次报价中，零件7 只出现在第 8 次报价中
+    assert len(archive.query(["时间"], part_name="共用件")["时间"]) == len(records)
+    only = archive.query(["时间", "实际费用", "零件数量"], part_name="零件7")
+    assert list(only["时间"]) == [times[7]]
+    assert list(only["实际费用"]) == [costs[7]]
+    assert list(only["零件数量"]) == [2]
+    assert len(archive.query(part_name="从未报价的零件")["时间"]) == 0
+
+    # 按时间：含 start、不含 end
+    window = archive.query(["时间"], start=START + timedelta(days=10), end=START + timedelta(days=20))
+    assert sorted(window["时间"]) == list(times[10:20])
+    assert len(archive.query(["时间"], start="2026-01-05T08:00:00", end="2026-01-05T08:00:00")["时间"]) == 0
+
+    # 按费用区间：含两端
+    low, high = costs[5], costs[15]
+    band = archive.query(["实际费用"], cost_min=low, cost_max=high)
+    assert sorted(band["实际费用"]) == sorted(costs[(costs >= low) & (costs <= high)])
+
+    # 条件组合
+    combined = archive.query(["时间"], part_name="共用件", start=START + timedelta(days=3), cost_max=costs[6])
+    assert sorted(combined["时间"]) == sorted(times[(times >= times[3]) & (costs <= costs[6])])
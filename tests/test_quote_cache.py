@@ -0,0 +1,53 @@
+"""报价缓存：无法还原的条目和其他数据格式版本的条目视为未命中并删除"""
+import sqlite3
+import time
+
+from quote_cache import QuoteCache
+
+
+def entry_keys(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {key for (key,) in conn.execute("SELECT key FROM entries")}
+    finally:
+        conn.close()
+
+
+def insert_raw(path, key, data):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO entries (key, data, size, last_used) VALUES (?, ?, ?, ?)",
+                     (key, data, len(data), time.time()))
+    conn.close()
+
+
+def test_round_trip(tmp_path):
+    cache = QuoteCache(str(tmp_path / "cache.sqlite3"))
+    parts = [{"name": "A", "volume": 1.5, "support_volume": 0.25}]
+    cache.put_parts("abc", parts)
+    assert cache.get_parts("abc") == parts
+    assert cache.get_parts("missing") is None
+
+
+def test_unreadable_entry_is_a_miss_and_dropped(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = QuoteCache(path)
+    cache.put_parts("abc", [])
+    (key,) = entry_keys(path)
+    insert_raw(path, key, b"not a pickle")
+
+    assert cache.get_parts("abc") is None
+    assert entry_keys(path) == set()
+    assert list(cache.iter_quote_history()) == []
+
+
+def test_other_format_versions_are_dropped(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    QuoteCache(path).put_parts("abc", [])
+    (current,) = entry_keys(path)
+    insert_raw(path, "v1:parts:abc", b"old")
+    insert_raw(path, "parts:abc", b"older")
+
+    cache = QuoteCache(path)
+    assert cache.get_parts("abc") == []
+    assert entry_keys(path) == {current}
@@ -0,0 +1,55 @@
+"""报价服务：合并计算的结果与逐个报价一致，无效的请求返回 400"""
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from cost_module import DEFAULT_PRICING_STANDARD, calculate_multipart_cost
+from quote_server import QuoteRequestError, QuoteServer, parse_quote_request, price_quote_batch
+
+
+def test_price_quote_batch_matches_scalar():
+    rng = np.random.default_rng(0)
+    pricing = dict(DEFAULT_PRICING_STANDARD, 机时费率=250.5, 折扣优惠=0.93)
+    quotes = []
+    for i in range(300):
+        parts = [{"name": f"零件{i}-{k}", "volume": float(volume), "support_volume": float(support)}
+                 for k, (volume, support) in enumerate(zip(rng.uniform(10, 5e4, 3), rng.uniform(0, 5e3, 3)))]
+        quotes.append((parts, f"{int(rng.integers(0, 100))}小时{int(rng.integers(0, 60))}分"))
+    quotes.append(([{"name": "A", "volume": 1000.0, "support_volume": 0.0}], "108秒"))
+
+    for (parts, duration), result in zip(quotes, price_quote_batch(quotes, pricing)):
+        assert result["计算明细"] == calculate_multipart_cost(parts, duration, pricing)["计算明细"]
+
+
+@pytest.mark.parametrize("body", [
+    '{"parts": [{"name": "A", "volume": NaN}], "duration": 1}',
+    '{"parts": [{"name": "A", "volume": 1, "support_volume": Infinity}], "duration": 1}',
+    '{"parts": [{"name": "A", "volume": 1}], "duration": -Infinity}',
+    '{"parts": [{"name": "A", "volume": 1}], "duration": 1, "pricing": {"折扣优惠": NaN}}',
+])
+def test_non_finite_numbers_are_rejected(body):
+    with pytest.raises(QuoteRequestError):
+        parse_quote_request(json.loads(body))
+
+
+async def exchange(request):
+    """把原始请求发给一个临时启动的服务，返回响应的状态行"""
+    server = await asyncio.start_server(QuoteServer().handle_connection, "127.0.0.1", 0)
+    async with server:
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+        writer.write(request)
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), 5)
+        writer.close()
+        return status_line
+
+
+@pytest.mark.parametrize("request_bytes", [
+    b"POST /quote HTTP/1.1\r\nContent-Length: -5\r\n\r\n",
+    b"POST /quote HTTP/1.1\r\nX-Long: " + b"a" * 100_000 + b"\r\n\r\n",
+    b"POST /quote HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+])
+def test_malformed_requests_get_400(request_bytes):
+    assert asyncio.run(exchange(request_bytes)).startswith(b"HTTP/1.1 400 ")
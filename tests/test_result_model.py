@@ -0,0 +1,24 @@
+"""PartTable 与零件字典列表的相互转换"""
+from result_model import PartTable
+
+
+def test_round_trip():
+    parts = [{"name": "A.step", "volume": 1234.5, "support_volume": 67.8},
+             {"name": "B.step", "volume": 0.001, "support_volume": 0.0}]
+    table = PartTable.from_parts(parts)
+
+    assert len(table) == 2
+    assert table.to_dicts() == parts
+    assert list(table.rows()) == [("A.step", 1234.5, 67.8), ("B.step", 0.001, 0.0)]
+    assert table.total_volume() == 1234.5 + 67.8 + 0.001
+
+
+def test_support_volume_defaults_to_zero():
+    assert PartTable.from_parts([{"name": "A", "volume": 5.0}]).to_dicts() == [
+        {"name": "A", "volume": 5.0, "support_volume": 0.0}]
+
+
+def test_part_table_passes_through():
+    table = PartTable.from_parts([{"name": "A", "volume": 5.0}])
+    assert PartTable.from_parts(table) is table
+    assert len(PartTable.from_parts([])) == 0
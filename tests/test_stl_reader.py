@@ -0,0 +1,93 @@
+"""STL 读取：由网格计算的体积、表面积和包围盒，二进制/ASCII 的判断，以及映射的关闭"""
+import os
+
+import pytest
+
+from stl_reader import read_stl_part
+from synthetic import cube_triangles, write_binary_stl
+
+
+def write_ascii_stl(file_path, triangles):
+    facets = "".join(
+        "facet normal 0 0 0\n outer loop\n"
+        + "".join(f"  vertex {x!r} {y!r} {z!r}\n" for x, y, z in triangle.tolist())
+        + " endloop\nendfacet\n"
+        for triangle in triangles)
+    with open(file_path, "w") as f:
+        f.write(f"solid cube\n{facets}endsolid cube\n")
+
+
+@pytest.mark.parametrize("writer", [write_binary_stl, write_ascii_stl])
+def test_cube(tmp_path, writer):
+    path = str(tmp_path / "cube.stl")
+    writer(path, cube_triangles(20.0, 3, origin=(5.0, -10.0, 2.5)))
+    part = read_stl_part(path)
+
+    assert part["name"] == "cube.stl"
+    assert part["volume"] == pytest.approx(8000.0, rel=1e-9)
+    assert part["surface_area"] == pytest.approx(2400.0, rel=1e-9)
+    assert part["bbox_min"] == pytest.approx((5.0, -10.0, 2.5))
+    assert part["bbox_max"] == pytest.approx((25.0, 10.0, 22.5))
+    assert part["triangles"] == 12 * 9
+    assert part["support_volume"] == 0.0
+
+
+def test_inward_normals_give_positive_volume(tmp_path):
+    path = str(tmp_path / "inverted.stl")
+    write_binary_stl(path, cube_triangles(10.0, 2)[:, ::-1])
+    assert read_stl_part(path)["volume"] == pytest.approx(1000.0, rel=1e-9)
+
+
+def test_binary_with_trailing_padding(tmp_path):
+    path = str(tmp_path / "padded.stl")
+    write_binary_stl(path, cube_triangles(10.0, 2))
+    with open(path, "ab") as f:
+        f.write(b"\0\0")
+    assert read_stl_part(path)["volume"] == pytest.approx(1000.0, rel=1e-9)
+
+
+def test_binary_with_solid_header_and_padding_is_rejected(tmp_path):
+    path = str(tmp_path / "ambiguous.stl")
+    write_binary_stl(path, cube_triangles(10.0, 2))
+    with open(path, "r+b") as f:
+        f.write(b"solid")
+        f.seek(0, os.SEEK_END)
+        f.write(b"\0\0")
+    with pytest.raises(ValueError):
+        read_stl_part(path)
+
+
+def test_binary_with_solid_header_exact_size(tmp_path):
+    path = str(tmp_path / "solid_header.stl")
+    write_binary_stl(path, cube_triangles(10.0, 2))
+    with open(path, "r+b") as f:
+        f.write(b"solid")
+    assert read_stl_part(path)["volume"] == pytest.approx(1000.0, rel=1e-9)
+
+
+def test_ascii_without_facets_is_rejected(tmp_path):
+    path = str(tmp_path / "empty.stl")
+    with open(path, "w") as f:
+        f.write("solid empty\nendsolid empty\n")
+    with pytest.raises(ValueError):
+        read_stl_part(path)
+
+
+def mapped_files():
+    with open("/proc/self/maps") as f:
+        return f.read()
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/maps"), reason="需要 /proc/self/maps")
+def test_mapping_is_closed(tmp_path):
+    path = str(tmp_path / "cube.stl")
+    write_binary_stl(path, cube_triangles(10.0, 2))
+    read_stl_part(path, support={}, print_parameters={})
+    assert path not in mapped_files()
+
+    def cancel(done, total):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        read_stl_part(path, progress=cancel)
+    assert path not in mapped_files()
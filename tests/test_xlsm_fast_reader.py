@@ -0,0 +1,31 @@
+"""xlsm 快速读取：与 openpyxl 读取结果一致，回退时把原因记入提示列表而不是打印"""
+import xlsm_fast_reader
+from synthetic import make_parts, write_magics_report
+from xlsm_fast_reader import LayoutError, read_parts
+
+
+def report(tmp_path, count):
+    """写出合成报告；体积取 3 位小数，xlsxwriter 按 16 位有效数字写出时不丢精度"""
+    parts = [{**part, 'volume': round(part['volume'], 3), 'support_volume': round(part['support_volume'], 3)}
+             for part in make_parts(count)]
+    return parts, write_magics_report(str(tmp_path / "report.xlsm"), parts)
+
+
+def test_fast_path_matches_parts(tmp_path):
+    parts, path = report(tmp_path, 50)
+    notes = []
+    assert read_parts(path, notes=notes) == parts
+    assert notes == []
+
+
+def test_fallback_is_noted(tmp_path, monkeypatch, capsys):
+    parts, path = report(tmp_path, 20)
+
+    def unexpected_layout(file_path, progress=None):
+        raise LayoutError("找不到 C2 中的零件数量")
+
+    monkeypatch.setattr(xlsm_fast_reader, "read_parts_xml", unexpected_layout)
+    notes = []
+    assert read_parts(path, notes=notes) == parts
+    assert notes == ["快速读取失败（找不到 C2 中的零件数量），已改用 openpyxl 读取"]
+    assert capsys.readouterr().out == ""
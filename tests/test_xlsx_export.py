@@ -0,0 +1,37 @@
+"""预算报表导出：零件行按字符串原样写出，明细表多于文件句柄上限时仍能写出"""
+from openpyxl import load_workbook
+
+from cost_module import DEFAULT_PRICING_STANDARD, calculate_multipart_cost
+from xlsx_export import export_builds_to_excel, export_to_excel
+
+
+def test_part_rows_round_trip(tmp_path):
+    names = ["=SUM(A1)", " 前后空格 ", "A&B<C>", "http://example.com/a.step"]
+    parts = [{"name": name, "volume": 100.0 + i, "support_volume": 0.5 * i} for i, name in enumerate(names)]
+    result = calculate_multipart_cost(parts, "1天2小时", DEFAULT_PRICING_STANDARD)
+    filename = str(tmp_path / "report.xlsx")
+    export_to_excel(result, filename)
+
+    rows = list(load_workbook(filename).active.iter_rows(min_row=7, max_row=6 + 3 * len(parts), values_only=True))
+    for i, name in enumerate(names):
+        assert rows[3 * i] == (f"零件{i + 1}名称", name)
+        assert rows[3 * i + 1] == (f"零件{i + 1}体积", f"{100.0 + i:.3f}mm³")
+        assert rows[3 * i + 2] == (f"零件{i + 1}支撑体积", f"{0.5 * i:.3f}mm³")
+
+
+def many_builds(count):
+    result = calculate_multipart_cost([{"name": "A.step", "volume": 1000.0, "support_volume": 10.0}], "1小时",
+                                      DEFAULT_PRICING_STANDARD)
+    return [(f"批次{i}", result) for i in range(count)]
+
+
+def test_more_detail_sheets_than_file_handles(tmp_path, low_fd_limit):
+    builds = many_builds(low_fd_limit + 100)
+    filename = str(tmp_path / "builds.xlsx")
+    assert export_builds_to_excel(builds, filename) == len(builds)
+    # 批次数未知的生成器同样不能按工作表占用文件句柄
+    assert export_builds_to_excel(iter(builds), str(tmp_path / "stream.xlsx")) == len(builds)
+
+    workbook = load_workbook(filename, read_only=True)
+    assert len(workbook.sheetnames) == len(builds) + 1
+    assert workbook[workbook.sheetnames[-1]]["A1"].value == "多零件合并打印预算报告"